@@ -0,0 +1,183 @@
+from datetime import date, datetime, timezone
+
+from alembic import op
+
+# Revisiones
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Meses creados por adelantado (el job de retención mantiene la ventana)
+PREMAKE_MONTHS = 3
+
+
+def _month(d: date, offset: int = 0) -> date:
+    index = d.year * 12 + (d.month - 1) + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partitions(first: date, count: int) -> None:
+    for i in range(count):
+        start, end = _month(first, i), _month(first, i + 1)
+        suffix = f"p{start:%Y_%m}"
+        for table in ("exercise", "exercise_option"):
+            op.execute(
+                f"CREATE TABLE {table}_{suffix} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') "
+                f"TO ('{end.isoformat()} 00:00:00+00')"
+            )
+
+
+def upgrade() -> None:
+    """
+    exercise / exercise_option pasan a tablas particionadas por rango
+    mensual de created_at (columna nueva, DEFAULT now()).
+
+    - La clave primaria incluye created_at (requisito de PostgreSQL) y la FK
+      de exercise_option es (exercise_id, created_at): un ejercicio y sus
+      opciones se insertan en la misma transacción, con el mismo now(),
+      y viven en particiones del mismo mes.
+    - Las filas existentes se copian con created_at = momento de la migración.
+    - exercise_id sigue saliendo de la misma secuencia.
+    - Partición DEFAULT como red de seguridad si el job de retención no
+      ha creado a tiempo la partición de un mes.
+    """
+    # 1) Apartar las tablas actuales (y los nombres de índice de sus PK)
+    op.execute("ALTER TABLE exercise_option RENAME TO exercise_option_legacy")
+    op.execute(
+        "ALTER TABLE exercise_option_legacy "
+        "RENAME CONSTRAINT exercise_option_pkey TO exercise_option_legacy_pkey"
+    )
+    op.execute("ALTER TABLE exercise RENAME TO exercise_legacy")
+    op.execute(
+        "ALTER TABLE exercise_legacy "
+        "RENAME CONSTRAINT exercise_pkey TO exercise_legacy_pkey"
+    )
+
+    # 2) Tablas particionadas
+    op.execute(
+        """
+        CREATE TABLE exercise (
+            exercise_id integer NOT NULL
+                DEFAULT nextval('exercise_exercise_id_seq'::regclass),
+            category_id integer NOT NULL,
+            lexical_item_id integer NOT NULL,
+            option_order integer[] NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT exercise_pkey PRIMARY KEY (exercise_id, created_at),
+            CONSTRAINT exercise_category_id_fkey
+                FOREIGN KEY (category_id) REFERENCES category (category_id),
+            CONSTRAINT exercise_lexical_item_id_fkey
+                FOREIGN KEY (lexical_item_id)
+                REFERENCES lexical_item (lexical_item_id)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE exercise_option (
+            exercise_id integer NOT NULL,
+            option_id integer NOT NULL,
+            text varchar NOT NULL,
+            is_correct boolean NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT exercise_option_pkey
+                PRIMARY KEY (exercise_id, option_id, created_at),
+            CONSTRAINT exercise_option_exercise_fkey
+                FOREIGN KEY (exercise_id, created_at)
+                REFERENCES exercise (exercise_id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    # La secuencia pasa a pertenecer a la tabla nueva
+    # (pg_get_serial_sequence('exercise', 'exercise_id') sigue funcionando)
+    op.execute("ALTER SEQUENCE exercise_exercise_id_seq OWNED BY exercise.exercise_id")
+
+    _create_month_partitions(
+        _month(datetime.now(timezone.utc).date()), PREMAKE_MONTHS + 1
+    )
+    op.execute("CREATE TABLE exercise_default PARTITION OF exercise DEFAULT")
+    op.execute(
+        "CREATE TABLE exercise_option_default PARTITION OF exercise_option DEFAULT"
+    )
+
+    # 3) Copiar datos (now() es el mismo en toda la transacción)
+    op.execute(
+        "INSERT INTO exercise "
+        "(exercise_id, category_id, lexical_item_id, option_order, created_at) "
+        "SELECT exercise_id, category_id, lexical_item_id, option_order, now() "
+        "FROM exercise_legacy"
+    )
+    op.execute(
+        "INSERT INTO exercise_option "
+        "(exercise_id, option_id, text, is_correct, created_at) "
+        "SELECT exercise_id, option_id, text, is_correct, now() "
+        "FROM exercise_option_legacy"
+    )
+
+    op.execute("DROP TABLE exercise_option_legacy")
+    op.execute("DROP TABLE exercise_legacy")
+
+
+def downgrade() -> None:
+    """
+    Vuelve a las tablas planas de 0002 (sin created_at), conservando filas.
+    """
+    op.execute("ALTER TABLE exercise_option RENAME TO exercise_option_partitioned")
+    op.execute("ALTER TABLE exercise RENAME TO exercise_partitioned")
+    op.execute(
+        "ALTER TABLE exercise_option_partitioned "
+        "RENAME CONSTRAINT exercise_option_pkey TO exercise_option_partitioned_pkey"
+    )
+    op.execute(
+        "ALTER TABLE exercise_partitioned "
+        "RENAME CONSTRAINT exercise_pkey TO exercise_partitioned_pkey"
+    )
+
+    op.execute(
+        """
+        CREATE TABLE exercise (
+            exercise_id integer NOT NULL
+                DEFAULT nextval('exercise_exercise_id_seq'::regclass),
+            category_id integer NOT NULL,
+            lexical_item_id integer NOT NULL,
+            option_order integer[] NOT NULL,
+            CONSTRAINT exercise_pkey PRIMARY KEY (exercise_id),
+            CONSTRAINT exercise_category_id_fkey
+                FOREIGN KEY (category_id) REFERENCES category (category_id),
+            CONSTRAINT exercise_lexical_item_id_fkey
+                FOREIGN KEY (lexical_item_id)
+                REFERENCES lexical_item (lexical_item_id)
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE exercise_option (
+            exercise_id integer NOT NULL,
+            option_id integer NOT NULL,
+            text varchar NOT NULL,
+            is_correct boolean NOT NULL,
+            CONSTRAINT exercise_option_pkey PRIMARY KEY (exercise_id, option_id),
+            CONSTRAINT exercise_option_exercise_id_fkey
+                FOREIGN KEY (exercise_id) REFERENCES exercise (exercise_id)
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE exercise_exercise_id_seq OWNED BY exercise.exercise_id")
+
+    op.execute(
+        "INSERT INTO exercise (exercise_id, category_id, lexical_item_id, option_order) "
+        "SELECT exercise_id, category_id, lexical_item_id, option_order "
+        "FROM exercise_partitioned"
+    )
+    op.execute(
+        "INSERT INTO exercise_option (exercise_id, option_id, text, is_correct) "
+        "SELECT exercise_id, option_id, text, is_correct "
+        "FROM exercise_option_partitioned"
+    )
+
+    # Borra también todas las particiones
+    op.execute("DROP TABLE exercise_option_partitioned")
+    op.execute("DROP TABLE exercise_partitioned")
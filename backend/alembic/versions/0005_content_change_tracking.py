@@ -0,0 +1,86 @@
+from alembic import op
+
+# Revisiones
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Registro de cambios de contenido (category / lexical_item) para
+    /content/bundle y /content/bundle/delta.
+
+    - content_change: una fila por INSERT/UPDATE/DELETE (triggers por fila).
+      change_id es la versión de contenido: la versión actual es
+      MAX(change_id) y un delta son las filas con change_id > since.
+    - Un UPDATE que cambia la clave se registra como borrado de la antigua
+      + alta de la nueva. TRUNCATE no se registra.
+    - Las filas existentes se registran como altas, así la versión
+      inicial es > 0 y cubre el contenido de 0003.
+    """
+    op.execute(
+        """
+        CREATE TABLE content_change (
+            change_id bigserial PRIMARY KEY,
+            entity varchar(16) NOT NULL,
+            entity_id integer NOT NULL,
+            deleted boolean NOT NULL,
+            changed_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
+    # TG_ARGV[0]: columna clave de la tabla (category_id / lexical_item_id)
+    op.execute(
+        """
+        CREATE FUNCTION record_content_change() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            old_id integer;
+            new_id integer;
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                old_id := (to_jsonb(OLD) ->> TG_ARGV[0])::integer;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                new_id := (to_jsonb(NEW) ->> TG_ARGV[0])::integer;
+            END IF;
+
+            IF old_id IS NOT NULL AND old_id IS DISTINCT FROM new_id THEN
+                INSERT INTO content_change (entity, entity_id, deleted)
+                VALUES (TG_TABLE_NAME, old_id, true);
+            END IF;
+            IF new_id IS NOT NULL THEN
+                INSERT INTO content_change (entity, entity_id, deleted)
+                VALUES (TG_TABLE_NAME, new_id, false);
+            END IF;
+            RETURN NULL;
+        END;
+        $$
+        """
+    )
+    for table, key in (("category", "category_id"), ("lexical_item", "lexical_item_id")):
+        op.execute(
+            f"CREATE TRIGGER {table}_content_change "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION record_content_change('{key}')"
+        )
+
+    op.execute(
+        "INSERT INTO content_change (entity, entity_id, deleted) "
+        "SELECT 'category', category_id, false FROM category "
+        "ORDER BY category_id"
+    )
+    op.execute(
+        "INSERT INTO content_change (entity, entity_id, deleted) "
+        "SELECT 'lexical_item', lexical_item_id, false FROM lexical_item "
+        "ORDER BY lexical_item_id"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER lexical_item_content_change ON lexical_item")
+    op.execute("DROP TRIGGER category_content_change ON category")
+    op.execute("DROP FUNCTION record_content_change()")
+    op.execute("DROP TABLE content_change")
@@ -0,0 +1,38 @@
+from alembic import op
+
+# Revisiones
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Ejercicios con semilla (EXERCISE_SEEDED): exercise guarda la semilla y
+    la versión de contenido de la categoría, y sus opciones no se escriben
+    en exercise_option.
+
+    - Columnas nullables: los ejercicios existentes (y los generados sin
+      EXERCISE_SEEDED) siguen teniendo seed NULL y sus filas de opciones.
+    - ALTER TABLE sobre la tabla particionada se propaga a las particiones;
+      sin DEFAULT no reescribe filas.
+    """
+    op.execute(
+        "ALTER TABLE exercise "
+        "ADD COLUMN seed bigint, "
+        "ADD COLUMN content_version integer"
+    )
+
+
+def downgrade() -> None:
+    """
+    Los ejercicios con semilla no tienen filas de opciones: se borran
+    antes de quitar las columnas (no se podrían validar).
+    """
+    op.execute("DELETE FROM exercise WHERE seed IS NOT NULL")
+    op.execute(
+        "ALTER TABLE exercise "
+        "DROP COLUMN content_version, "
+        "DROP COLUMN seed"
+    )
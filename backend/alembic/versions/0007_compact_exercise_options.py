@@ -0,0 +1,121 @@
+from alembic import op
+
+# Revisiones
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Opciones compactas: exercise guarda el lexical_item_id de sus 5
+    opciones (option_item_ids[option_id]) y el option_id de la correcta;
+    el texto se resuelve contra lexical_item al leer. Un ejercicio nuevo
+    es una sola fila (antes 1 + 5 filas exercise_option con el texto
+    copiado, cada una con su entrada en el índice de la PK).
+
+    - Columnas nullables + CHECK de longitud fija (5) y rango de la
+      correcta. Sin DEFAULT: el ALTER no reescribe las particiones.
+    - Backfill: cada opción existente se resuelve por texto dentro de la
+      categoría del ejercicio. Solo se convierten los ejercicios cuyas 5
+      opciones resuelven a un único lexical_item, con una sola correcta
+      que coincide con exercise.lexical_item_id; sus filas exercise_option
+      se borran. El resto (textos repetidos o items borrados) conserva sus
+      filas y /exercise/validate las sigue leyendo.
+    """
+    op.execute(
+        "ALTER TABLE exercise "
+        "ADD COLUMN option_item_ids integer[], "
+        "ADD COLUMN correct_option_id smallint, "
+        "ADD CONSTRAINT exercise_compact_options_check CHECK ("
+        "option_item_ids IS NULL OR ("
+        "cardinality(option_item_ids) = 5 "
+        "AND correct_option_id BETWEEN 1 AND 5))"
+    )
+
+    op.execute(
+        """
+        WITH unique_text AS (
+            SELECT category_id, text, min(lexical_item_id) AS lexical_item_id
+            FROM lexical_item
+            GROUP BY category_id, text
+            HAVING count(*) = 1
+        ),
+        resolved AS (
+            SELECT o.exercise_id,
+                   o.created_at,
+                   array_agg(t.lexical_item_id ORDER BY o.option_id) AS item_ids,
+                   array_agg(o.option_id ORDER BY o.option_id) AS option_ids,
+                   min(o.option_id) FILTER (WHERE o.is_correct) AS correct,
+                   count(*) FILTER (WHERE o.is_correct) AS n_correct,
+                   count(t.lexical_item_id) AS n_resolved
+            FROM exercise_option o
+            JOIN exercise e
+              ON e.exercise_id = o.exercise_id AND e.created_at = o.created_at
+            LEFT JOIN unique_text t
+              ON t.category_id = e.category_id AND t.text = o.text
+            GROUP BY o.exercise_id, o.created_at
+        )
+        UPDATE exercise e
+        SET option_item_ids = r.item_ids,
+            correct_option_id = r.correct
+        FROM resolved r
+        WHERE e.exercise_id = r.exercise_id
+          AND e.created_at = r.created_at
+          AND r.option_ids = ARRAY[1, 2, 3, 4, 5]
+          AND r.n_resolved = 5
+          AND r.n_correct = 1
+          AND r.item_ids[r.correct] = e.lexical_item_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM exercise_option o
+        USING exercise e
+        WHERE e.exercise_id = o.exercise_id
+          AND e.created_at = o.created_at
+          AND e.option_item_ids IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    """
+    Vuelve a escribir las filas exercise_option de los ejercicios compactos
+    con el texto actual de cada item. Un ejercicio con algún item ya
+    borrado se elimina (no se podría validar).
+    """
+    op.execute(
+        """
+        DELETE FROM exercise e
+        WHERE e.option_item_ids IS NOT NULL
+          AND EXISTS (
+              SELECT 1
+              FROM unnest(e.option_item_ids) AS o(lexical_item_id)
+              LEFT JOIN lexical_item li USING (lexical_item_id)
+              WHERE li.lexical_item_id IS NULL
+          )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO exercise_option (exercise_id, option_id, text, is_correct, created_at)
+        SELECT e.exercise_id,
+               o.option_id,
+               li.text,
+               o.option_id = e.correct_option_id,
+               e.created_at
+        FROM exercise e
+        CROSS JOIN unnest(e.option_item_ids)
+            WITH ORDINALITY AS o(lexical_item_id, option_id)
+        JOIN lexical_item li ON li.lexical_item_id = o.lexical_item_id
+        WHERE e.option_item_ids IS NOT NULL
+        """
+    )
+    op.execute(
+        "ALTER TABLE exercise "
+        "DROP CONSTRAINT exercise_compact_options_check, "
+        "DROP COLUMN correct_option_id, "
+        "DROP COLUMN option_item_ids"
+    )
@@ -0,0 +1,64 @@
+from alembic import op
+
+# Revisiones
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# Clave del advisory lock de escritura de contenido (constante arbitraria)
+CONTENT_WRITE_LOCK = 5_110_000_016
+
+_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_content_change() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    old_id integer;
+    new_id integer;
+BEGIN
+    {lock}
+    IF TG_OP <> 'INSERT' THEN
+        old_id := (to_jsonb(OLD) ->> TG_ARGV[0])::integer;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        new_id := (to_jsonb(NEW) ->> TG_ARGV[0])::integer;
+    END IF;
+
+    IF old_id IS NOT NULL AND old_id IS DISTINCT FROM new_id THEN
+        INSERT INTO content_change (entity, entity_id, deleted)
+        VALUES (TG_TABLE_NAME, old_id, true);
+    END IF;
+    IF new_id IS NOT NULL THEN
+        INSERT INTO content_change (entity, entity_id, deleted)
+        VALUES (TG_TABLE_NAME, new_id, false);
+    END IF;
+    RETURN NULL;
+END;
+$$
+"""
+
+
+def upgrade() -> None:
+    """
+    Escrituras de contenido serializadas.
+
+    change_id sale de una secuencia, que asigna el valor al insertar y no
+    al confirmar: con dos escritores concurrentes el change_id 10 podía
+    confirmarse después del 11, y un dispositivo sincronizado en la
+    versión 11 (MAX(change_id)) no recibía nunca el cambio 10.
+
+    El trigger toma un advisory lock de transacción antes de pedir
+    change_id: el siguiente escritor espera a que el anterior confirme
+    (o deshaga), así que los change_id se hacen visibles en orden y
+    MAX(change_id) nunca salta uno pendiente. Volver a tomarlo en la
+    misma transacción (un trigger por fila) no cuesta nada. Las
+    escrituras de contenido son raras (carga/edición), no el camino de
+    /exercise/*.
+    """
+    op.execute(
+        _FUNCTION.format(lock=f"PERFORM pg_advisory_xact_lock({CONTENT_WRITE_LOCK});")
+    )
+
+
+def downgrade() -> None:
+    op.execute(_FUNCTION.format(lock=""))
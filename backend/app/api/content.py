@@ -1,18 +1,83 @@
 # backend/app/api/content.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from pydantic import TypeAdapter
 from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
 
-from app.core.db import SessionLocal
-from app.models.category import Category
-from app.models.lexical_item import LexicalItem
-from app.schemas.category import CategoryListResponse
-from app.schemas.lexical_item import LexicalItemListResponse
+from app.api.http_cache import (
+    bundle_response,
+    etag_matches,
+    not_modified,
+    set_cache_headers,
+)
+from app.api.serialization import (
+    EncodedBodyCache,
+    PydanticJSONResponse,
+    json_response,
+)
+from app.core.content_bundle import content_bundle_cache
+from app.core.config import get_settings
+from app.core.content_cache import content_cache
+from app.core.db import get_db
+from app.schemas.category import CategoryListDict, CategoryListResponse
+from app.schemas.content_bundle import ContentDeltaResponse
+from app.schemas.lexical_item import LexicalItemListDict, LexicalItemListResponse
 
 router = APIRouter()
 
+# TypedDict con la forma de response_model: validar no instancia modelos
+_CATEGORIES_ADAPTER = TypeAdapter(CategoryListDict)
+_ITEMS_ADAPTER = TypeAdapter(LexicalItemListDict)
+DELTA_RESPONSE_ADAPTER = TypeAdapter(ContentDeltaResponse)
+
+# Cuerpos JSON ya serializados por ETag de snapshot (listado + categorías)
+content_bodies = EncodedBodyCache(
+    max_entries=get_settings().content_cache_max_categories + 1
+)
+
+
+def categories_body(snapshot) -> bytes:
+    return content_bodies.get_or_encode(
+        snapshot.etag,
+        _CATEGORIES_ADAPTER,
+        lambda: {
+            "categories": [
+                {"category_id": category_id, "name": name}
+                for category_id, name in snapshot.categories
+            ]
+        },
+    )
+
+
+def items_body(snapshot) -> bytes:
+    category_id = snapshot.category_id
+    return content_bodies.get_or_encode(
+        snapshot.etag,
+        _ITEMS_ADAPTER,
+        lambda: {
+            "items": [
+                {
+                    "lexical_item_id": item_id,
+                    "category_id": category_id,
+                    "text": text,
+                }
+                for item_id, text in zip(snapshot.item_ids, snapshot.texts)
+            ]
+        },
+    )
+
+
+def content_response(body: bytes, etag: str) -> PydanticJSONResponse:
+    response = PydanticJSONResponse(content=body)
+    set_cache_headers(response, etag)
+    return response
+
 
 @router.get("/categories", response_model=CategoryListResponse)
-def get_categories():
+def get_categories(
+    db: Session = Depends(get_db),
+    if_none_match: str | None = Header(default=None),
+):
     """
     GET /content/categories
 
@@ -23,23 +88,30 @@ def get_categories():
         { "category_id": 2, "name": "Reunión de trabajo" }
       ]
     }
+
+    Lleva ETag + Cache-Control; con If-None-Match coincidente responde
+    304 sin cuerpo (y sin consultar la BD si el listado está en caché).
+    El cuerpo JSON se serializa una vez por versión del listado.
     """
-    db = SessionLocal()
     try:
-        categories = db.query(Category).all()
-        return {"categories": categories}
+        snapshot = content_cache.get_categories(db)
+        if etag_matches(if_none_match, snapshot.etag):
+            return not_modified(snapshot.etag)
+        return content_response(categories_body(snapshot), snapshot.etag)
     except Exception:
         # Se mantiene internal_error como en MP-API-01
         raise HTTPException(status_code=500, detail="internal_error")
-    finally:
-        db.close()
 
 
 @router.get(
     "/items/{category_id}",
     response_model=LexicalItemListResponse,
 )
-def get_items(category_id: int):
+def get_items(
+    category_id: int,
+    db: Session = Depends(get_db),
+    if_none_match: str | None = Header(default=None),
+):
     """
     GET /content/items/{category_id}
 
@@ -54,43 +126,117 @@ def get_items(category_id: int):
     Errores normativos:
       - { "error": "category_not_found" }
       - { "error": "insufficient_items" }
+
+    El 200 lleva ETag (hash del contenido de la categoría) y Cache-Control;
+    con If-None-Match coincidente se responde 304 sin cuerpo.
     """
-    db = SessionLocal()
     try:
-        # 1) Verificar existencia de la categoría
-        category = (
-            db.query(Category)
-            .filter(Category.category_id == category_id)
-            .first()
-        )
-        if category is None:
+        # 1) Verificar existencia de la categoría (listado cacheado)
+        if not content_cache.has_category(db, category_id):
             # Error estándar de la ET: { "error": "category_not_found" }
             return JSONResponse(
                 status_code=404,
                 content={"error": "category_not_found"},
             )
 
-        # 2) Obtener items de la categoría
-        items = (
-            db.query(LexicalItem)
-            .filter(LexicalItem.category_id == category_id)
-            .all()
-        )
+        # 2) Obtener items de la categoría (snapshot cacheado)
+        snapshot = content_cache.get_items(db, category_id)
 
         # Regla mínima: si no hay items → insufficient_items
-        if not items:
+        if not snapshot.item_ids:
             return JSONResponse(
                 status_code=400,
                 content={"error": "insufficient_items"},
             )
 
-        # 3) Respuesta normativa
-        return {"items": items}
+        # 3) GET condicional: el cliente ya tiene esta versión
+        if etag_matches(if_none_match, snapshot.etag):
+            return not_modified(snapshot.etag)
+
+        # 4) Respuesta normativa (validada y serializada una vez por snapshot)
+        return content_response(items_body(snapshot), snapshot.etag)
     except Exception:
         # Error genérico interno
         return JSONResponse(
             status_code=500,
             content={"error": "internal_error"},
         )
-    finally:
-        db.close()
+
+
+@router.get("/bundle")
+def get_bundle(
+    db: Session = Depends(get_db),
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+):
+    """
+    GET /content/bundle
+
+    Todo el contenido en una sola respuesta, para sembrar o re-sincronizar
+    la caché local (Room) de la app:
+
+    {
+      "version": 62,
+      "categories": [ { "category_id": 1, "name": "..." } ],
+      "items": [ { "lexical_item_id": 1, "category_id": 1, "text": "..." } ]
+    }
+
+    Comprimido con gzip si el cliente lo admite (Accept-Encoding). El
+    ETag depende de la versión: con If-None-Match coincidente, 304.
+    Después, /content/bundle/delta?since=<version> trae solo los cambios.
+    """
+    try:
+        bundle = content_bundle_cache.get_bundle(db)
+        return bundle_response(bundle, if_none_match, accept_encoding)
+    except Exception:
+        return JSONResponse(
+            status_code=500,
+            content={"error": "internal_error"},
+        )
+
+
+@router.get("/bundle/delta", response_model=ContentDeltaResponse)
+def get_bundle_delta(
+    since: int = Query(...),
+    db: Session = Depends(get_db),
+):
+    """
+    GET /content/bundle/delta?since=<version>
+
+    Cambios desde la versión `since` (la de un bundle o delta anterior):
+
+    {
+      "version": 65,
+      "since": 62,
+      "categories": { "upserted": [...], "deleted": [3] },
+      "items": { "upserted": [...], "deleted": [17, 18] }
+    }
+
+    El cliente aplica altas de categorías, después altas y borrados de
+    items y por último borrados de categorías (FK de lexical_item), y
+    guarda `version` para la siguiente llamada.
+
+    Errores:
+      - 400 { "error": "invalid_version" }  (since < 0 o mayor que la actual)
+      - 500 { "error": "internal_error" }
+    """
+    try:
+        delta = content_bundle_cache.get_delta(db, since)
+        return json_response(
+            DELTA_RESPONSE_ADAPTER, DELTA_RESPONSE_ADAPTER.validate_python(delta)
+        )
+    except ValueError as e:
+        if str(e) == "invalid_version":
+            return JSONResponse(
+                status_code=400,
+                content={"error": "invalid_version"},
+            )
+        return JSONResponse(
+            status_code=500,
+            content={"error": "internal_error"},
+        )
+    except Exception:
+        return JSONResponse(
+            status_code=500,
+            content={"error": "internal_error"},
+        )
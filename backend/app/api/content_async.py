@@ -0,0 +1,131 @@
+# backend/app/api/content_async.py
+"""
+Variante async (ASYNC_DB) de los endpoints de app/api/content.py.
+
+Mismos contratos y errores normativos; la única diferencia es que las
+lecturas de contenido usan AsyncSession y no ocupan un hilo del threadpool.
+"""
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.content import (
+    DELTA_RESPONSE_ADAPTER,
+    categories_body,
+    content_response,
+    items_body,
+)
+from app.api.http_cache import bundle_response, etag_matches, not_modified
+from app.api.serialization import json_response
+from app.core.content_bundle import content_bundle_cache
+from app.core.content_cache import content_cache
+from app.core.db import get_async_db
+from app.schemas.category import CategoryListResponse
+from app.schemas.content_bundle import ContentDeltaResponse
+from app.schemas.lexical_item import LexicalItemListResponse
+
+router = APIRouter()
+
+
+@router.get("/categories", response_model=CategoryListResponse)
+async def get_categories(
+    db: AsyncSession = Depends(get_async_db),
+    if_none_match: str | None = Header(default=None),
+):
+    """
+    GET /content/categories (async). Ver app/api/content.py.
+    """
+    try:
+        snapshot = await content_cache.aget_categories(db)
+        if etag_matches(if_none_match, snapshot.etag):
+            return not_modified(snapshot.etag)
+        return content_response(categories_body(snapshot), snapshot.etag)
+    except Exception:
+        raise HTTPException(status_code=500, detail="internal_error")
+
+
+@router.get(
+    "/items/{category_id}",
+    response_model=LexicalItemListResponse,
+)
+async def get_items(
+    category_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    if_none_match: str | None = Header(default=None),
+):
+    """
+    GET /content/items/{category_id} (async). Ver app/api/content.py.
+    """
+    try:
+        if not await content_cache.ahas_category(db, category_id):
+            return JSONResponse(
+                status_code=404,
+                content={"error": "category_not_found"},
+            )
+
+        snapshot = await content_cache.aget_items(db, category_id)
+
+        if not snapshot.item_ids:
+            return JSONResponse(
+                status_code=400,
+                content={"error": "insufficient_items"},
+            )
+
+        if etag_matches(if_none_match, snapshot.etag):
+            return not_modified(snapshot.etag)
+
+        return content_response(items_body(snapshot), snapshot.etag)
+    except Exception:
+        return JSONResponse(
+            status_code=500,
+            content={"error": "internal_error"},
+        )
+
+
+@router.get("/bundle")
+async def get_bundle(
+    db: AsyncSession = Depends(get_async_db),
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+):
+    """
+    GET /content/bundle (async). Ver app/api/content.py.
+    """
+    try:
+        bundle = await content_bundle_cache.aget_bundle(db)
+        return bundle_response(bundle, if_none_match, accept_encoding)
+    except Exception:
+        return JSONResponse(
+            status_code=500,
+            content={"error": "internal_error"},
+        )
+
+
+@router.get("/bundle/delta", response_model=ContentDeltaResponse)
+async def get_bundle_delta(
+    since: int = Query(...),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    GET /content/bundle/delta?since=<version> (async). Ver app/api/content.py.
+    """
+    try:
+        delta = await content_bundle_cache.aget_delta(db, since)
+        return json_response(
+            DELTA_RESPONSE_ADAPTER, DELTA_RESPONSE_ADAPTER.validate_python(delta)
+        )
+    except ValueError as e:
+        if str(e) == "invalid_version":
+            return JSONResponse(
+                status_code=400,
+                content={"error": "invalid_version"},
+            )
+        return JSONResponse(
+            status_code=500,
+            content={"error": "internal_error"},
+        )
+    except Exception:
+        return JSONResponse(
+            status_code=500,
+            content={"error": "internal_error"},
+        )
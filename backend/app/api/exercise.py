@@ -1,20 +1,64 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
 from sqlalchemy.orm import Session
 import logging
 
-from app.core.db import SessionLocal
-from app.models.category import Category
+from app.api.serialization import json_response
+from app.core.content_cache import content_cache
+from app.core.db import get_db
+from app.core.exercise_cache import recent_exercises
+from app.core.exercise_persistence import persist_exercises
+from app.core.exercise_pool import exercise_pool
 from app.core.exercise_service import ExerciseService
+from app.core.exercise_token import exercise_token_signer
+from app.core.exercise_writer import exercise_writer
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Tamaño máximo de un lote de /exercise/generate/batch
+MAX_BATCH_SIZE = 50
+# Categorías como máximo en una sesión mixta
+MAX_MIXED_CATEGORIES = 50
+# Clave opaca del cliente (dispositivo, sesión...) para su memoria de Modo B
+CLIENT_KEY_HEADER = "X-Client-Id"
+MAX_CLIENT_KEY_LENGTH = 128
+
 
 # ----- Request Schema -----
-class GenerateExerciseRequest(BaseModel):
+class CategoryWeight(BaseModel):
     category_id: int
+    # Peso de cada item de la categoría (relativo a las demás)
+    weight: float = Field(default=1.0, gt=0)
+
+
+class CategorySelection(BaseModel):
+    """
+    Una categoría (`category_id`) o una sesión mixta (`categories`, con
+    peso): exactamente una de las dos.
+    """
+
+    category_id: int | None = None
+    categories: list[CategoryWeight] | None = Field(
+        default=None, min_length=1, max_length=MAX_MIXED_CATEGORIES
+    )
+
+    @model_validator(mode="after")
+    def _one_category_source(self):
+        if (self.category_id is None) == (self.categories is None):
+            raise ValueError("exactly one of category_id or categories is required")
+        if self.categories is not None:
+            ids = [c.category_id for c in self.categories]
+            if len(set(ids)) != len(ids):
+                raise ValueError("categories must not repeat a category_id")
+        return self
+
+    def category_weights(self) -> list[tuple[int, float]]:
+        return [(c.category_id, c.weight) for c in self.categories]
+
+
+class GenerateExerciseRequest(CategorySelection):
     previous_lexical_item_id: int | None = None
 
 
@@ -28,83 +72,164 @@ class GenerateExerciseResponse(BaseModel):
     exercise_id: int
     prompt: str
     options: list[ExerciseOptionResponse]
+    # Solo con EXERCISE_TOKEN_SECRET: solución firmada para /exercise/validate
+    token: str | None = None
 
 
-@router.post("/generate", response_model=GenerateExerciseResponse)
-def generate_exercise(payload: GenerateExerciseRequest):
-    db: Session = SessionLocal()
+class GenerateExerciseBatchRequest(CategorySelection):
+    count: int = Field(ge=1, le=MAX_BATCH_SIZE)
 
-    try:
-        # 1. Verificar categoría existente
-        category = db.query(Category).filter(
-            Category.category_id == payload.category_id
-        ).first()
 
-        if category is None:
+class GenerateExerciseBatchResponse(BaseModel):
+    exercises: list[GenerateExerciseResponse]
+
+
+# El handler construye (y valida) el modelo una vez; el adapter solo serializa
+GENERATE_RESPONSE_ADAPTER = TypeAdapter(GenerateExerciseResponse)
+GENERATE_BATCH_RESPONSE_ADAPTER = TypeAdapter(GenerateExerciseBatchResponse)
+
+
+def get_client_key(
+    client_key: str | None = Header(
+        default=None, alias=CLIENT_KEY_HEADER, max_length=MAX_CLIENT_KEY_LENGTH
+    ),
+) -> str | None:
+    """
+    Clave del cliente para la memoria de Modo B (None = anónimo). El
+    servidor no la interpreta: solo separa las ventanas de no repetición.
+    """
+    return client_key or None
+
+
+def missing_category(categories, payload: CategorySelection) -> bool:
+    """
+    True si alguna categoría pedida no existe (→ 404 category_not_found).
+    `categories` es el listado cacheado (CategoryListSnapshot).
+    """
+    if payload.categories is None:
+        return not categories.has_category(payload.category_id)
+    return not all(categories.has_category(c.category_id) for c in payload.categories)
+
+
+def build_exercise_response(exercise) -> GenerateExerciseResponse:
+    """
+    Respuesta normativa a partir de un Exercise ya persistido
+    (exercise_id asignado y opciones cargadas en memoria).
+    """
+    correct_options = [o for o in exercise.options if o.is_correct]
+    if not correct_options:
+        raise RuntimeError("No correct option found")
+
+    token = None
+    if exercise_token_signer is not None:
+        token = exercise_token_signer.sign(
+            exercise.exercise_id,
+            [opt.option_id for opt in exercise.options],
+            correct_options[0].option_id,
+        )
+
+    return GenerateExerciseResponse(
+        exercise_id=exercise.exercise_id,
+        prompt=correct_options[0].text,
+        options=[
+            ExerciseOptionResponse(
+                option_id=opt.option_id,
+                text=opt.text
+            )
+            for opt in exercise.options
+        ],
+        token=token,
+    )
+
+
+@router.post(
+    "/generate",
+    response_model=GenerateExerciseResponse,
+    response_model_exclude_none=True,
+)
+def generate_exercise(
+    payload: GenerateExerciseRequest,
+    db: Session = Depends(get_db),
+    client_key: str | None = Depends(get_client_key),
+):
+    try:
+        # 1. Verificar categorías existentes (listado cacheado)
+        if missing_category(content_cache.get_categories(db), payload):
             return JSONResponse(
                 status_code=404,
                 content={"error": "category_not_found"}
             )
 
-        # 2. Generar ejercicio
-        try:
-            service = ExerciseService(db=db)   # <-- CORRECTO: instanciamos servicio
-            exercise = service.generate_exercise(
-                category_id=payload.category_id,
-                previous_lexical_item_id=payload.previous_lexical_item_id,
-            )
-
-        except ValueError as e:
-            if str(e) == "insufficient_items":
+        # Sesión mixta: sorteo ponderado de la categoría (tabla alias, O(1))
+        category_id = payload.category_id
+        if payload.categories is not None:
+            try:
+                category_id = ExerciseService(db=db).choose_category(
+                    payload.category_weights()
+                )
+            except ValueError as e:
+                if str(e) != "insufficient_items":
+                    raise
                 return JSONResponse(
                     status_code=400,
                     content={"error": "insufficient_items"}
                 )
-            logger.exception("Unhandled ValueError in ExerciseService")
-            return JSONResponse(
-                status_code=500,
-                content={"error": "internal_error"}
-            )
 
-        except Exception:
-            logger.exception("Unhandled exception in ExerciseService")
-            return JSONResponse(
-                status_code=500,
-                content={"error": "internal_error"}
-            )
+        # 2. Ejercicio pre-generado y ya persistido (EXERCISE_POOL), si hay
+        exercise = exercise_pool.take(
+            category_id, client_key, payload.previous_lexical_item_id
+        )
 
-        # 3. Persistir Exercise y Options
-        try:
-            db.add(exercise)
-            db.commit()
-            db.refresh(exercise)
-        except Exception:
-            logger.exception("Error persisting exercise")
-            db.rollback()
-            raise HTTPException(status_code=500, detail="internal_error")
+        if exercise is None:
+            # 3. Generar ejercicio en línea
+            try:
+                service = ExerciseService(db=db, client_key=client_key)
+                exercise = service.generate_exercise(
+                    category_id=category_id,
+                    previous_lexical_item_id=payload.previous_lexical_item_id,
+                )
+
+            except ValueError as e:
+                if str(e) == "insufficient_items":
+                    return JSONResponse(
+                        status_code=400,
+                        content={"error": "insufficient_items"}
+                    )
+                logger.exception("Unhandled ValueError in ExerciseService")
+                return JSONResponse(
+                    status_code=500,
+                    content={"error": "internal_error"}
+                )
+
+            except Exception:
+                logger.exception("Unhandled exception in ExerciseService")
+                return JSONResponse(
+                    status_code=500,
+                    content={"error": "internal_error"}
+                )
+
+            # Persistir Exercise y Options: write-behind si está activo y
+            # hay hueco; si no, en línea (INSERT ... RETURNING + INSERT
+            # multi-fila, sin refresh)
+            try:
+                if not exercise_writer.submit(db, [exercise]):
+                    persist_exercises(db, [exercise])
+                    db.commit()
+            except Exception:
+                logger.exception("Error persisting exercise")
+                db.rollback()
+                raise HTTPException(status_code=500, detail="internal_error")
+
+        recent_exercises.put_exercise(exercise)
 
         # 4. Construir respuesta normativa segura
         try:
-            correct_options = [o for o in exercise.options if o.is_correct]
-            if not correct_options:
-                raise RuntimeError("No correct option found")
-
-            prompt_text = correct_options[0].text
-
-            response = GenerateExerciseResponse(
-                exercise_id=exercise.exercise_id,
-                prompt=prompt_text,
-                options=[
-                    ExerciseOptionResponse(
-                        option_id=opt.option_id,
-                        text=opt.text
-                    )
-                    for opt in exercise.options
-                ],
+            return json_response(
+                GENERATE_RESPONSE_ADAPTER,
+                build_exercise_response(exercise),
+                exclude_none=True,
             )
 
-            return response
-
         except Exception:
             logger.exception("Error building response for exercise")
             raise HTTPException(status_code=500, detail="internal_error")
@@ -116,5 +241,81 @@ def generate_exercise(payload: GenerateExerciseRequest):
             content={"error": "internal_error"}
         )
 
-    finally:
-        db.close()
+
+@router.post(
+    "/generate/batch",
+    response_model=GenerateExerciseBatchResponse,
+    response_model_exclude_none=True,
+)
+def generate_exercise_batch(
+    payload: GenerateExerciseBatchRequest,
+    db: Session = Depends(get_db),
+    client_key: str | None = Depends(get_client_key),
+):
+    """
+    POST /exercise/generate/batch
+
+    Genera `count` ejercicios de una categoría en una sola llamada:
+    una carga de items, Modo B entre ejercicios consecutivos del lote y
+    una única transacción para todos los Exercise + ExerciseOption.
+    Con `categories` (sesión mixta) cada ejercicio sortea su categoría
+    según los pesos; los snapshots que falten se cargan con una consulta.
+
+    Mismos errores normativos que /exercise/generate:
+      - 404 { "error": "category_not_found" }
+      - 400 { "error": "insufficient_items" }
+      - 500 { "error": "internal_error" }
+    """
+    try:
+        if missing_category(content_cache.get_categories(db), payload):
+            return JSONResponse(
+                status_code=404,
+                content={"error": "category_not_found"}
+            )
+
+        try:
+            service = ExerciseService(db=db, client_key=client_key)
+            if payload.categories is not None:
+                exercises = service.generate_mixed_exercises(
+                    payload.category_weights(), payload.count
+                )
+            else:
+                exercises = service.generate_exercises(
+                    category_id=payload.category_id,
+                    count=payload.count,
+                )
+        except ValueError as e:
+            if str(e) == "insufficient_items":
+                return JSONResponse(
+                    status_code=400,
+                    content={"error": "insufficient_items"}
+                )
+            logger.exception("Unhandled ValueError in ExerciseService (batch)")
+            return JSONResponse(
+                status_code=500,
+                content={"error": "internal_error"}
+            )
+
+        # Todo el lote en una transacción: 2 INSERT (exercise RETURNING +
+        # exercise_option multi-fila) sea cual sea count. Con write-behind
+        # el lote entra entero en la cola o se persiste en línea.
+        if not exercise_writer.submit(db, exercises):
+            persist_exercises(db, exercises)
+            db.commit()
+        for exercise in exercises:
+            recent_exercises.put_exercise(exercise)
+        return json_response(
+            GENERATE_BATCH_RESPONSE_ADAPTER,
+            GenerateExerciseBatchResponse(
+                exercises=[build_exercise_response(e) for e in exercises]
+            ),
+            exclude_none=True,
+        )
+
+    except Exception:
+        logger.exception("Unhandled exception in /exercise/generate/batch")
+        db.rollback()
+        return JSONResponse(
+            status_code=500,
+            content={"error": "internal_error"}
+        )
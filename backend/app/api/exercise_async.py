@@ -0,0 +1,180 @@
+# backend/app/api/exercise_async.py
+"""
+Variante async (ASYNC_DB) de POST /exercise/generate.
+
+Reutiliza los esquemas de app/api/exercise.py y la lógica de selección de
+ExerciseService; solo la E/S contra PostgreSQL es async.
+"""
+import logging
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.exercise import (
+    GENERATE_BATCH_RESPONSE_ADAPTER,
+    GENERATE_RESPONSE_ADAPTER,
+    GenerateExerciseBatchRequest,
+    GenerateExerciseBatchResponse,
+    GenerateExerciseRequest,
+    GenerateExerciseResponse,
+    build_exercise_response,
+    get_client_key,
+    missing_category,
+)
+from app.api.serialization import json_response
+from app.core.content_cache import content_cache
+from app.core.db import get_async_db
+from app.core.exercise_cache import recent_exercises
+from app.core.exercise_persistence import apersist_exercises
+from app.core.exercise_pool import exercise_pool
+from app.core.exercise_service import ExerciseService
+from app.core.exercise_writer import exercise_writer
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.post(
+    "/generate",
+    response_model=GenerateExerciseResponse,
+    response_model_exclude_none=True,
+)
+async def generate_exercise(
+    payload: GenerateExerciseRequest,
+    db: AsyncSession = Depends(get_async_db),
+    client_key: str | None = Depends(get_client_key),
+):
+    try:
+        # 1. Verificar categorías existentes
+        if missing_category(await content_cache.aget_categories(db), payload):
+            return JSONResponse(
+                status_code=404,
+                content={"error": "category_not_found"}
+            )
+
+        # Sesión mixta: sorteo ponderado de la categoría (tabla alias, O(1))
+        category_id = payload.category_id
+        if payload.categories is not None:
+            try:
+                category_id = await ExerciseService(db=db).achoose_category(
+                    payload.category_weights()
+                )
+            except ValueError as e:
+                if str(e) != "insufficient_items":
+                    raise
+                return JSONResponse(
+                    status_code=400,
+                    content={"error": "insufficient_items"}
+                )
+
+        # 2. Ejercicio pre-generado y ya persistido (EXERCISE_POOL), si hay
+        exercise = exercise_pool.take(
+            category_id, client_key, payload.previous_lexical_item_id
+        )
+
+        if exercise is None:
+            # 3. Generar y persistir en línea (write-behind o INSERT)
+            try:
+                service = ExerciseService(db=db, client_key=client_key)
+                exercise = await service.agenerate_exercise(
+                    category_id=category_id,
+                    previous_lexical_item_id=payload.previous_lexical_item_id,
+                )
+            except ValueError as e:
+                if str(e) == "insufficient_items":
+                    return JSONResponse(
+                        status_code=400,
+                        content={"error": "insufficient_items"}
+                    )
+                logger.exception("Unhandled ValueError in ExerciseService")
+                return JSONResponse(
+                    status_code=500,
+                    content={"error": "internal_error"}
+                )
+
+            if not await exercise_writer.asubmit(db, [exercise]):
+                await apersist_exercises(db, [exercise])
+                await db.commit()
+        recent_exercises.put_exercise(exercise)
+
+        # 4. Construir respuesta normativa
+        return json_response(
+            GENERATE_RESPONSE_ADAPTER,
+            build_exercise_response(exercise),
+            exclude_none=True,
+        )
+
+    except Exception:
+        logger.exception("Unhandled exception in async /exercise/generate")
+        await db.rollback()
+        return JSONResponse(
+            status_code=500,
+            content={"error": "internal_error"}
+        )
+
+
+@router.post(
+    "/generate/batch",
+    response_model=GenerateExerciseBatchResponse,
+    response_model_exclude_none=True,
+)
+async def generate_exercise_batch(
+    payload: GenerateExerciseBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    client_key: str | None = Depends(get_client_key),
+):
+    """
+    POST /exercise/generate/batch (async). Ver app/api/exercise.py.
+    """
+    try:
+        if missing_category(await content_cache.aget_categories(db), payload):
+            return JSONResponse(
+                status_code=404,
+                content={"error": "category_not_found"}
+            )
+
+        try:
+            service = ExerciseService(db=db, client_key=client_key)
+            if payload.categories is not None:
+                exercises = await service.agenerate_mixed_exercises(
+                    payload.category_weights(), payload.count
+                )
+            else:
+                exercises = await service.agenerate_exercises(
+                    category_id=payload.category_id,
+                    count=payload.count,
+                )
+        except ValueError as e:
+            if str(e) == "insufficient_items":
+                return JSONResponse(
+                    status_code=400,
+                    content={"error": "insufficient_items"}
+                )
+            logger.exception("Unhandled ValueError in ExerciseService (batch)")
+            return JSONResponse(
+                status_code=500,
+                content={"error": "internal_error"}
+            )
+
+        # Una única transacción para todo el lote (o write-behind)
+        if not await exercise_writer.asubmit(db, exercises):
+            await apersist_exercises(db, exercises)
+            await db.commit()
+        for exercise in exercises:
+            recent_exercises.put_exercise(exercise)
+        return json_response(
+            GENERATE_BATCH_RESPONSE_ADAPTER,
+            GenerateExerciseBatchResponse(
+                exercises=[build_exercise_response(e) for e in exercises]
+            ),
+            exclude_none=True,
+        )
+
+    except Exception:
+        logger.exception("Unhandled exception in async /exercise/generate/batch")
+        await db.rollback()
+        return JSONResponse(
+            status_code=500,
+            content={"error": "internal_error"}
+        )
@@ -0,0 +1,86 @@
+# backend/app/api/export.py
+"""
+Exportación NDJSON para analítica (ver app/core/export.py).
+
+Solo se monta con EXPORT_TOKEN definido: incluye la opción correcta de
+cada ejercicio, así que exige `Authorization: Bearer <EXPORT_TOKEN>`.
+Usa el engine síncrono también con ASYNC_DB (la respuesta se itera en
+el threadpool).
+"""
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core.config import get_settings
+from app.core.db import get_engine
+from app.core.export import EXPORTS, stream_ndjson
+
+router = APIRouter()
+
+_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _authorized(authorization: Optional[str]) -> bool:
+    token = get_settings().export_token
+    scheme, _, credentials = (authorization or "").partition(" ")
+    return (
+        token is not None
+        and scheme.lower() == "bearer"
+        and hmac.compare_digest(credentials.encode(), token.encode())
+    )
+
+
+def _export(what: str, authorization, category_id, min_id, max_id):
+    if not _authorized(authorization):
+        return JSONResponse(status_code=401, content={"error": "unauthorized"})
+    if min_id is not None and max_id is not None and min_id > max_id:
+        return JSONResponse(status_code=400, content={"error": "invalid_range"})
+    build_query, to_lines = EXPORTS[what]
+    return StreamingResponse(
+        stream_ndjson(
+            get_engine(),
+            build_query(category_id, min_id, max_id),
+            to_lines,
+            yield_per=get_settings().export_yield_per,
+        ),
+        media_type=_MEDIA_TYPE,
+    )
+
+
+@router.get("/exercises")
+def export_exercises(
+    category_id: Optional[int] = Query(default=None),
+    min_id: Optional[int] = Query(default=None),
+    max_id: Optional[int] = Query(default=None),
+    authorization: Optional[str] = Header(default=None),
+):
+    """
+    GET /export/exercises
+
+    Un ejercicio por línea con sus 5 opciones, ordenados por exercise_id.
+    Filtros opcionales: category_id y rango [min_id, max_id] de exercise_id.
+
+    Errores:
+      - 401 { "error": "unauthorized" }   (falta o no coincide EXPORT_TOKEN)
+      - 400 { "error": "invalid_range" }  (min_id > max_id)
+    """
+    return _export("exercises", authorization, category_id, min_id, max_id)
+
+
+@router.get("/content")
+def export_content(
+    category_id: Optional[int] = Query(default=None),
+    min_id: Optional[int] = Query(default=None),
+    max_id: Optional[int] = Query(default=None),
+    authorization: Optional[str] = Header(default=None),
+):
+    """
+    GET /export/content
+
+    Un lexical_item por línea con su categoría. Filtros opcionales:
+    category_id y rango [min_id, max_id] de lexical_item_id.
+    Mismos errores que /export/exercises.
+    """
+    return _export("content", authorization, category_id, min_id, max_id)
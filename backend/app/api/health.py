@@ -0,0 +1,103 @@
+# backend/app/api/health.py
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from app.api.content import content_bodies
+from app.core.category_sampler import category_sampler
+from app.core.content_bundle import content_bundle_cache
+from app.core.content_cache import content_cache
+from app.core.db import get_pool_stats
+from app.core.exercise_cache import recent_exercises
+from app.core.exercise_memory import ephemeral_memory
+from app.core.exercise_pool import exercise_pool
+from app.core.exercise_writer import exercise_writer
+from app.core.warmup import warmup
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def get_live():
+    """
+    GET /health/live
+
+    Liveness: el proceso responde. No toca la BD (un corte de BD no debe
+    hacer que el orquestador reinicie los workers).
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def get_ready(request: Request):
+    """
+    GET /health/ready
+
+    Readiness: 200 cuando el calentamiento (pool y cachés) de ESTE worker
+    ha terminado; 503 {"error": "not_ready"} mientras no, y
+    {"error": "draining"} durante el apagado. Si el calentamiento del
+    arranque falló, cada sondeo lo reintenta.
+    """
+    if warmup.draining:
+        return JSONResponse(status_code=503, content={"error": "draining"})
+    if not await warmup.arun(request.app.state.async_db):
+        return JSONResponse(status_code=503, content={"error": "not_ready"})
+    return {"status": "ready", **warmup.stats()}
+
+
+@router.get("/pool")
+def get_pool():
+    """
+    GET /health/pool
+
+    Estado en vivo de los pools de conexiones de ESTE worker:
+    tamaño, checked_in/checked_out, overflow y contadores de checkout
+    (esperas por pool agotado, tiempo acumulado/máximo y timeouts).
+
+    Con varios workers de uvicorn cada uno tiene su propio pool; el campo
+    "pid" identifica el worker que respondió.
+    """
+    return get_pool_stats()
+
+
+@router.get("/caches")
+def get_caches():
+    """
+    GET /health/caches
+
+    Contadores de las cachés en proceso de ESTE worker: contenido
+    (snapshots por categoría y sus cuerpos JSON ya serializados), bundle
+    de contenido, ejercicios recientes de /exercise/validate, tablas
+    alias de las sesiones mixtas y memoria de Modo B (ventanas por
+    cliente y categoría, con sus expulsiones y caducidades).
+    """
+    return {
+        "content": content_cache.stats(),
+        "content_bodies": content_bodies.stats(),
+        "content_bundle": content_bundle_cache.stats(),
+        "recent_exercises": recent_exercises.stats(),
+        "category_sampler": category_sampler.stats(),
+        "modo_b_memory": ephemeral_memory.stats(),
+    }
+
+
+@router.get("/write-behind")
+def get_write_behind():
+    """
+    GET /health/write-behind
+
+    Cola de persistencia diferida de ESTE worker: pendientes, lotes
+    escritos, rechazos por cola llena (backpressure) y errores de flush.
+    """
+    return exercise_writer.stats()
+
+
+@router.get("/exercise-pool")
+def get_exercise_pool():
+    """
+    GET /health/exercise-pool
+
+    Pools de ejercicios pre-generados de ESTE worker: profundidad por
+    categoría, entregas desde el pool (hits) o en línea (misses),
+    saltos por Modo B, rellenos y errores de relleno.
+    """
+    return exercise_pool.stats()
@@ -0,0 +1,94 @@
+# backend/app/api/http_cache.py
+"""
+GET condicional (ETag / If-None-Match) para los endpoints de contenido.
+
+El ETag es el hash de contenido del snapshot de ContentCache: si el
+snapshot está en memoria, un 304 se responde sin tocar la BD ni serializar.
+"""
+from typing import Optional
+
+from fastapi import Response
+
+from app.core.config import get_settings
+
+_CACHE_CONTROL = f"public, max-age={get_settings().content_http_max_age_seconds}"
+
+
+def quote_etag(etag: str) -> str:
+    return f'"{etag}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Comparación débil de If-None-Match (RFC 9110, 13.1.2): admite lista
+    separada por comas, prefijo W/ y "*".
+    """
+    if not if_none_match:
+        return False
+    quoted = quote_etag(etag)
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == quoted:
+            return True
+    return False
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    response.headers["ETag"] = quote_etag(etag)
+    response.headers["Cache-Control"] = _CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """
+    304 sin cuerpo, con los mismos ETag / Cache-Control que el 200.
+    """
+    response = Response(status_code=304)
+    set_cache_headers(response, etag)
+    return response
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    True si Accept-Encoding admite gzip (con q distinto de 0).
+    """
+    for candidate in (accept_encoding or "").split(","):
+        coding, _, params = candidate.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        q = params.strip().lower()
+        if q.startswith("q="):
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def bundle_response(
+    bundle, if_none_match: Optional[str], accept_encoding: Optional[str]
+) -> Response:
+    """
+    Respuesta de /content/bundle: el JSON ya serializado del bundle, en
+    gzip si el cliente lo admite. Cada codificación tiene su propio ETag
+    (son representaciones distintas) y ambas llevan Vary: Accept-Encoding.
+    """
+    if accepts_gzip(accept_encoding):
+        etag, body = f"{bundle.etag}-gzip", bundle.gzipped
+        headers = {"Content-Encoding": "gzip"}
+    else:
+        etag, body, headers = bundle.etag, bundle.body, {}
+
+    if etag_matches(if_none_match, etag):
+        response = not_modified(etag)
+    else:
+        response = Response(
+            content=body, media_type="application/json", headers=headers
+        )
+        set_cache_headers(response, etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
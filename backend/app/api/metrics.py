@@ -0,0 +1,137 @@
+# backend/app/api/metrics.py
+import json
+import time
+
+from fastapi import APIRouter, Response
+
+from app.core.metrics import (
+    http_errors,
+    http_request_db_queries,
+    http_request_duration,
+    http_requests,
+    metrics,
+)
+from app.core.query_budget import recording
+
+router = APIRouter()
+
+# Content-Type del formato de texto de Prometheus
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+# Los cuerpos de error normativos son {"error": "<código>"}: con unos
+# pocos bytes basta; no se acumulan cuerpos grandes
+_MAX_ERROR_BODY = 1024
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    GET /metrics
+
+    Métricas de ESTE worker en formato de texto de Prometheus: requests y
+    latencia por ruta, errores por código normativo, sentencias SQL por
+    engine/operación y estado de los pools de conexiones.
+    """
+    return Response(content=metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def error_code(status: int, body: bytes) -> str:
+    """
+    Código normativo de una respuesta de error ({"error": "..."});
+    si el cuerpo no lo trae (404 de ruta, 422 de FastAPI...), http_<status>.
+    """
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None
+    if isinstance(payload, dict) and isinstance(payload.get("error"), str):
+        return payload["error"]
+    return f"http_{status}"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI (sin BaseHTTPMiddleware: no copia el cuerpo ni crea
+    tareas) que mide cada request HTTP.
+
+    - route: plantilla de la ruta (/content/items/{category_id}), así la
+      cardinalidad está acotada; "unmatched" si ninguna ruta coincide.
+    - Solo en respuestas >= 400 se guarda el cuerpo (hasta 1 KiB) para
+      sacar el código de error.
+    - Una excepción no controlada cuenta como 500 "unhandled_exception".
+    - Las sentencias SQL del request se cuentan con query_budget.recording()
+      (los engines necesitan query_budget.install()).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # id(route) → plantilla completa (con el prefijo del router)
+        self._templates: dict[int, str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        error_body = None
+
+        async def send_wrapper(message):
+            nonlocal status, error_body
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if status >= 400:
+                    error_body = bytearray()
+            elif (
+                message["type"] == "http.response.body"
+                and error_body is not None
+                and len(error_body) < _MAX_ERROR_BODY
+            ):
+                error_body += message.get("body", b"")
+            await send(message)
+
+        with recording() as queries:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception:
+                self._record(scope, 500, "unhandled_exception", started, queries)
+                raise
+
+        error = error_code(status, bytes(error_body)) if error_body is not None else None
+        self._record(scope, status, error, started, queries)
+
+    def _record(self, scope, status: int, error, started: float, queries) -> None:
+        elapsed = time.perf_counter() - started
+        method = scope["method"] if scope["method"] in _METHODS else "OTHER"
+        route = self._route_template(scope)
+        http_requests.inc((method, route, str(status)))
+        http_request_duration.observe((method, route), elapsed)
+        http_request_db_queries.observe((route,), queries.queries)
+        if error is not None:
+            http_errors.inc((route, error))
+
+    def _route_template(self, scope) -> str:
+        """
+        Plantilla de la ruta que atendió el request; "unmatched" si ninguna.
+
+        Si route.path ya lleva el prefijo de su router (casa con el path
+        completo), se usa tal cual. Las versiones de FastAPI que incluyen
+        los routers sin copiar sus rutas dejan route.path relativo
+        (/items/{category_id}): el prefijo es el tramo del path anterior a
+        lo que casa con route.path_regex, y se calcula una vez por ruta.
+        """
+        route = scope.get("route")
+        if route is None or not hasattr(route, "path_regex"):
+            return "unmatched"
+        template = self._templates.get(id(route))
+        if template is None:
+            path, template = scope["path"], route.path
+            if not route.path_regex.match(path):
+                for index in range(1, len(path)):
+                    if path[index] == "/" and route.path_regex.match(path[index:]):
+                        template = path[:index] + route.path
+                        break
+            self._templates[id(route)] = template
+        return template
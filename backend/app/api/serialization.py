@@ -0,0 +1,97 @@
+# backend/app/api/serialization.py
+"""
+Serialización JSON rápida de las respuestas.
+
+Cuando un handler devuelve un modelo o un dict, FastAPI lo vuelve a validar
+contra response_model (en los handlers síncronos, además, en otro salto al
+threadpool) y después lo serializa: un modelo construido a mano se valida
+dos veces. Aquí cada respuesta se valida una sola vez (al construir el
+modelo, o con un TypeAdapter precompilado) y se serializa a bytes con el
+núcleo Rust de pydantic (dump_json). El handler devuelve un Response ya
+renderizado, que FastAPI envía tal cual.
+
+response_model se mantiene en los decoradores: sigue describiendo el
+contrato en OpenAPI.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+class PydanticJSONResponse(Response):
+    """
+    Response con cuerpo JSON ya serializado (bytes).
+    """
+
+    media_type = "application/json"
+
+
+def json_response(
+    adapter: TypeAdapter,
+    value: Any,
+    *,
+    exclude_none: bool = False,
+    status_code: int = 200,
+) -> Response:
+    """
+    Serializa `value` (ya validado: un modelo construido por el handler)
+    con `adapter` y lo envuelve en un PydanticJSONResponse.
+    """
+    return PydanticJSONResponse(
+        content=adapter.dump_json(value, exclude_none=exclude_none),
+        status_code=status_code,
+    )
+
+
+class EncodedBodyCache:
+    """
+    LRU de cuerpos JSON ya serializados, por clave de contenido (el ETag
+    de un snapshot de ContentCache). El contenido de un snapshot no cambia,
+    así que su respuesta se valida y serializa una vez y después se envía
+    sin tocar pydantic.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._bodies: OrderedDict[str, bytes] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_encode(
+        self, key: str, adapter: TypeAdapter, build: Callable[[], Any]
+    ) -> bytes:
+        """
+        Cuerpo de `key`; si no está, valida build() con `adapter` (una vez)
+        y lo serializa.
+        """
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+                self.hits += 1
+                return body
+            self.misses += 1
+
+        body = adapter.dump_json(adapter.validate_python(build()))
+        if self.max_entries > 0:
+            with self._lock:
+                self._bodies[key] = body
+                self._bodies.move_to_end(key)
+                while len(self._bodies) > self.max_entries:
+                    self._bodies.popitem(last=False)
+        return body
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._bodies),
+                "max_entries": self.max_entries,
+                "bytes": sum(len(b) for b in self._bodies.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -1,9 +1,15 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.core.db import SessionLocal
+from app.api.serialization import json_response
+from app.core.db import get_db
+from app.core.exercise_cache import recent_exercises
+from app.core.exercise_service import SEEDED_OPTION_IDS, seeded_correct_option_id
+from app.core.exercise_writer import exercise_writer
+from app.core.exercise_token import ExerciseClaims, exercise_token_signer
 from app.models.exercise import Exercise
 from app.models.exercise_option import ExerciseOption
 
@@ -14,6 +20,8 @@ router = APIRouter()
 class ValidateExerciseRequest(BaseModel):
     exercise_id: int
     selected_option_id: int
+    # Token firmado devuelto por /exercise/generate (opcional)
+    token: str | None = None
 
 
 # ----- Response Schema -----
@@ -23,62 +31,142 @@ class ValidateExerciseResponse(BaseModel):
     score_delta: int
 
 
-@router.post("/validate", response_model=ValidateExerciseResponse)
-def validate_exercise(payload: ValidateExerciseRequest):
-    db: Session = SessionLocal()
+_VALIDATE_RESPONSE_ADAPTER = TypeAdapter(ValidateExerciseResponse)
+
+
+def claims_from_token(payload: ValidateExerciseRequest) -> ExerciseClaims | None:
+    """
+    Claims del token si es auténtico y corresponde a payload.exercise_id.
+    Si no hay token, el modo está desactivado o el token no es válido,
+    devuelve None y se valida contra la BD como siempre.
+    """
+    if payload.token is None or exercise_token_signer is None:
+        return None
+    claims = exercise_token_signer.verify(payload.token)
+    if claims is None or claims.exercise_id != payload.exercise_id:
+        return None
+    return claims
+
+
+def evaluate_selection(
+    payload: ValidateExerciseRequest,
+    option_ids,
+    correct_option_id: int | None,
+):
+    """
+    Regla de validación común (BD o token): errores normativos y score.
+    """
+    # Validación básica normativa
+    if payload.selected_option_id not in option_ids:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "invalid_option_id"}
+        )
 
-    try:
-        # Recuperar ejercicio
-        exercise = (
-            db.query(Exercise)
-            .filter(Exercise.exercise_id == payload.exercise_id)
-            .first()
+    if correct_option_id is None:
+        return JSONResponse(
+            status_code=500,
+            content={"error": "internal_error"}
         )
 
-        if exercise is None:
-            return JSONResponse(
-                status_code=404,
-                content={"error": "exercise_not_found"}
-            )
+    # Regla estrícta ET v1.4 — determinista
+    correct = (payload.selected_option_id == correct_option_id)
+    score_delta = 1 if correct else 0
 
-        # Recuperar opciones asociadas
-        options = (
-            db.query(ExerciseOption)
-            .filter(ExerciseOption.exercise_id == payload.exercise_id)
-            .all()
+    return json_response(
+        _VALIDATE_RESPONSE_ADAPTER,
+        ValidateExerciseResponse(
+            correct=correct,
+            correct_option_id=correct_option_id,
+            score_delta=score_delta,
+        ),
+    )
+
+
+def exercise_with_options(exercise_id: int):
+    """
+    Una sola consulta: el ejercicio y sus opciones. El outer join distingue
+    "no existe el ejercicio" (0 filas) de "existe sin filas de opciones"
+    (1 fila NULL), que es el caso normal desde 0007: opciones compactas en
+    la propia fila o ejercicio con semilla. Las filas exercise_option solo
+    quedan para ejercicios anteriores que la migración no pudo convertir.
+    """
+    return (
+        select(
+            Exercise.exercise_id,
+            Exercise.option_item_ids,
+            Exercise.correct_option_id,
+            Exercise.seed,
+            ExerciseOption.option_id,
+            ExerciseOption.is_correct,
         )
+        .outerjoin(ExerciseOption, ExerciseOption.exercise_id == Exercise.exercise_id)
+        .where(Exercise.exercise_id == exercise_id)
+    )
 
-        option_ids = [opt.option_id for opt in options]
-        correct_option = next((opt for opt in options if opt.is_correct), None)
 
-        # Validación básica normativa
-        if payload.selected_option_id not in option_ids:
-            return JSONResponse(
-                status_code=400,
-                content={"error": "invalid_option_id"}
-            )
+def evaluate_rows(payload: ValidateExerciseRequest, rows):
+    """
+    Valida a partir de las filas de exercise_with_options() y guarda el
+    resultado en la caché de ejercicios recientes para los siguientes intentos.
+    """
+    if not rows:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "exercise_not_found"}
+        )
 
-        if correct_option is None:
-            return JSONResponse(
-                status_code=500,
-                content={"error": "internal_error"}
+    first = rows[0]
+    if first.correct_option_id is not None:
+        # Opciones compactas: option_id = posición en option_item_ids
+        option_ids = tuple(range(1, len(first.option_item_ids) + 1))
+        correct_option_id = first.correct_option_id
+    elif first.seed is not None:
+        # Ejercicio con semilla: la correcta se recalcula en memoria
+        option_ids = SEEDED_OPTION_IDS
+        correct_option_id = seeded_correct_option_id(first.seed)
+    else:
+        # Compatibilidad: filas exercise_option (ejercicios anteriores a 0007)
+        option_ids = [row.option_id for row in rows if row.option_id is not None]
+        correct_option_id = next(
+            (row.option_id for row in rows if row.is_correct), None
+        )
+    if correct_option_id is not None:
+        recent_exercises.put(
+            ExerciseClaims(
+                exercise_id=payload.exercise_id,
+                option_ids=tuple(option_ids),
+                correct_option_id=correct_option_id,
             )
+        )
 
-        # Regla estrícta ET v1.4 — determinista
-        correct = (payload.selected_option_id == correct_option.option_id)
-        score_delta = 1 if correct else 0
+    return evaluate_selection(payload, option_ids, correct_option_id)
 
-        return ValidateExerciseResponse(
-            correct=correct,
-            correct_option_id=correct_option.option_id,
-            score_delta=score_delta,
+
+@router.post("/validate", response_model=ValidateExerciseResponse)
+def validate_exercise(
+    payload: ValidateExerciseRequest,
+    db: Session = Depends(get_db),
+):
+    try:
+        # 1) Token firmado, ejercicio reciente o aún en la cola de
+        #    write-behind: en memoria, sin consultas
+        claims = (
+            claims_from_token(payload)
+            or recent_exercises.get(payload.exercise_id)
+            or exercise_writer.get_pending(payload.exercise_id)
         )
+        if claims is not None:
+            return evaluate_selection(
+                payload, claims.option_ids, claims.correct_option_id
+            )
+
+        # 2) Fallo de caché: ejercicio + opciones en una sola consulta
+        rows = db.execute(exercise_with_options(payload.exercise_id)).all()
+        return evaluate_rows(payload, rows)
 
     except Exception:
         return JSONResponse(
             status_code=500,
             content={"error": "internal_error"}
         )
-
-    finally:
-        db.close()
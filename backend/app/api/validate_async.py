@@ -0,0 +1,50 @@
+# backend/app/api/validate_async.py
+"""
+Variante async (ASYNC_DB) de POST /exercise/validate.
+"""
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.validate import (
+    ValidateExerciseRequest,
+    ValidateExerciseResponse,
+    claims_from_token,
+    evaluate_rows,
+    evaluate_selection,
+    exercise_with_options,
+)
+from app.core.db import get_async_db
+from app.core.exercise_cache import recent_exercises
+from app.core.exercise_writer import exercise_writer
+
+router = APIRouter()
+
+
+@router.post("/validate", response_model=ValidateExerciseResponse)
+async def validate_exercise(
+    payload: ValidateExerciseRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        # 1) Token firmado, ejercicio reciente o aún en la cola de
+        #    write-behind: en memoria, sin consultas
+        claims = (
+            claims_from_token(payload)
+            or recent_exercises.get(payload.exercise_id)
+            or exercise_writer.get_pending(payload.exercise_id)
+        )
+        if claims is not None:
+            return evaluate_selection(
+                payload, claims.option_ids, claims.correct_option_id
+            )
+
+        # 2) Fallo de caché: ejercicio + opciones en una sola consulta
+        result = await db.execute(exercise_with_options(payload.exercise_id))
+        return evaluate_rows(payload, result.all())
+
+    except Exception:
+        return JSONResponse(
+            status_code=500,
+            content={"error": "internal_error"}
+        )
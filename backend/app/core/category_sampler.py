@@ -0,0 +1,134 @@
+# backend/app/core/category_sampler.py
+"""
+Selección ponderada de categoría para los ejercicios de sesiones mixtas
+(POST /exercise/generate con `categories`).
+
+Cada item de una categoría con peso w pesa w: la probabilidad de una
+categoría es w * nº de items de su snapshot. La tabla alias (Vose) se
+construye una vez por conjunto (categoría, peso) y se guarda mientras
+los snapshots de content_cache sean los mismos; cada sorteo es O(1)
+sea cual sea el nº de categorías.
+"""
+import random
+import threading
+from collections import OrderedDict
+
+from app.core.content_cache import CategorySnapshot
+
+
+class AliasTable:
+    """
+    Muestreo de un índice de range(n) con probabilidad proporcional a
+    weights[i]: construcción O(n), cada sample() O(1) (un randrange y un
+    random).
+    """
+
+    __slots__ = ("_prob", "_alias")
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0 or min(weights) < 0:
+            raise ValueError("AliasTable needs non-negative weights with a positive sum")
+
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            small_idx, large_idx = small.pop(), large.pop()
+            prob[small_idx] = scaled[small_idx]
+            alias[small_idx] = large_idx
+            scaled[large_idx] += scaled[small_idx] - 1.0
+            (small if scaled[large_idx] < 1.0 else large).append(large_idx)
+        # Lo que queda (restos de redondeo) tiene probabilidad 1
+        self._prob = prob
+        self._alias = alias
+
+    def __len__(self) -> int:
+        return len(self._prob)
+
+    def sample(self, rng=random) -> int:
+        i = rng.randrange(len(self._prob))
+        return i if rng.random() < self._prob[i] else self._alias[i]
+
+
+class WeightedCategories:
+    """
+    Tabla alias sobre los snapshots de una sesión mixta. Las categorías
+    con menos de `min_items` items no pueden dar un ejercicio (los
+    distractores salen de la propia categoría) y no entran en el sorteo.
+    """
+
+    def __init__(self, snapshots, weights, min_items: int):
+        eligible = [
+            (snapshot, weight)
+            for snapshot, weight in zip(snapshots, weights)
+            if len(snapshot) >= min_items
+        ]
+        if not eligible:
+            raise ValueError("insufficient_items")
+        self.snapshots: tuple[CategorySnapshot, ...] = tuple(s for s, _ in eligible)
+        self._table = AliasTable([w * len(s) for s, w in eligible])
+
+    def choose(self, rng=random) -> CategorySnapshot:
+        return self.snapshots[self._table.sample(rng)]
+
+
+class CategorySampler:
+    """
+    Caché LRU en proceso de WeightedCategories por conjunto de
+    (category_id, peso). Una entrada sigue valiendo mientras los snapshots
+    sean los mismos objetos; si content_cache recarga una categoría
+    (otro snapshot, otro nº de items) la tabla se reconstruye.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._tables: OrderedDict[tuple, tuple[tuple, WeightedCategories]] = OrderedDict()
+
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, snapshots, weights, min_items: int) -> WeightedCategories:
+        snapshots = tuple(snapshots)
+        key = (min_items,) + tuple(
+            (snapshot.category_id, weight) for snapshot, weight in zip(snapshots, weights)
+        )
+        with self._lock:
+            entry = self._tables.get(key)
+            if entry is not None and all(
+                cached is snapshot for cached, snapshot in zip(entry[0], snapshots)
+            ):
+                self._tables.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        table = WeightedCategories(snapshots, weights, min_items)
+        with self._lock:
+            self.builds += 1
+            self._tables[key] = (snapshots, table)
+            self._tables.move_to_end(key)
+            while len(self._tables) > self.max_entries:
+                self._tables.popitem(last=False)
+        return table
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._tables),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "builds": self.builds,
+            }
+
+
+# Instancia global del proceso (como content_cache)
+category_sampler = CategorySampler()
@@ -0,0 +1,232 @@
+# backend/app/core/content_bundle.py
+
+import gzip
+import json
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import text
+
+# MAX sobre la clave primaria: un index-only scan hacia atrás
+_VERSION_SQL = text("SELECT COALESCE(MAX(change_id), 0) FROM content_change")
+_CATEGORIES_SQL = text("SELECT category_id, name FROM category ORDER BY category_id")
+_ITEMS_SQL = text(
+    "SELECT lexical_item_id, category_id, text FROM lexical_item "
+    "ORDER BY lexical_item_id"
+)
+# Último cambio de cada entidad en (since, version]
+_CHANGES_SQL = text(
+    "SELECT DISTINCT ON (entity, entity_id) entity, entity_id, deleted "
+    "FROM content_change "
+    "WHERE change_id > :since AND change_id <= :version "
+    "ORDER BY entity, entity_id, change_id DESC"
+)
+_CATEGORIES_BY_ID_SQL = text(
+    "SELECT category_id, name FROM category "
+    "WHERE category_id = ANY(:ids) ORDER BY category_id"
+)
+_ITEMS_BY_ID_SQL = text(
+    "SELECT lexical_item_id, category_id, text FROM lexical_item "
+    "WHERE lexical_item_id = ANY(:ids) ORDER BY lexical_item_id"
+)
+
+
+@dataclass(frozen=True)
+class ContentBundle:
+    """
+    Contenido completo (categorías + items) en la versión `version`,
+    ya serializado: JSON y su versión gzip, listos para enviar.
+    """
+
+    version: int
+    body: bytes
+    gzipped: bytes
+
+    @property
+    def etag(self) -> str:
+        return f"bundle-{self.version}"
+
+
+def _category(row) -> dict:
+    return {"category_id": row[0], "name": row[1]}
+
+
+def _item(row) -> dict:
+    return {"lexical_item_id": row[0], "category_id": row[1], "text": row[2]}
+
+
+def _encode_bundle(version: int, categories, items) -> ContentBundle:
+    body = json.dumps(
+        {
+            "version": version,
+            "categories": [_category(r) for r in categories],
+            "items": [_item(r) for r in items],
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    # mtime=0: mismos bytes para la misma versión en todos los workers
+    return ContentBundle(
+        version=version, body=body, gzipped=gzip.compress(body, mtime=0)
+    )
+
+
+def _split_changes(rows) -> tuple[dict[str, list[int]], dict[str, list[int]]]:
+    upserted = {"category": [], "lexical_item": []}
+    deleted = {"category": [], "lexical_item": []}
+    for entity, entity_id, is_deleted in rows:
+        (deleted if is_deleted else upserted)[entity].append(entity_id)
+    return upserted, deleted
+
+
+def _delta(version: int, since: int, upserted, deleted, categories, items) -> dict:
+    # Un alta cuya fila ya no existe se borró después de `version`:
+    # se envía como borrado (el siguiente delta lo repetiría igualmente)
+    found_categories = {r[0] for r in categories}
+    found_items = {r[0] for r in items}
+    return {
+        "version": version,
+        "since": since,
+        "categories": {
+            "upserted": [_category(r) for r in categories],
+            "deleted": sorted(
+                deleted["category"]
+                + [i for i in upserted["category"] if i not in found_categories]
+            ),
+        },
+        "items": {
+            "upserted": [_item(r) for r in items],
+            "deleted": sorted(
+                deleted["lexical_item"]
+                + [i for i in upserted["lexical_item"] if i not in found_items]
+            ),
+        },
+    }
+
+
+class ContentBundleCache:
+    """
+    Bundle de contenido versionado para la caché local (Room) de la app.
+
+    La versión es el último change_id de content_change (migración 0005),
+    que los triggers de category / lexical_item incrementan con cada cambio.
+    Cada request lee la versión (una consulta trivial); el bundle solo se
+    reconstruye y comprime cuando cambia, y se guarda el último en memoria.
+
+    Orden de lectura: primero la versión y después el contenido. Así el
+    contenido es como mínimo tan nuevo como la versión que lo etiqueta y
+    un delta posterior nunca pierde cambios (como mucho repite alguno).
+    Esto requiere que los change_id se confirmen en orden: el trigger
+    serializa a los escritores de contenido con un advisory lock
+    (migración 0008), así que nunca hay un change_id menor aún pendiente.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bundle: Optional[ContentBundle] = None
+
+        self.builds = 0
+
+    # ------------------------------------------------------------------
+    # Sesión síncrona
+    # ------------------------------------------------------------------
+    def get_bundle(self, session) -> ContentBundle:
+        version = session.execute(_VERSION_SQL).scalar_one()
+        bundle = self._cached(version)
+        if bundle is not None:
+            return bundle
+        categories = session.execute(_CATEGORIES_SQL).all()
+        items = session.execute(_ITEMS_SQL).all()
+        return self._store(_encode_bundle(version, categories, items))
+
+    def get_delta(self, session, since: int) -> dict:
+        """
+        Altas/modificaciones y borrados desde la versión `since`.
+        ValueError("invalid_version") si since no es una versión válida.
+        """
+        version = session.execute(_VERSION_SQL).scalar_one()
+        _check_since(since, version)
+        upserted, deleted = _split_changes(
+            session.execute(_CHANGES_SQL, {"since": since, "version": version})
+        )
+        categories = items = []
+        if upserted["category"]:
+            categories = session.execute(
+                _CATEGORIES_BY_ID_SQL, {"ids": upserted["category"]}
+            ).all()
+        if upserted["lexical_item"]:
+            items = session.execute(
+                _ITEMS_BY_ID_SQL, {"ids": upserted["lexical_item"]}
+            ).all()
+        return _delta(version, since, upserted, deleted, categories, items)
+
+    # ------------------------------------------------------------------
+    # AsyncSession (ruta async opcional)
+    # ------------------------------------------------------------------
+    async def aget_bundle(self, session) -> ContentBundle:
+        version = (await session.execute(_VERSION_SQL)).scalar_one()
+        bundle = self._cached(version)
+        if bundle is not None:
+            return bundle
+        categories = (await session.execute(_CATEGORIES_SQL)).all()
+        items = (await session.execute(_ITEMS_SQL)).all()
+        return self._store(_encode_bundle(version, categories, items))
+
+    async def aget_delta(self, session, since: int) -> dict:
+        version = (await session.execute(_VERSION_SQL)).scalar_one()
+        _check_since(since, version)
+        upserted, deleted = _split_changes(
+            await session.execute(
+                _CHANGES_SQL, {"since": since, "version": version}
+            )
+        )
+        categories = items = []
+        if upserted["category"]:
+            categories = (
+                await session.execute(
+                    _CATEGORIES_BY_ID_SQL, {"ids": upserted["category"]}
+                )
+            ).all()
+        if upserted["lexical_item"]:
+            items = (
+                await session.execute(
+                    _ITEMS_BY_ID_SQL, {"ids": upserted["lexical_item"]}
+                )
+            ).all()
+        return _delta(version, since, upserted, deleted, categories, items)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self._bundle.version if self._bundle else None,
+                "bytes": len(self._bundle.body) if self._bundle else 0,
+                "gzipped_bytes": len(self._bundle.gzipped) if self._bundle else 0,
+                "builds": self.builds,
+            }
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _cached(self, version: int) -> Optional[ContentBundle]:
+        with self._lock:
+            if self._bundle is not None and self._bundle.version == version:
+                return self._bundle
+            return None
+
+    def _store(self, bundle: ContentBundle) -> ContentBundle:
+        # Siempre el último construido: si una transacción de contenido se
+        # deshizo, la versión en BD puede bajar y el anterior no vuelve a servir
+        with self._lock:
+            self.builds += 1
+            self._bundle = bundle
+        return bundle
+
+
+def _check_since(since: int, version: int) -> None:
+    if since < 0 or since > version:
+        raise ValueError("invalid_version")
+
+
+# Instancia global del proceso (como content_cache)
+content_bundle_cache = ContentBundleCache()
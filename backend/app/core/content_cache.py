@@ -0,0 +1,430 @@
+# backend/app/core/content_cache.py
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select, text
+
+from app.core.config import get_settings
+from app.models.category import Category
+from app.models.lexical_item import LexicalItem
+
+logger = logging.getLogger(__name__)
+
+# Revisión de Alembic + último cambio de contenido (content_change, 0005):
+# cambia con una migración o con cualquier edición de category / lexical_item
+_SOURCE_VERSION_SQL = (
+    "SELECT version_num || ':' || "
+    "(SELECT COALESCE(MAX(change_id), 0) FROM content_change) "
+    "FROM alembic_version"
+)
+
+
+def _items_of(category_ids):
+    return select(
+        LexicalItem.category_id, LexicalItem.lexical_item_id, LexicalItem.text
+    ).where(LexicalItem.category_id.in_(category_ids))
+
+
+@dataclass(frozen=True)
+class CategorySnapshot:
+    """
+    Foto inmutable de los items de una categoría.
+
+    Solo guarda lo que necesita la generación de ejercicios y el listado
+    de items: ids y textos en tablas paralelas, ordenadas por lexical_item_id.
+    Los ids van en un array('i') compacto (4 bytes por item en lugar de un
+    int de Python) que la generación indexa directamente, sin copiarlo.
+    No debe modificarse.
+    """
+
+    category_id: int
+    version: int
+    item_ids: array
+    texts: tuple[str, ...]
+    # Hash del contenido (no de la versión de caché): estable entre workers
+    # y reinicios, sirve directamente como ETag HTTP
+    etag: str
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def index_of(self, lexical_item_id: int) -> Optional[int]:
+        """
+        Posición del item en el snapshot (búsqueda binaria), o None si no
+        es de la categoría.
+        """
+        idx = bisect_left(self.item_ids, lexical_item_id)
+        if idx == len(self.item_ids) or self.item_ids[idx] != lexical_item_id:
+            return None
+        return idx
+
+
+@dataclass(frozen=True)
+class CategoryListSnapshot:
+    """
+    Foto inmutable del listado de categorías (category_id, name).
+    """
+
+    version: int
+    categories: tuple[tuple[int, str], ...]
+    category_ids: frozenset[int]
+    etag: str
+
+    def has_category(self, category_id: int) -> bool:
+        return category_id in self.category_ids
+
+
+def _content_hash(data) -> str:
+    """
+    Hash corto y determinista del contenido de un snapshot.
+    """
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+
+class ContentCache:
+    """
+    Caché en proceso del contenido léxico (category / lexical_item).
+
+    El contenido cambia poco (migraciones como 0003_load_initial_content o
+    ediciones de category / lexical_item), así que las lecturas de la
+    generación de ejercicios y de /content/items/{category_id} se sirven
+    desde memoria.
+
+    - Versionado: cada snapshot lleva la versión de caché con la que se cargó.
+      invalidate() sin argumentos incrementa la versión y descarta todo.
+    - Revalidación: como mucho cada `revalidate_seconds` se consulta la
+      revisión de Alembic y el último change_id de content_change (el mismo
+      contador que /content/bundle); si cambió alguno, se invalida.
+    - Acotada: como máximo `max_categories` categorías (expulsión LRU).
+    """
+
+    def __init__(
+        self,
+        max_categories: int = 256,
+        revalidate_seconds: float = 30.0,
+    ):
+        self.max_categories = max_categories
+        self.revalidate_seconds = revalidate_seconds
+
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshots: OrderedDict[int, CategorySnapshot] = OrderedDict()
+        self._categories: Optional[CategoryListSnapshot] = None
+
+        # Última versión de origen observada y momento de la comprobación
+        self._source_version: Optional[str] = None
+        self._last_check = 0.0
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    # ------------------------------------------------------------------
+    # Lectura (sesión síncrona)
+    # ------------------------------------------------------------------
+    def get_items(self, session, category_id: int) -> CategorySnapshot:
+        """
+        Devuelve el snapshot de items de la categoría, cargándolo de BD
+        si no está en caché. Una categoría sin items (o inexistente)
+        devuelve un snapshot vacío.
+        """
+        if self._revalidation_due():
+            self._apply_source_version(self._read_source_version(session))
+
+        snapshot, version = self._lookup_items(category_id)
+        if snapshot is not None:
+            return snapshot
+
+        items = (
+            session.query(LexicalItem)
+            .filter(LexicalItem.category_id == category_id)
+            .all()
+        )
+        return self._store_items(
+            category_id,
+            version,
+            [(i.lexical_item_id, i.text) for i in items],
+        )
+
+    def get_items_many(self, session, category_ids) -> list[CategorySnapshot]:
+        """
+        Snapshots de varias categorías (en el orden de `category_ids`);
+        las que no están en caché se cargan juntas con una sola consulta.
+        """
+        if self._revalidation_due():
+            self._apply_source_version(self._read_source_version(session))
+
+        found, missing, version = self._lookup_many(category_ids)
+        if missing:
+            rows = session.execute(_items_of(missing)).all()
+            found.update(self._store_many(missing, version, rows))
+        return [found[category_id] for category_id in category_ids]
+
+    def get_categories(self, session) -> CategoryListSnapshot:
+        """
+        Devuelve el listado de categorías, cargándolo de BD si hace falta.
+        """
+        if self._revalidation_due():
+            self._apply_source_version(self._read_source_version(session))
+
+        categories, version = self._lookup_categories()
+        if categories is not None:
+            return categories
+
+        rows = session.query(Category).all()
+        return self._store_categories(
+            version, [(c.category_id, c.name) for c in rows]
+        )
+
+    def has_category(self, session, category_id: int) -> bool:
+        return self.get_categories(session).has_category(category_id)
+
+    # ------------------------------------------------------------------
+    # Lectura (AsyncSession, ruta async opcional)
+    # ------------------------------------------------------------------
+    async def aget_items(self, session, category_id: int) -> CategorySnapshot:
+        """
+        Equivalente async de get_items() para AsyncSession.
+        """
+        if self._revalidation_due():
+            self._apply_source_version(
+                await self._aread_source_version(session)
+            )
+
+        snapshot, version = self._lookup_items(category_id)
+        if snapshot is not None:
+            return snapshot
+
+        result = await session.execute(
+            select(LexicalItem.lexical_item_id, LexicalItem.text).where(
+                LexicalItem.category_id == category_id
+            )
+        )
+        return self._store_items(category_id, version, result.all())
+
+    async def aget_items_many(self, session, category_ids) -> list[CategorySnapshot]:
+        """
+        Equivalente async de get_items_many() para AsyncSession.
+        """
+        if self._revalidation_due():
+            self._apply_source_version(
+                await self._aread_source_version(session)
+            )
+
+        found, missing, version = self._lookup_many(category_ids)
+        if missing:
+            result = await session.execute(_items_of(missing))
+            found.update(self._store_many(missing, version, result.all()))
+        return [found[category_id] for category_id in category_ids]
+
+    async def aget_categories(self, session) -> CategoryListSnapshot:
+        """
+        Equivalente async de get_categories() para AsyncSession.
+        """
+        if self._revalidation_due():
+            self._apply_source_version(
+                await self._aread_source_version(session)
+            )
+
+        categories, version = self._lookup_categories()
+        if categories is not None:
+            return categories
+
+        result = await session.execute(
+            select(Category.category_id, Category.name)
+        )
+        return self._store_categories(version, result.all())
+
+    async def ahas_category(self, session, category_id: int) -> bool:
+        categories = await self.aget_categories(session)
+        return categories.has_category(category_id)
+
+    # ------------------------------------------------------------------
+    # Invalidación / recarga
+    # ------------------------------------------------------------------
+    def invalidate(self, category_id: Optional[int] = None) -> None:
+        """
+        Sin argumentos: invalida todo el contenido (nueva versión).
+        Con category_id: descarta solo el snapshot de esa categoría.
+        """
+        with self._lock:
+            if category_id is None:
+                self._version += 1
+                self._snapshots.clear()
+                self._categories = None
+            else:
+                self._snapshots.pop(category_id, None)
+
+    def reload(self, session) -> int:
+        """
+        Fuerza la recarga completa desde BD (p.ej. tras aplicar una
+        migración de contenido). Devuelve la nueva versión de la caché.
+        """
+        self.invalidate()
+        self._source_version = self._read_source_version(session)
+        self._last_check = time.monotonic()
+
+        categories = self.get_categories(session)
+        for category_id, _name in categories.categories[: self.max_categories]:
+            self.get_items(session, category_id)
+        return self._version
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self._version,
+                "categories_cached": len(self._snapshots),
+                "max_categories": self.max_categories,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _lookup_items(
+        self, category_id: int
+    ) -> tuple[Optional[CategorySnapshot], int]:
+        with self._lock:
+            snapshot = self._snapshots.get(category_id)
+            if snapshot is not None and snapshot.version == self._version:
+                self._snapshots.move_to_end(category_id)
+                self.hits += 1
+                return snapshot, self._version
+            self.misses += 1
+            return None, self._version
+
+    def _lookup_many(
+        self, category_ids
+    ) -> tuple[dict[int, CategorySnapshot], list[int], int]:
+        found: dict[int, CategorySnapshot] = {}
+        missing: list[int] = []
+        version = self._version
+        for category_id in category_ids:
+            snapshot, version = self._lookup_items(category_id)
+            if snapshot is not None:
+                found[category_id] = snapshot
+            elif category_id not in missing:
+                missing.append(category_id)
+        return found, missing, version
+
+    def _store_many(
+        self, category_ids: list[int], version: int, rows
+    ) -> dict[int, CategorySnapshot]:
+        """
+        Reparte las filas (category_id, lexical_item_id, text) por categoría
+        y guarda un snapshot por cada una (vacío si no tiene items).
+        """
+        grouped: dict[int, list] = {category_id: [] for category_id in category_ids}
+        for category_id, lexical_item_id, text_ in rows:
+            grouped[category_id].append((lexical_item_id, text_))
+        return {
+            category_id: self._store_items(category_id, version, pairs)
+            for category_id, pairs in grouped.items()
+        }
+
+    def _store_items(
+        self, category_id: int, version: int, rows
+    ) -> CategorySnapshot:
+        pairs = sorted((row[0], row[1]) for row in rows)
+        snapshot = CategorySnapshot(
+            category_id=category_id,
+            version=version,
+            item_ids=array("i", (p[0] for p in pairs)),
+            texts=tuple(p[1] for p in pairs),
+            etag=_content_hash(["items", category_id, pairs]),
+        )
+        with self._lock:
+            # Si hubo una invalidación durante la carga, no guardamos datos viejos
+            if version == self._version:
+                self._snapshots[category_id] = snapshot
+                self._snapshots.move_to_end(category_id)
+                while len(self._snapshots) > self.max_categories:
+                    self._snapshots.popitem(last=False)
+        return snapshot
+
+    def _lookup_categories(self) -> tuple[Optional[CategoryListSnapshot], int]:
+        with self._lock:
+            categories = self._categories
+            if categories is not None and categories.version == self._version:
+                self.hits += 1
+                return categories, self._version
+            self.misses += 1
+            return None, self._version
+
+    def _store_categories(self, version: int, rows) -> CategoryListSnapshot:
+        pairs = tuple(sorted((row[0], row[1]) for row in rows))
+        categories = CategoryListSnapshot(
+            version=version,
+            categories=pairs,
+            category_ids=frozenset(p[0] for p in pairs),
+            etag=_content_hash(["categories", pairs]),
+        )
+        with self._lock:
+            if version == self._version:
+                self._categories = categories
+        return categories
+
+    def _revalidation_due(self) -> bool:
+        now = time.monotonic()
+        if now - self._last_check < self.revalidate_seconds:
+            return False
+        self._last_check = now
+        return True
+
+    def _apply_source_version(self, source_version: Optional[str]) -> None:
+        if source_version is None:
+            return
+        if self._source_version is not None and source_version != self._source_version:
+            logger.info(
+                "Content version changed (%s -> %s), invalidating content cache",
+                self._source_version,
+                source_version,
+            )
+            self.invalidate()
+        self._source_version = source_version
+
+    @staticmethod
+    def _read_source_version(session) -> Optional[str]:
+        """
+        Lee la versión de origen (revisión de Alembic + último change_id)
+        en la propia sesión del request, dentro de un SAVEPOINT: no ocupa
+        otra conexión del pool y, si falla, no aborta la transacción.
+        Si no es posible (sin tabla, sesión falsa en tests...), devuelve None.
+        """
+        try:
+            with session.begin_nested():
+                return session.execute(text(_SOURCE_VERSION_SQL)).scalar()
+        except Exception:
+            logger.debug("Could not read content version", exc_info=True)
+            return None
+
+    @staticmethod
+    async def _aread_source_version(session) -> Optional[str]:
+        try:
+            async with session.begin_nested():
+                return (await session.execute(text(_SOURCE_VERSION_SQL))).scalar()
+        except Exception:
+            logger.debug("Could not read content version", exc_info=True)
+            return None
+
+_settings = get_settings()
+
+# Instancia global del proceso (como ephemeral_memory)
+content_cache = ContentCache(
+    max_categories=_settings.content_cache_max_categories,
+    revalidate_seconds=_settings.content_cache_revalidate_seconds,
+)
@@ -1,19 +1,218 @@
 # backend/app/core/db.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+"""
+Engines y sesiones (sync y async) del proceso.
 
-from app.core.config import get_settings
+Se crean en el primer uso, no al importar: importar la app no lee la
+configuración de BD ni carga el driver. El lifespan de la app los crea
+al arrancar (init_engines), precalienta el pool (warm_pool) y los cierra
+al parar (dispose_engines).
 
-_settings = get_settings()
+`engine`, `SessionLocal`, `async_engine` y `AsyncSessionLocal` siguen
+siendo atributos del módulo (__getattr__): `from app.core.db import
+engine` dentro de una función crea el engine si aún no existe.
+"""
+import threading
+from typing import AsyncIterator, Callable, Iterator, Optional
 
-engine = create_engine(
-    _settings.database_url,
-    future=True,
-)
+from sqlalchemy.orm import Session
 
-SessionLocal = sessionmaker(
-    bind=engine,
-    autoflush=False,
-    autocommit=False,
-    future=True,
-)
+from app.core.config import Settings, get_settings
+from app.core.db_pool import pool_stats
+
+
+def _engine_options(settings: Settings) -> dict:
+    """
+    Opciones de pool comunes al engine sync y al async.
+    """
+    options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if settings.db_statement_timeout_ms > 0:
+        # Se fija por conexión al abrirla (psycopg sync y async)
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={settings.db_statement_timeout_ms}"
+        }
+    return options
+
+
+class _Engines:
+    """
+    Engine sync y async con sus fábricas de sesión, creados juntos.
+    """
+
+    def __init__(self, settings: Settings):
+        from sqlalchemy import create_engine
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from sqlalchemy.orm import sessionmaker
+
+        from app.core.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+
+        self.engine = create_engine(
+            settings.database_url,
+            future=True,
+            poolclass=InstrumentedQueuePool,
+            **_engine_options(settings),
+        )
+        self.session_factory = sessionmaker(
+            bind=self.engine,
+            autoflush=False,
+            autocommit=False,
+            future=True,
+        )
+        # ----- Ruta async opcional (ASYNC_DB) -----
+        # Con la URL postgresql+psycopg:// SQLAlchemy usa el dialecto psycopg
+        # async. Crear el engine no abre conexiones.
+        self.async_engine = create_async_engine(
+            settings.database_url,
+            poolclass=InstrumentedAsyncQueuePool,
+            **_engine_options(settings),
+        )
+        # expire_on_commit=False: tras el commit seguimos leyendo los atributos
+        # ya cargados (p.ej. exercise.options) sin lazy-loads, que no existen
+        # en async.
+        self.async_session_factory = async_sessionmaker(
+            bind=self.async_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+
+_lock = threading.Lock()
+_engines: Optional[_Engines] = None
+# Callbacks de on_engines_created (p.ej. instrumentación de métricas)
+_listeners: list[Callable[[_Engines], None]] = []
+
+
+def init_engines(settings: Optional[Settings] = None) -> _Engines:
+    """
+    Crea los engines con la configuración actual (idempotente).
+    """
+    global _engines
+    if _engines is not None:
+        return _engines
+    with _lock:
+        if _engines is None:
+            engines = _Engines(settings or get_settings())
+            for listener in _listeners:
+                listener(engines)
+            _engines = engines
+    return _engines
+
+
+def on_engines_created(listener: Callable[[_Engines], None]) -> None:
+    """
+    Registra `listener(engines)`: se llama al crear los engines, o en el
+    acto si ya existen. Cada listener se registra una vez.
+    """
+    with _lock:
+        if listener in _listeners:
+            return
+        _listeners.append(listener)
+        engines = _engines
+    if engines is not None:
+        listener(engines)
+
+
+def engines_created() -> bool:
+    return _engines is not None
+
+
+def get_engine():
+    return init_engines().engine
+
+
+def get_async_engine():
+    return init_engines().async_engine
+
+
+def __getattr__(name: str):
+    engines = {
+        "engine": lambda e: e.engine,
+        "SessionLocal": lambda e: e.session_factory,
+        "async_engine": lambda e: e.async_engine,
+        "AsyncSessionLocal": lambda e: e.async_session_factory,
+    }
+    if name in engines:
+        return engines[name](init_engines())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def warm_pool(connections: int) -> int:
+    """
+    Abre `connections` conexiones del engine sync a la vez y las devuelve
+    al pool, que las conserva (hasta pool_size) para los primeros requests.
+    """
+    engine = get_engine()
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+async def awarm_pool(connections: int) -> int:
+    """
+    Equivalente de warm_pool() para el engine async.
+    """
+    engine = get_async_engine()
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(await engine.connect())
+    finally:
+        for conn in opened:
+            await conn.close()
+    return len(opened)
+
+
+async def dispose_engines() -> None:
+    """
+    Cierra las conexiones de los pools (apagado). Los engines siguen
+    siendo válidos: si se vuelven a usar, abren conexiones nuevas.
+    """
+    engines = _engines
+    if engines is None:
+        return
+    await engines.async_engine.dispose()
+    engines.engine.dispose()
+
+
+def get_db() -> Iterator[Session]:
+    """
+    Dependencia FastAPI: una sesión por request, cerrada al terminar
+    (la conexión vuelve al pool aunque el handler haya fallado).
+    """
+    db = init_engines().session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator:
+    """
+    Equivalente async de get_db() para los routers ASYNC_DB.
+    """
+    async with init_engines().async_session_factory() as db:
+        yield db
+
+
+def get_pool_stats() -> dict:
+    """
+    Estado en vivo de los pools de este proceso (sync y async);
+    vacíos si los engines aún no se han creado.
+    """
+    engines = _engines
+    if engines is None:
+        return {"sync": {}, "async": {}}
+    return {
+        "sync": pool_stats(engines.engine.pool),
+        "async": pool_stats(engines.async_engine.sync_engine.pool),
+    }
@@ -0,0 +1,105 @@
+# backend/app/core/db_pool.py
+"""
+Pools de conexiones instrumentados.
+
+Son los QueuePool / AsyncAdaptedQueuePool de SQLAlchemy con contadores de
+checkout: cuántas veces se pidió conexión, cuántas hubo que esperar porque
+el pool estaba agotado (size + overflow), cuánto tiempo y cuántas agotaron
+DB_POOL_TIMEOUT. Con eso y checked_out/overflow se dimensiona el pool
+frente al número de workers de uvicorn.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolWaitStats:
+    """
+    Contadores acumulados de checkout de un pool (thread-safe).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+
+    def record(self, elapsed: float, waited: bool, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            if waited:
+                self.waits += 1
+            self.checkout_seconds_total += elapsed
+            if elapsed > self.checkout_seconds_max:
+                self.checkout_seconds_max = elapsed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "checkout_seconds_total": round(self.checkout_seconds_total, 6),
+                "checkout_seconds_max": round(self.checkout_seconds_max, 6),
+            }
+
+
+class _InstrumentedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def connect(self):
+        # Si no queda ninguna conexión libre ni margen de overflow, este
+        # checkout va a quedarse esperando a que otro request libere una.
+        waited = (
+            self._max_overflow > -1
+            and self.checkedin() == 0
+            and self.overflow() >= self._max_overflow
+        )
+        started = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.wait_stats.record(
+                time.perf_counter() - started, waited, timed_out=True
+            )
+            raise
+        self.wait_stats.record(time.perf_counter() - started, waited)
+        return conn
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "timeout": self.timeout(),
+            **self.wait_stats.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(pool) -> dict:
+    """
+    Estadísticas de un pool; {} si no es un pool instrumentado.
+    """
+    if isinstance(pool, _InstrumentedPoolMixin):
+        return {"pid": os.getpid(), **pool.stats()}
+    return {}
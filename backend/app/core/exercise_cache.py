@@ -0,0 +1,105 @@
+# backend/app/core/exercise_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import get_settings
+from app.core.exercise_token import ExerciseClaims
+
+
+class RecentExerciseCache:
+    """
+    LRU en proceso de ejercicios recién generados:
+        exercise_id → (option_ids, correct_option_id)
+
+    Casi todas las llamadas a /exercise/validate llegan segundos después
+    del /exercise/generate correspondiente; con esta caché se resuelven
+    sin leer exercise / exercise_option de la BD.
+
+    - Acotada por nº de entradas (max_entries; 0 = desactivada).
+    - Cada entrada caduca a los ttl_seconds de insertarse.
+    - Contadores de hits / misses / evictions.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        # exercise_id → (caduca_en, claims); orden = recencia de uso
+        self._entries: OrderedDict[int, tuple[float, ExerciseClaims]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def put(self, claims: ExerciseClaims) -> None:
+        if self.max_entries <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._entries[claims.exercise_id] = (now + self.ttl_seconds, claims)
+            self._entries.move_to_end(claims.exercise_id)
+            self._evict(now)
+
+    def put_exercise(self, exercise) -> None:
+        """
+        Registra un Exercise ya persistido (exercise_id y opciones en memoria).
+        """
+        self.put(ExerciseClaims.from_exercise(exercise))
+
+    def get(self, exercise_id: int) -> Optional[ExerciseClaims]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(exercise_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims = entry
+            if expires_at <= now:
+                del self._entries[exercise_id]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(exercise_id)
+            self.hits += 1
+            return claims
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _evict(self, now: float) -> None:
+        # Primero las caducadas más antiguas, después por tamaño (LRU)
+        while self._entries:
+            oldest_id, (expires_at, _claims) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[oldest_id]
+            self.expirations += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+_settings = get_settings()
+
+# Instancia global del proceso
+recent_exercises = RecentExerciseCache(
+    max_entries=_settings.recent_exercise_cache_size,
+    ttl_seconds=_settings.recent_exercise_cache_ttl_seconds,
+)
@@ -1,24 +1,574 @@
 # backend/app/core/exercise_memory.py
 
-from typing import Optional
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Container, Optional
 
-class EphemeralMemory:
+from app.core.config import get_settings
+
+
+class RecentWindow:
+    """
+    Últimos `size` lexical_item_id de una categoría: ring buffer + conteo
+    por item (un multiconjunto hash), así que `item in window` es O(1)
+    sea cual sea K, y añadir uno expulsa el más antiguo en O(1).
+    """
+
+    __slots__ = ("ring", "pos", "filled", "counts")
+
+    def __init__(self, size: int):
+        self.ring: list[int] = [0] * max(1, size)
+        self.pos = 0
+        self.filled = 0
+        # item → apariciones en el anillo (puede repetirse si la
+        # categoría tiene menos items que la ventana)
+        self.counts: dict[int, int] = {}
+
+    def __contains__(self, lexical_item_id) -> bool:
+        return lexical_item_id in self.counts
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def push(self, lexical_item_id: int) -> None:
+        size = len(self.ring)
+        if self.filled == size:
+            oldest = self.ring[self.pos]
+            remaining = self.counts[oldest] - 1
+            if remaining:
+                self.counts[oldest] = remaining
+            else:
+                del self.counts[oldest]
+        else:
+            self.filled += 1
+        self.ring[self.pos] = lexical_item_id
+        self.counts[lexical_item_id] = self.counts.get(lexical_item_id, 0) + 1
+        self.pos = (self.pos + 1) % size
+
+    def last(self) -> Optional[int]:
+        if not self.filled:
+            return None
+        return self.ring[self.pos - 1]
+
+    def latest(self, limit: int) -> frozenset[int]:
+        """
+        Los `limit` más recientes (O(limit)), para categorías con menos
+        items que la ventana.
+        """
+        size = len(self.ring)
+        return frozenset(
+            self.ring[(self.pos - 1 - i) % size]
+            for i in range(min(limit, self.filled))
+        )
+
+
+_EMPTY = frozenset()
+
+
+class WithItem:
+    """
+    Ventana de Modo B más un item suelto (el previous_lexical_item_id que
+    envía el cliente), sin copiar la ventana.
+    """
+
+    __slots__ = ("recent", "item")
+
+    def __init__(self, recent: Container[int], item: int):
+        self.recent = recent
+        self.item = item
+
+    def __contains__(self, lexical_item_id) -> bool:
+        return lexical_item_id == self.item or lexical_item_id in self.recent
+
+
+class EphemeralMemory(ABC):
     """
     Memoria efímera para Modo B (ET v1.4, cap. 4.3.2).
-    No persistente. Vive solo en el proceso del backend.
-    Guarda únicamente el último lexical_item_id por categoría.
+    No persistente. Guarda los últimos K lexical_item_id por (cliente,
+    categoría) (ventana de no repetición; K = 1 es la regla original:
+    solo el último). `client` es la clave opaca del cliente (cabecera
+    X-Client-Id); None es la ventana compartida de los clientes anónimos.
+
+    K es `window` para todas las categorías salvo las de `windows`
+    ({category_id: K}); ver MODO_B_WINDOW y MODO_B_WINDOW_BY_CATEGORY.
+
+    Acotada: como mucho `max_entries` ventanas (LRU) y cada una caduca a
+    los `ttl_seconds` de su último uso (0 = sin caducidad). Contadores:
+    `evictions` (expulsadas por tamaño) y `expirations` (caducadas).
+
+    Esta clase es la interfaz común (abstracta: un backend al que le falte
+    un método no se puede instanciar); el concreto se elige con
+    MODO_B_MEMORY_BACKEND:
+
+    - "process" (por defecto): diccionario del proceso. Con varios workers
+      de uvicorn cada uno tiene su propia memoria.
+    - "shared": tabla en memoria compartida (mmap) visible para todos los
+      workers del host, sin servicios externos.
+    """
+
+    def __init__(
+        self,
+        window: int = 1,
+        windows: Optional[dict[int, int]] = None,
+        ttl_seconds: float = 1800.0,
+    ):
+        self.default_window = max(1, window)
+        self.windows = {c: max(1, k) for c, k in (windows or {}).items()}
+        self.ttl_seconds = ttl_seconds
+
+        self.evictions = 0
+        self.expirations = 0
+
+    def window(self, category_id: int) -> int:
+        return self.windows.get(category_id, self.default_window)
+
+    @abstractmethod
+    def recent(
+        self,
+        category_id: int,
+        limit: Optional[int] = None,
+        client: Optional[str] = None,
+    ) -> Container[int]:
+        """
+        Items de la ventana de la categoría (como mucho los `limit` más
+        recientes), con pertenencia O(1). Solo lectura.
+        """
+
+    @abstractmethod
+    def remember(
+        self, category_id: int, lexical_item_id: int, client: Optional[str] = None
+    ) -> None:
+        """
+        Añade el item a la ventana (expulsando el más antiguo si está llena).
+        """
+
+    @abstractmethod
+    def get_last(self, category_id: int, client: Optional[str] = None) -> Optional[int]:
+        """
+        Último item de la ventana, o None.
+        """
+
+    def set_last(
+        self, category_id: int, lexical_item_id: int, client: Optional[str] = None
+    ) -> None:
+        self.remember(category_id, lexical_item_id, client)
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Vacía todas las ventanas.
+        """
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """
+        Contadores para GET /health/caches.
+        """
+
+
+class ProcessEphemeralMemory(EphemeralMemory):
+    """
+    Memoria de un solo proceso: una RecentWindow por (cliente, categoría),
+    en un LRU con caducidad (como RecentExerciseCache).
+    """
+
+    def __init__(
+        self,
+        window: int = 1,
+        windows: Optional[dict[int, int]] = None,
+        max_entries: int = 100000,
+        ttl_seconds: float = 1800.0,
+    ):
+        super().__init__(window, windows, ttl_seconds)
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        # (client, category_id) → (caduca_en, RecentWindow); orden = recencia de uso
+        self._last_items: OrderedDict[
+            tuple[Optional[str], int], tuple[float, RecentWindow]
+        ] = OrderedDict()
+
+    def recent(
+        self,
+        category_id: int,
+        limit: Optional[int] = None,
+        client: Optional[str] = None,
+    ) -> Container[int]:
+        window = self._get((client, category_id))
+        if window is None:
+            return _EMPTY
+        if limit is not None and limit < len(window.ring):
+            return window.latest(limit)
+        return window
+
+    def remember(
+        self, category_id: int, lexical_item_id: int, client: Optional[str] = None
+    ) -> None:
+        key = (client, category_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._last_items.get(key)
+            if entry is None or self._expired(entry[0], now):
+                if entry is not None:
+                    self.expirations += 1
+                window = RecentWindow(self.window(category_id))
+            else:
+                window = entry[1]
+            window.push(lexical_item_id)
+            self._last_items[key] = (self._expires_at(now), window)
+            self._last_items.move_to_end(key)
+            self._evict(now)
+
+    def get_last(self, category_id: int, client: Optional[str] = None) -> Optional[int]:
+        window = self._get((client, category_id))
+        return window.last() if window is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._last_items.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "process",
+                "entries": len(self._last_items),
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _get(self, key) -> Optional[RecentWindow]:
+        entry = self._last_items.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry[0], time.monotonic()):
+            with self._lock:
+                if self._last_items.get(key) is entry:
+                    del self._last_items[key]
+                    self.expirations += 1
+            return None
+        return entry[1]
+
+    def _expires_at(self, now: float) -> float:
+        return now + self.ttl_seconds if self.ttl_seconds > 0 else math.inf
+
+    @staticmethod
+    def _expired(expires_at: float, now: float) -> bool:
+        return expires_at <= now
+
+    def _evict(self, now: float) -> None:
+        # Primero las caducadas más antiguas, después por tamaño (LRU).
+        # El orden de uso es también el de caducidad: basta mirar el frente.
+        while self._last_items:
+            oldest_key, (expires_at, _window) = next(iter(self._last_items.items()))
+            if not self._expired(expires_at, now):
+                break
+            del self._last_items[oldest_key]
+            self.expirations += 1
+        while len(self._last_items) > self.max_entries:
+            self._last_items.popitem(last=False)
+            self.evictions += 1
+
+
+# Cabecera: magic, versión, nº de slots, id del "grupo" de workers (ppid),
+# K máximo (posiciones de item por slot)
+_HEADER = struct.Struct("<8sIIqI")
+_MAGIC = b"WTGMODOB"
+_LAYOUT_VERSION = 3
+# Slot: clave (0 = libre; ver _slot_key), nº de items añadidos, último uso
+# (time.time(), común a todos los procesos) y a continuación K máximo
+# lexical_item_id (anillo)
+_SLOT_HEAD = struct.Struct("<qqd")
+_ITEM = struct.Struct("<q")
+# Slots que se miran por clave: la cadena de sondeo está acotada, así que
+# cada operación es O(1) aunque la tabla esté llena de clientes
+_MAX_PROBES = 32
+
+
+def _slot_key(category_id: int, client: Optional[str]) -> int:
+    """
+    Clave de 63 bits de (cliente, categoría). Sin cliente es
+    category_id + 1; con cliente, un hash con el bit 62 activado para no
+    coincidir nunca con una clave anónima.
+    """
+    if client is None:
+        return category_id + 1
+    digest = hashlib.blake2b(
+        f"{category_id}:{client}".encode(), digest_size=8
+    ).digest()
+    return (int.from_bytes(digest, "little") & ((1 << 62) - 1)) | (1 << 62)
+
+
+class SharedEphemeralMemory(EphemeralMemory):
+    """
+    Tabla hash de direccionamiento abierto (sondeo lineal) sobre un fichero
+    mapeado en memoria, por defecto en /dev/shm. Todos los workers que abren
+    el mismo fichero ven la misma ventana de items recientes por
+    (cliente, categoría).
+
+    - Cada slot es un anillo de tamaño fijo (el K más grande configurado);
+      cada categoría usa sus primeras window(category_id) posiciones.
+    - Exclusión: flock() sobre el fichero entre procesos + un Lock entre
+      hilos del mismo proceso (flock no distingue hilos).
+    - Sigue siendo efímera: la cabecera guarda el pid del proceso padre
+      (el master de uvicorn); si un arranque nuevo encuentra otro, la tabla
+      se vacía. Nada sobrevive a un reinicio del servidor.
+    - Tamaño fijo (slots): es el tope de entradas. Cada clave solo puede
+      estar en los _MAX_PROBES slots desde su posición inicial; si están
+      todos ocupados se reutiliza uno caducado o, si no hay, el de uso más
+      antiguo (LRU aproximado). Nunca se bloquea.
+    - Los contadores evictions / expirations son de este proceso.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        slots: int = 4096,
+        owner: Optional[int] = None,
+        window: int = 1,
+        windows: Optional[dict[int, int]] = None,
+        ttl_seconds: float = 1800.0,
+    ):
+        import fcntl  # solo POSIX; el backend "process" no lo necesita
+
+        super().__init__(window, windows, ttl_seconds)
+        self._fcntl = fcntl
+        self.path = path
+        self.slots = slots
+        self.max_window = max([self.default_window, *self.windows.values()])
+        # Procesos con el mismo owner comparten tabla (por defecto: el padre)
+        self.owner = os.getppid() if owner is None else owner
+        self._slot_size = _SLOT_HEAD.size + self.max_window * _ITEM.size
+        self._size = _HEADER.size + slots * self._slot_size
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self) -> None:
+        # Tras un fork (p.ej. gunicorn --preload) el hijo hereda el descriptor
+        # y flock() no excluiría entre padre e hijo: cada proceso abre el suyo.
+        self._pid = os.getpid()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+        try:
+            self._init_file()
+            self._mm = mmap.mmap(self._fd, self._size)
+        finally:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+    def _init_file(self) -> None:
+        owner = self.owner
+        header = os.pread(self._fd, _HEADER.size, 0)
+        if len(header) == _HEADER.size:
+            magic, version, slots, file_owner, max_window = _HEADER.unpack(header)
+            if (
+                magic == _MAGIC
+                and version == _LAYOUT_VERSION
+                and slots == self.slots
+                and file_owner == owner
+                and max_window == self.max_window
+                and os.fstat(self._fd).st_size == self._size
+            ):
+                return
+        # Fichero nuevo, de otro arranque o de otro formato: vaciar.
+        # Se reescribe con ceros en lugar de truncar a 0 para no invalidar
+        # mapeos que otro proceso pudiera tener abiertos.
+        os.ftruncate(self._fd, self._size)
+        os.pwrite(self._fd, bytes(self._size - _HEADER.size), _HEADER.size)
+        os.pwrite(
+            self._fd,
+            _HEADER.pack(_MAGIC, _LAYOUT_VERSION, self.slots, owner, self.max_window),
+            0,
+        )
+
+    def recent(
+        self,
+        category_id: int,
+        limit: Optional[int] = None,
+        client: Optional[str] = None,
+    ) -> Container[int]:
+        size = self.window(category_id)
+        with self._locked():
+            offset, pushes = self._lookup(_slot_key(category_id, client))
+            if offset is None:
+                return _EMPTY
+            count = min(pushes, size if limit is None else min(limit, size))
+            return frozenset(
+                self._item(offset, (pushes - 1 - i) % size) for i in range(count)
+            )
+
+    def get_last(self, category_id: int, client: Optional[str] = None) -> Optional[int]:
+        with self._locked():
+            offset, pushes = self._lookup(_slot_key(category_id, client))
+            if offset is None or not pushes:
+                return None
+            return self._item(offset, (pushes - 1) % self.window(category_id))
+
+    def remember(
+        self, category_id: int, lexical_item_id: int, client: Optional[str] = None
+    ) -> None:
+        key = _slot_key(category_id, client)
+        now = time.time()
+        with self._locked():
+            offset = self._claim(key, now)
+            stored_key, pushes, used_at = _SLOT_HEAD.unpack_from(self._mm, offset)
+            if stored_key != key:
+                pushes = 0
+            elif self._expired(used_at, now):
+                self.expirations += 1
+                pushes = 0
+            _ITEM.pack_into(
+                self._mm,
+                offset + _SLOT_HEAD.size
+                + (pushes % self.window(category_id)) * _ITEM.size,
+                lexical_item_id,
+            )
+            _SLOT_HEAD.pack_into(self._mm, offset, key, pushes + 1, now)
+
+    def clear(self) -> None:
+        with self._locked():
+            self._mm[_HEADER.size:self._size] = bytes(self._size - _HEADER.size)
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+    def stats(self) -> dict:
+        """
+        `entries` recorre la tabla (O(slots)): solo para diagnóstico.
+        """
+        now = time.time()
+        with self._locked():
+            entries = 0
+            for index in range(self.slots):
+                key, _pushes, used_at = _SLOT_HEAD.unpack_from(
+                    self._mm, self._offset(index)
+                )
+                if key and not self._expired(used_at, now):
+                    entries += 1
+        return {
+            "backend": "shared",
+            "entries": entries,
+            "max_entries": self.slots,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _offset(self, index: int) -> int:
+        return _HEADER.size + index * self._slot_size
+
+    def _item(self, offset: int, position: int) -> int:
+        return _ITEM.unpack_from(
+            self._mm, offset + _SLOT_HEAD.size + position * _ITEM.size
+        )[0]
+
+    def _expired(self, used_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and used_at + self.ttl_seconds <= now
+
+    def _probes(self, key: int):
+        start = key % self.slots
+        for step in range(min(self.slots, _MAX_PROBES)):
+            yield self._offset((start + step) % self.slots)
+
+    def _lookup(self, key: int) -> tuple[Optional[int], int]:
+        """
+        (offset, nº de items añadidos) del slot vigente de la clave, o
+        (None, 0). Los slots nunca vuelven a quedar libres (salvo clear),
+        así que un slot libre corta la búsqueda.
+        """
+        for offset in self._probes(key):
+            stored_key, pushes, used_at = _SLOT_HEAD.unpack_from(self._mm, offset)
+            if stored_key == key:
+                if self._expired(used_at, time.time()):
+                    return None, 0
+                return offset, pushes
+            if stored_key == 0:
+                break
+        return None, 0
+
+    def _claim(self, key: int, now: float) -> int:
+        """
+        Offset del slot de la clave: el suyo, el primer libre de su cadena
+        o, con la cadena llena, uno caducado o el de uso más antiguo.
+        """
+        victim = None
+        victim_used_at = math.inf
+        for offset in self._probes(key):
+            stored_key, _pushes, used_at = _SLOT_HEAD.unpack_from(self._mm, offset)
+            if stored_key == key or stored_key == 0:
+                return offset
+            if used_at < victim_used_at:
+                victim, victim_used_at = offset, used_at
+        if self._expired(victim_used_at, now):
+            self.expirations += 1
+        else:
+            self.evictions += 1
+        return victim
+
+    def _locked(self):
+        if self._pid != os.getpid():
+            self._open()
+        return _FileLock(self._lock, self._fd, self._fcntl)
+
+
+class _FileLock:
     """
+    Lock de hilo + flock exclusivo del fichero, como context manager.
+    """
+
+    __slots__ = ("_lock", "_fd", "_fcntl")
+
+    def __init__(self, lock, fd, fcntl):
+        self._lock = lock
+        self._fd = fd
+        self._fcntl = fcntl
 
-    def __init__(self):
-        # { category_id: lexical_item_id }
-        self._last_items: dict[int, int] = {}
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+        except BaseException:
+            self._lock.release()
+            raise
 
-    def get_last(self, category_id: int) -> Optional[int]:
-        return self._last_items.get(category_id)
+    def __exit__(self, *_exc):
+        try:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+        finally:
+            self._lock.release()
 
-    def set_last(self, category_id: int, lexical_item_id: int) -> None:
-        self._last_items[category_id] = lexical_item_id
+
+def default_shared_memory_path() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "wintagma_modo_b.mem")
+
+
+def build_ephemeral_memory(settings=None) -> EphemeralMemory:
+    """
+    Construye el backend de memoria Modo B configurado en Settings.
+    """
+    settings = settings or get_settings()
+    if settings.modo_b_memory_backend == "shared":
+        return SharedEphemeralMemory(
+            path=settings.modo_b_memory_path or default_shared_memory_path(),
+            slots=settings.modo_b_memory_slots,
+            window=settings.modo_b_window,
+            windows=settings.modo_b_window_by_category,
+            ttl_seconds=settings.modo_b_memory_ttl_seconds,
+        )
+    return ProcessEphemeralMemory(
+        window=settings.modo_b_window,
+        windows=settings.modo_b_window_by_category,
+        max_entries=settings.modo_b_memory_max_entries,
+        ttl_seconds=settings.modo_b_memory_ttl_seconds,
+    )
 
 
-# Instancia global única permitida (memoria efímera del proceso)
-ephemeral_memory = EphemeralMemory()
+# Instancia global única permitida (memoria efímera del proceso / host)
+ephemeral_memory = build_ephemeral_memory()
@@ -0,0 +1,119 @@
+# backend/app/core/exercise_persistence.py
+
+from sqlalchemy import insert
+
+from app.models.exercise import Exercise
+from app.models.exercise_option import ExerciseOption
+
+_exercise_table = Exercise.__table__
+_option_table = ExerciseOption.__table__
+
+# INSERT ... RETURNING exercise_id. Con varias filas SQLAlchemy lo envía como
+# un único INSERT multi-VALUES ("insertmanyvalues") y sort_by_parameter_order
+# garantiza que los ids vuelven en el mismo orden que las filas.
+_insert_exercises = insert(_exercise_table).returning(
+    _exercise_table.c.exercise_id,
+    sort_by_parameter_order=True,
+)
+
+
+def _exercise_rows(exercises, with_ids: bool = False) -> list[dict]:
+    rows = []
+    for e in exercises:
+        row = {
+            "category_id": e.category_id,
+            "lexical_item_id": e.lexical_item_id,
+            "option_order": e.option_order,
+            "option_item_ids": e.option_item_ids,
+            "correct_option_id": e.correct_option_id,
+            "seed": e.seed,
+            "content_version": e.content_version,
+        }
+        if with_ids:
+            row["exercise_id"] = e.exercise_id
+        rows.append(row)
+    return rows
+
+
+def _insert_options(exercises, exercise_ids):
+    """
+    Un solo INSERT multi-fila con las opciones de todos los ejercicios.
+    Además asigna el exercise_id a los objetos en memoria, que es lo que
+    necesita la capa API para construir la respuesta.
+
+    Solo llevan filas de opciones los ejercicios sin almacenamiento
+    compacto (option_item_ids) ni semilla, es decir, los construidos a
+    mano con .options; si no hay ninguno devuelve None.
+    """
+    rows = []
+    for exercise, exercise_id in zip(exercises, exercise_ids):
+        exercise.exercise_id = exercise_id
+        if exercise.option_item_ids is not None or exercise.seed is not None:
+            continue
+        for opt in exercise.options:
+            rows.append(
+                {
+                    "exercise_id": exercise_id,
+                    "option_id": opt.option_id,
+                    "text": opt.text,
+                    "is_correct": opt.is_correct,
+                }
+            )
+    if not rows:
+        return None
+    return insert(_option_table).values(rows)
+
+
+def persist_exercises(session, exercises) -> list[int]:
+    """
+    Persiste Exercise + ExerciseOption con SQL por conjuntos:
+
+      1) INSERT INTO exercise ... RETURNING exercise_id   (todas las filas)
+      2) INSERT INTO exercise_option VALUES (...), (...)  (solo opciones
+         sin almacenamiento compacto, ver _insert_options)
+
+    Frente al unit-of-work del ORM (1 INSERT por ejercicio + 1 por opción
+    + SELECT del refresh) son 1-2 sentencias por llamada, sea 1 ejercicio
+    o un lote (los que genera ExerciseService solo necesitan la 1).
+    No hace commit: la transacción la cierra el llamador.
+    Los objetos no se añaden a la sesión.
+    """
+    if not exercises:
+        return []
+    exercise_ids = list(
+        session.execute(_insert_exercises, _exercise_rows(exercises)).scalars()
+    )
+    insert_options = _insert_options(exercises, exercise_ids)
+    if insert_options is not None:
+        session.execute(insert_options)
+    return exercise_ids
+
+
+def persist_exercises_with_ids(session, exercises) -> None:
+    """
+    Igual que persist_exercises() para ejercicios cuyo exercise_id ya se
+    reservó de la secuencia (write-behind, ver exercise_writer.py):
+    1-2 INSERT multi-fila, sin RETURNING. No hace commit.
+    """
+    if not exercises:
+        return
+    session.execute(
+        insert(_exercise_table).values(_exercise_rows(exercises, with_ids=True))
+    )
+    insert_options = _insert_options(exercises, [e.exercise_id for e in exercises])
+    if insert_options is not None:
+        session.execute(insert_options)
+
+
+async def apersist_exercises(session, exercises) -> list[int]:
+    """
+    Variante async de persist_exercises() para AsyncSession.
+    """
+    if not exercises:
+        return []
+    result = await session.execute(_insert_exercises, _exercise_rows(exercises))
+    exercise_ids = list(result.scalars())
+    insert_options = _insert_options(exercises, exercise_ids)
+    if insert_options is not None:
+        await session.execute(insert_options)
+    return exercise_ids
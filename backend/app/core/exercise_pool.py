@@ -0,0 +1,351 @@
+# backend/app/core/exercise_pool.py
+
+import logging
+import threading
+from collections import deque
+from typing import Optional
+
+from app.core.config import get_settings
+from app.core.content_cache import content_cache
+from app.core.exercise_memory import ephemeral_memory
+from app.core.exercise_persistence import persist_exercises
+from app.core.exercise_service import ExerciseService, modo_b_exclusion
+
+logger = logging.getLogger(__name__)
+
+# Ejercicios de un mismo INSERT al rellenar (ver _MAX_BATCH_SIZE del writer)
+_MAX_REFILL_BATCH = 1000
+
+
+class _CategoryPool:
+    """
+    Anillo de ejercicios ya persistidos de una categoría, todos generados
+    sobre el snapshot de contenido `version` (`snapshot`, tras el primer
+    relleno).
+    """
+
+    __slots__ = ("ring", "version", "snapshot", "last_item_id")
+
+    def __init__(self, capacity: int, version: int):
+        self.ring: deque = deque(maxlen=capacity)
+        self.version = version
+        self.snapshot = None
+        # Item correcto del último ejercicio encolado: el siguiente relleno
+        # lo excluye para que dos consecutivos nunca repitan
+        self.last_item_id: Optional[int] = None
+
+
+class ExercisePool:
+    """
+    Pools por categoría de ejercicios pre-generados y pre-persistidos.
+
+    /exercise/generate toma uno con take() en lugar de seleccionar,
+    barajar y persistir en línea; si el pool está vacío (o el modo
+    desactivado) take() devuelve None y el handler genera como siempre.
+
+    - Categorías calientes: una categoría entra en el pool la primera vez
+      que se pide (hasta `max_categories`); las demás siguen en línea.
+    - Un hilo rellena hasta `capacity` las que bajan de `low_water`
+      (al avisar take() o cada `refill_interval` segundos): un snapshot
+      de la caché de contenido, generación sin tocar la memoria efímera
+      y 2 INSERT + commit por categoría.
+    - Modo B al entregar: se salta cualquier ejercicio cuyo item correcto
+      sea el último de la memoria efímera y se entrega el primero del
+      anillo que no repita (dos consecutivos nunca comparten item, así
+      que casi siempre es el primero o el segundo).
+    - Si cambia la versión de la caché de contenido, los ejercicios
+      generados con la anterior se descartan.
+    - Los ejercicios que nunca se entregan quedan en la BD sin uso
+      (los purga el job de retención).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        capacity: int = 32,
+        low_water: int = 8,
+        max_categories: int = 64,
+        refill_interval: float = 1.0,
+        session_factory=None,
+        content=None,
+        memory=None,
+    ):
+        self.enabled = enabled
+        self.capacity = max(1, capacity)
+        self.low_water = max(0, min(low_water, self.capacity - 1))
+        self.max_categories = max_categories
+        self.refill_interval = refill_interval
+        self._session_factory = session_factory
+        self._content = content if content is not None else content_cache
+        self._memory = memory if memory is not None else ephemeral_memory
+
+        self._cond = threading.Condition()
+        self._pools: dict[int, _CategoryPool] = {}
+        # Categorías sin ejercicios posibles (insufficient_items) → versión
+        # de contenido en la que se comprobó
+        self._unpoolable: dict[int, int] = {}
+        # Un solo relleno a la vez (hilo de relleno o llamada directa)
+        self._refill_lock = threading.Lock()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.modo_b_skips = 0
+        self.discarded = 0
+        self.refills = 0
+        self.refilled = 0
+        self.refill_errors = 0
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if not self.enabled or self._running:
+            return
+        if self._session_factory is None:
+            from app.core.db import SessionLocal
+
+            self._session_factory = SessionLocal
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="exercise-pool-refill", daemon=True
+        )
+        self._thread.start()
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """
+        Para el hilo de relleno. Los ejercicios que quedan en los anillos
+        ya están en la BD; simplemente no se entregan.
+        """
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        with self._cond:
+            self._pools.clear()
+
+    # ------------------------------------------------------------------
+    # Consumidores (handlers de /exercise/generate)
+    # ------------------------------------------------------------------
+    def take(
+        self,
+        category_id: int,
+        client_key: Optional[str] = None,
+        previous_lexical_item_id: Optional[int] = None,
+    ):
+        """
+        Un Exercise persistido de la categoría que cumple Modo B, o None
+        si no hay (el llamador genera en línea). Actualiza la memoria
+        efímera igual que la generación en línea (ver ExerciseService:
+        ventana por cliente más `previous_lexical_item_id`).
+        """
+        if not self._running:
+            return None
+        with self._cond:
+            pool = self._pools.get(category_id)
+            if pool is None:
+                self._register(category_id)
+                self.misses += 1
+                return None
+
+            if pool.version != self._content.version:
+                self._reset(category_id, pool.version, self._content.version)
+
+            exercise = self._pop_modo_b(
+                category_id, pool, client_key, previous_lexical_item_id
+            )
+            if len(pool.ring) <= self.low_water:
+                self._cond.notify()
+            if exercise is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return exercise
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "enabled": self.enabled,
+                "running": self._running,
+                "capacity": self.capacity,
+                "low_water": self.low_water,
+                "categories": len(self._pools),
+                "depth": {
+                    category_id: len(pool.ring)
+                    for category_id, pool in self._pools.items()
+                },
+                "hits": self.hits,
+                "misses": self.misses,
+                "modo_b_skips": self.modo_b_skips,
+                "discarded": self.discarded,
+                "refills": self.refills,
+                "refilled": self.refilled,
+                "refill_errors": self.refill_errors,
+            }
+
+    # ------------------------------------------------------------------
+    # Relleno
+    # ------------------------------------------------------------------
+    def refill(self) -> int:
+        """
+        Rellena hasta `capacity` los pools en o por debajo de `low_water`.
+        Devuelve el nº de ejercicios añadidos. La llama el hilo de relleno
+        (y los tests directamente).
+        """
+        added = 0
+        with self._refill_lock:
+            for category_id, missing, version, after in self._refill_plan():
+                try:
+                    added += self._refill_category(
+                        category_id, missing, version, after
+                    )
+                except Exception:
+                    with self._cond:
+                        self.refill_errors += 1
+                    logger.exception(
+                        "Refill of exercise pool %s failed", category_id
+                    )
+        return added
+
+    def _refill_plan(self) -> list[tuple[int, int, int, Optional[int]]]:
+        with self._cond:
+            return [
+                (
+                    category_id,
+                    min(self.capacity - len(pool.ring), _MAX_REFILL_BATCH),
+                    pool.version,
+                    pool.last_item_id,
+                )
+                for category_id, pool in self._pools.items()
+                if len(pool.ring) <= self.low_water
+            ]
+
+    def _refill_category(
+        self, category_id: int, missing: int, version: int, after: Optional[int]
+    ) -> int:
+        with self._session_factory() as session:
+            snapshot = self._content.get_items(session, category_id)
+            if snapshot.version != version:
+                # Contenido nuevo: se descarta lo generado con el anterior
+                # y el siguiente relleno parte de cero
+                self._reset(category_id, version, snapshot.version)
+                return 0
+            try:
+                exercises = ExerciseService(session).build_exercises(
+                    snapshot, category_id, missing, previous_lexical_item_id=after
+                )
+            except ValueError:
+                # insufficient_items: en línea mientras no cambie el contenido
+                with self._cond:
+                    self._pools.pop(category_id, None)
+                    self._unpoolable[category_id] = version
+                return 0
+            persist_exercises(session, exercises)
+            session.commit()
+
+        with self._cond:
+            pool = self._pools.get(category_id)
+            if (
+                pool is None
+                or pool.version != version
+                or pool.last_item_id != after
+            ):
+                # El pool cambió durante el relleno (versión de contenido
+                # nueva, categoría retirada...): ejercicios huérfanos en BD
+                self.discarded += len(exercises)
+                return 0
+            pool.ring.extend(exercises)
+            pool.snapshot = snapshot
+            pool.last_item_id = exercises[-1].lexical_item_id
+            self.refills += 1
+            self.refilled += len(exercises)
+        return len(exercises)
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _register(self, category_id: int) -> None:
+        if self._unpoolable.get(category_id) == self._content.version:
+            return
+        if len(self._pools) >= self.max_categories:
+            return
+        self._pools[category_id] = _CategoryPool(
+            self.capacity, self._content.version
+        )
+        self._cond.notify()
+
+    def _reset(self, category_id: int, old_version: int, new_version: int) -> None:
+        with self._cond:
+            pool = self._pools.get(category_id)
+            if pool is None or pool.version != old_version:
+                return
+            self.discarded += len(pool.ring)
+            pool.ring.clear()
+            pool.snapshot = None
+            pool.last_item_id = None
+            pool.version = new_version
+
+    def _pop_modo_b(
+        self,
+        category_id: int,
+        pool: _CategoryPool,
+        client_key: Optional[str] = None,
+        previous_lexical_item_id: Optional[int] = None,
+    ):
+        if pool.snapshot is None:
+            return None
+        # Misma regla que la generación en línea (ventana recortada a la
+        # categoría), así que con K >= nº de items el pool sigue sirviendo
+        recent = modo_b_exclusion(
+            self._memory,
+            pool.snapshot,
+            category_id,
+            client_key,
+            previous_lexical_item_id,
+        )
+        for index, exercise in enumerate(pool.ring):
+            if exercise.lexical_item_id not in recent:
+                break
+            # El anillo se genera con la misma ventana, así que casi siempre
+            # basta con mirar los primeros
+            self.modo_b_skips += 1
+        else:
+            return None
+        del pool.ring[index]
+        self._memory.remember(
+            category_id, exercise.lexical_item_id, client=client_key
+        )
+        return exercise
+
+    def _refill_due(self) -> bool:
+        return any(
+            len(pool.ring) <= self.low_water for pool in self._pools.values()
+        )
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: not self._running or self._refill_due(),
+                    timeout=self.refill_interval,
+                )
+                if not self._running:
+                    return
+            self.refill()
+
+
+_settings = get_settings()
+
+# Instancia global del proceso; start()/close() desde el lifespan de la app
+exercise_pool = ExercisePool(
+    enabled=_settings.exercise_pool,
+    capacity=_settings.exercise_pool_size,
+    low_water=_settings.exercise_pool_low_water,
+    max_categories=_settings.exercise_pool_max_categories,
+    refill_interval=_settings.exercise_pool_refill_interval_seconds,
+)
@@ -0,0 +1,238 @@
+# backend/app/core/exercise_retention.py
+"""
+Mantenimiento de las particiones mensuales de exercise / exercise_option
+(migración 0004): crea las de los próximos meses y borra las caducadas,
+incluidas las filas caducadas que quedaron en las particiones DEFAULT.
+
+Borrar una partición es un DROP TABLE: sin DELETE fila a fila, sin
+hinchar índices ni trabajo para VACUUM.
+
+Pensado para ejecutarse a diario (cron, systemd timer, job de k8s...):
+
+    uv run python -m app.core.exercise_retention
+
+Varias ejecuciones simultáneas se serializan con un advisory lock.
+"""
+import json
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Orden de creación (la tabla referenciada primero); para borrar, al revés
+_TABLES = ("exercise", "exercise_option")
+_PARTITION_RE = re.compile(r"^exercise_p(\d{4})_(\d{2})$")
+_LOCK_SQL = text("SELECT pg_advisory_xact_lock(hashtext('wintagma:exercise_partitions'))")
+_EXISTING_SQL = text(
+    "SELECT c.relname FROM pg_inherits i "
+    "JOIN pg_class c ON c.oid = i.inhrelid "
+    "WHERE i.inhparent = 'exercise'::regclass"
+)
+
+
+def add_months(month: date, offset: int) -> date:
+    index = month.year * 12 + (month.month - 1) + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def months_to_create(existing: set[date], today: date, premake: int) -> list[date]:
+    """
+    Mes actual + `premake` siguientes que aún no tienen partición.
+    """
+    current = today.replace(day=1)
+    wanted = [add_months(current, i) for i in range(premake + 1)]
+    return [m for m in wanted if m not in existing]
+
+
+def expired_months(
+    existing: set[date], today: date, retention_days: int
+) -> list[date]:
+    """
+    Meses cuya partición ya solo contiene filas más antiguas que
+    `retention_days` (el mes entero termina antes del corte).
+    retention_days <= 0 desactiva el borrado.
+    """
+    if retention_days <= 0:
+        return []
+    cutoff = today - timedelta(days=retention_days)
+    return sorted(m for m in existing if add_months(m, 1) <= cutoff)
+
+
+def retention_cutoff(today: date, retention_days: int) -> Optional[date]:
+    """
+    Inicio del mes más antiguo que se conserva: lo anterior está caducado
+    (mismo criterio que expired_months). None si no hay borrado.
+    """
+    if retention_days <= 0:
+        return None
+    return (today - timedelta(days=retention_days)).replace(day=1)
+
+
+def _bounds(month: date) -> tuple[str, str]:
+    return (
+        f"{month.isoformat()} 00:00:00+00",
+        f"{add_months(month, 1).isoformat()} 00:00:00+00",
+    )
+
+
+def existing_months(conn) -> set[date]:
+    months = set()
+    for (relname,) in conn.execute(_EXISTING_SQL):
+        match = _PARTITION_RE.match(relname)
+        if match:
+            months.add(date(int(match.group(1)), int(match.group(2)), 1))
+    return months
+
+
+def create_month_partition(conn, month: date) -> None:
+    """
+    Crea la partición del mes en ambas tablas. Si la partición DEFAULT ya
+    tiene filas de ese mes (el job no se ejecutó a tiempo), se mueven a
+    la partición nueva antes de adjuntarla.
+    """
+    start, end = _bounds(month)
+    in_range = "created_at >= :start AND created_at < :end"
+    params = {"start": start, "end": end}
+
+    has_rows = conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM exercise_default WHERE {in_range})"),
+        params,
+    ).scalar()
+
+    if not has_rows:
+        for table in _TABLES:
+            conn.execute(
+                text(
+                    f"CREATE TABLE {partition_name(table, month)} "
+                    f"PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                )
+            )
+        return
+
+    logger.warning("Moving rows of %s out of the default partitions", month)
+    for table in _TABLES:
+        conn.execute(
+            text(
+                f"CREATE TABLE {partition_name(table, month)} "
+                f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        )
+    # Primero las opciones: así el DELETE de exercise no viola la FK
+    for table in reversed(_TABLES):
+        conn.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {table}_default "
+                f"WHERE {in_range} RETURNING *) "
+                f"INSERT INTO {partition_name(table, month)} SELECT * FROM moved"
+            ),
+            params,
+        )
+    for table in _TABLES:
+        conn.execute(
+            text(
+                f"ALTER TABLE {table} ATTACH PARTITION "
+                f"{partition_name(table, month)} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+        )
+
+
+def drop_month_partition(conn, month: date) -> None:
+    """
+    DETACH + DROP de la partición del mes en ambas tablas. Las opciones
+    primero; la de exercise no puede borrarse sin desadjuntarla antes
+    porque la FK de exercise_option depende de ella.
+    """
+    for table in reversed(_TABLES):
+        name = partition_name(table, month)
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        conn.execute(text(f"DROP TABLE {name}"))
+
+
+def purge_expired_default_rows(conn, before: date) -> int:
+    """
+    Borra de las particiones DEFAULT las filas anteriores a `before`.
+
+    Las filas de un mes sin partición caen en la DEFAULT y solo salen de
+    ella si ese mes se crea después (create_month_partition); un mes
+    pasado nunca se crea, así que sin esto la DEFAULT crecería sin
+    límite. Es un DELETE normal, pero la DEFAULT solo recibe filas cuando
+    el job no se ejecutó a tiempo. Devuelve los ejercicios borrados.
+    """
+    params = {"before": f"{before.isoformat()} 00:00:00+00"}
+    # Primero las opciones: así el DELETE de exercise no viola la FK
+    conn.execute(
+        text("DELETE FROM exercise_option_default WHERE created_at < :before"),
+        params,
+    )
+    purged = conn.execute(
+        text("DELETE FROM exercise_default WHERE created_at < :before"), params
+    ).rowcount
+    if purged:
+        logger.warning(
+            "Purged %d expired exercises from the default partition", purged
+        )
+    return purged
+
+
+def run_partition_maintenance(
+    conn,
+    retention_days: int,
+    premake_months: int,
+    today: Optional[date] = None,
+) -> dict:
+    """
+    Crea las particiones que faltan y borra las caducadas (y las filas
+    caducadas de las DEFAULT), en la transacción de `conn` (el DDL de
+    PostgreSQL es transaccional).
+    """
+    today = today or datetime.now(timezone.utc).date()
+    conn.execute(_LOCK_SQL)
+
+    existing = existing_months(conn)
+    created = months_to_create(existing, today, premake_months)
+    dropped = expired_months(existing, today, retention_days)
+
+    for month in created:
+        create_month_partition(conn, month)
+    for month in dropped:
+        drop_month_partition(conn, month)
+        logger.info("Dropped exercise partitions for %s", month)
+
+    cutoff = retention_cutoff(today, retention_days)
+    purged = purge_expired_default_rows(conn, cutoff) if cutoff else 0
+
+    return {
+        "created": [partition_name("exercise", m) for m in created],
+        "dropped": [partition_name("exercise", m) for m in dropped],
+        "purged_default": purged,
+    }
+
+
+def main() -> None:
+    from app.core.db import engine
+
+    settings = get_settings()
+    with engine.begin() as conn:
+        result = run_partition_maintenance(
+            conn,
+            retention_days=settings.exercise_retention_days,
+            premake_months=settings.exercise_partition_premake_months,
+        )
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,13 +1,153 @@
 # backend/app/core/exercise_service.py
 
 import random
-from typing import Optional
+from typing import Container, Optional
 
-from app.core.exercise_memory import ephemeral_memory
-from app.models.lexical_item import LexicalItem
+from app.core.category_sampler import WeightedCategories, category_sampler
+from app.core.config import get_settings
+from app.core.content_cache import content_cache
+from app.core.exercise_memory import RecentWindow, WithItem, ephemeral_memory
 from app.models.exercise import Exercise
 from app.models.exercise_option import ExerciseOption
 
+# Distractores por ejercicio (1 correcta + 4 = 5 opciones)
+_DISTRACTORS = 4
+
+_settings = get_settings()
+
+
+def _sample_other_indices(
+    size: int, exclude: int, k: int, rng: random.Random = random
+) -> list[int]:
+    """
+    k índices distintos de range(size) (size > k), todos distintos de
+    `exclude`, por muestreo con rechazo: O(k) esperado mientras k sea pequeño
+    frente a size, sin materializar range(size).
+    """
+    if size - 1 <= 2 * k:
+        # Categorías muy pequeñas: la lista es tan corta como la muestra
+        return rng.sample([i for i in range(size) if i != exclude], k)
+
+    seen = {exclude}
+    picked: list[int] = []
+    while len(picked) < k:
+        idx = rng.randrange(size)
+        if idx not in seen:
+            seen.add(idx)
+            picked.append(idx)
+    return picked
+
+
+# Sorteos rechazados antes de enumerar los candidatos fuera de la ventana
+_MAX_REJECTIONS = 16
+
+
+def _choose_outside(item_ids, recent: Container[int], rng: random.Random = random) -> int:
+    """
+    Índice aleatorio de item_ids cuyo item no esté en `recent` (la ventana
+    de Modo B, pertenencia O(1)), por rechazo: con una ventana pequeña
+    frente a la categoría basta casi siempre con un sorteo, sin recorrerla.
+    Solo si la ventana cubre casi toda la categoría (K cerca de size) se
+    enumeran los candidatos. `recent` debe dejar al menos uno fuera.
+    """
+    size = len(item_ids)
+    for _ in range(_MAX_REJECTIONS):
+        idx = rng.randrange(size)
+        if item_ids[idx] not in recent:
+            return idx
+    return rng.choice([i for i in range(size) if item_ids[i] not in recent])
+
+
+def modo_b_exclusion(
+    memory,
+    snapshot,
+    category_id: int,
+    client_key: Optional[str] = None,
+    previous_lexical_item_id: Optional[int] = None,
+) -> Container[int]:
+    """
+    Items que Modo B excluye como correcta, igual en línea y en el pool:
+    los últimos K de la ventana del cliente en `memory` y, si es item de
+    la categoría, `previous_lexical_item_id`. Como mucho size - 1 en
+    total, para que siempre quede un candidato.
+    """
+    previous = None
+    if (
+        previous_lexical_item_id is not None
+        and snapshot.index_of(previous_lexical_item_id) is not None
+    ):
+        previous = previous_lexical_item_id
+    limit = len(snapshot) - 1 - (previous is not None)
+    recent = memory.recent(category_id, limit=max(1, limit), client=client_key)
+    if previous is not None:
+        recent = WithItem(recent, previous)
+    return recent
+
+
+# ----------------------------------------------------------------------
+# Ejercicios con semilla (EXERCISE_SEEDED)
+#
+# Opciones y orden son función pura de (seed, lexical_item_id, versión de
+# contenido): en BD basta con guardar la semilla en `exercise`, sin filas
+# exercise_option, y validate recalcula la correcta en memoria.
+# ----------------------------------------------------------------------
+# option_id de las opciones de un ejercicio con semilla
+SEEDED_OPTION_IDS = (1, 2, 3, 4, 5)
+
+
+def content_version(snapshot) -> int:
+    """
+    Versión de contenido de una categoría: huella de 31 bits del etag
+    del snapshot (hash del contenido, estable entre workers y reinicios).
+    """
+    return int(snapshot.etag[:8], 16) & 0x7FFFFFFF
+
+
+def seeded_correct_option_id(seed: int) -> int:
+    """
+    option_id (1..5) de la opción correcta. Solo depende de la semilla:
+    /exercise/validate la calcula sin cargar el contenido.
+    """
+    return random.Random(seed).randrange(len(SEEDED_OPTION_IDS)) + 1
+
+
+def _seeded_option_texts(snapshot, correct_idx: int, seed: int) -> list[str]:
+    rng = random.Random(
+        f"{seed}:{snapshot.item_ids[correct_idx]}:{content_version(snapshot)}"
+    )
+    distractors = _sample_other_indices(len(snapshot), correct_idx, _DISTRACTORS, rng)
+    option_texts = [snapshot.texts[idx] for idx in distractors]
+    option_texts.insert(
+        seeded_correct_option_id(seed) - 1, snapshot.texts[correct_idx]
+    )
+    return option_texts
+
+
+def seeded_option_texts(
+    snapshot, seed: int, lexical_item_id: int, version: int
+) -> Optional[list[str]]:
+    """
+    Textos de las 5 opciones (en orden de option_id) de un ejercicio con
+    semilla. None si el contenido de la categoría ya no es el de
+    `version` o el item ya no está: las opciones no se pueden reconstruir.
+    """
+    if version != content_version(snapshot):
+        return None
+    idx = snapshot.index_of(lexical_item_id)
+    if idx is None:
+        return None
+    return _seeded_option_texts(snapshot, idx, seed)
+
+
+def _weighted_categories(snapshots, weights) -> WeightedCategories:
+    """
+    Tabla alias (cacheada) de una sesión mixta; `weights` son pares
+    (category_id, peso) en el orden de `snapshots`.
+    """
+    return category_sampler.get(
+        snapshots, [weight for _, weight in weights], _DISTRACTORS + 1
+    )
+
 
 class ExerciseService:
     """
@@ -18,14 +158,29 @@ class ExerciseService:
     - 1 opción correcta + 4 distractores.
     - Aleatorización del orden de opciones.
 
+    Con `seeded` (por defecto EXERCISE_SEEDED) distractores y orden salen
+    de una semilla por ejercicio (ver seeded_option_texts).
+
+    `client_key` (cabecera X-Client-Id) separa la memoria de Modo B de
+    cada cliente; sin clave se usa la ventana anónima común. Un
+    `previous_lexical_item_id` que sea item de la categoría se excluye
+    además de la ventana (los clientes que no lo conocen envían 0).
+
     Además, esta implementación acepta de forma flexible varios patrones de llamada
     para evitar TypeError por 'db' como keyword en tests antiguos, sin cambiar
     la lógica de negocio.
     """
 
-    def __init__(self, db):
+    def __init__(
+        self,
+        db,
+        seeded: Optional[bool] = None,
+        client_key: Optional[str] = None,
+    ):
         # Sesión de base de datos (SQLAlchemy Session)
         self.db = db
+        self.seeded = _settings.exercise_seeded if seeded is None else seeded
+        self.client_key = client_key
 
     def _generate_core(
         self,
@@ -38,62 +193,215 @@ class ExerciseService:
         Separamos esto en un método privado para poder reutilizarlo
         desde el wrapper flexible generate_exercise().
         """
-        # 1. Obtener todos los items de la categoría
-        items = (
-            session.query(LexicalItem)
-            .filter(LexicalItem.category_id == category_id)
-            .all()
+        # 1. Obtener los items de la categoría (snapshot cacheado en proceso)
+        snapshot = content_cache.get_items(session, category_id)
+        return self._build_exercise(snapshot, category_id, previous_lexical_item_id)
+
+    async def agenerate_exercise(
+        self,
+        category_id: int,
+        previous_lexical_item_id: Optional[int] = None,
+    ) -> Exercise:
+        """
+        Variante async para la ruta ASYNC_DB: self.db es una AsyncSession.
+        Solo cambia la carga del snapshot; la selección es la misma.
+        """
+        snapshot = await content_cache.aget_items(self.db, category_id)
+        return self._build_exercise(snapshot, category_id, previous_lexical_item_id)
+
+    def generate_exercises(self, category_id: int, count: int) -> list[Exercise]:
+        """
+        Genera `count` ejercicios de la misma categoría con una sola carga
+        del snapshot. Cada ejercicio actualiza la memoria efímera, así que
+        Modo B se cumple también entre ejercicios consecutivos del lote.
+        """
+        snapshot = content_cache.get_items(self.db, category_id)
+        return [self._build_exercise(snapshot, category_id) for _ in range(count)]
+
+    async def agenerate_exercises(
+        self, category_id: int, count: int
+    ) -> list[Exercise]:
+        """
+        Variante async de generate_exercises().
+        """
+        snapshot = await content_cache.aget_items(self.db, category_id)
+        return [self._build_exercise(snapshot, category_id) for _ in range(count)]
+
+    # ------------------------------------------------------------------
+    # Sesiones mixtas: varias categorías con peso
+    # ------------------------------------------------------------------
+    def choose_category(self, weights) -> int:
+        """
+        Sorteo ponderado de la categoría de un ejercicio de sesión mixta:
+        `weights` son pares (category_id, peso) y cada item pesa lo que su
+        categoría. Una consulta como mucho (snapshots que falten) y O(1)
+        por sorteo.
+        """
+        snapshots = content_cache.get_items_many(self.db, [c for c, _ in weights])
+        return _weighted_categories(snapshots, weights).choose().category_id
+
+    async def achoose_category(self, weights) -> int:
+        """
+        Variante async de choose_category().
+        """
+        snapshots = await content_cache.aget_items_many(
+            self.db, [c for c, _ in weights]
         )
+        return _weighted_categories(snapshots, weights).choose().category_id
 
-        if not items:
-            # La ET habla de insufficient_items a nivel de API; aquí usamos
-            # ValueError para que la capa API lo traduzca al error normativo.
-            raise ValueError("insufficient_items")
+    def generate_mixed_exercises(self, weights, count: int) -> list[Exercise]:
+        """
+        `count` ejercicios de una sesión mixta: cada uno sortea su categoría
+        y sus distractores salen de esa misma categoría. Modo B se aplica
+        por categoría, como en generate_exercises().
+        """
+        snapshots = content_cache.get_items_many(self.db, [c for c, _ in weights])
+        return self._build_mixed(_weighted_categories(snapshots, weights), count)
 
-        # 2. NO REPETICIÓN INMEDIATA — MODO B (memoria efímera, no persistente)
-        last_mem = ephemeral_memory.get_last(category_id)
+    async def agenerate_mixed_exercises(
+        self, weights, count: int
+    ) -> list[Exercise]:
+        """
+        Variante async de generate_mixed_exercises().
+        """
+        snapshots = await content_cache.aget_items_many(
+            self.db, [c for c, _ in weights]
+        )
+        return self._build_mixed(_weighted_categories(snapshots, weights), count)
 
-        candidates = items
-        if len(items) > 1 and last_mem is not None:
-            # Excluimos el último lexical_item si hay más de uno
-            filtered = [
-                i for i in items if i.lexical_item_id != last_mem
-            ]
-            candidates = filtered or items  # fallback por seguridad
+    def _build_mixed(self, categories: WeightedCategories, count: int) -> list[Exercise]:
+        exercises = []
+        for _ in range(count):
+            snapshot = categories.choose()
+            exercises.append(self._build_exercise(snapshot, snapshot.category_id))
+        return exercises
 
-        # Selección aleatoria del lexical item correcto
-        correct_item = random.choice(candidates)
+    def build_exercises(
+        self,
+        snapshot,
+        category_id: int,
+        count: int,
+        previous_lexical_item_id: Optional[int] = None,
+    ) -> list[Exercise]:
+        """
+        Genera `count` ejercicios sobre un snapshot SIN leer ni actualizar
+        la memoria efímera: cada uno excluye el item correcto del anterior
+        (el primero, `previous_lexical_item_id`), de modo que la secuencia
+        cumple Modo B por sí misma. La usa el pool de ejercicios
+        pre-generados, que aplica Modo B al entregarlos.
+        """
+        exercises = []
+        # Ventana local del mismo K que la memoria efímera
+        window = RecentWindow(
+            min(ephemeral_memory.window(category_id), max(1, len(snapshot) - 1))
+        )
+        if previous_lexical_item_id is not None:
+            window.push(previous_lexical_item_id)
+        for _ in range(count):
+            exercise = self._select_exercise(snapshot, category_id, window)
+            window.push(exercise.lexical_item_id)
+            exercises.append(exercise)
+        return exercises
+
+    def _build_exercise(
+        self,
+        snapshot,
+        category_id: int,
+        previous_lexical_item_id: Optional[int] = None,
+    ) -> Exercise:
+        """
+        Selección y construcción del ejercicio a partir del snapshot
+        de contenido. No hace I/O, por eso la comparten sync y async.
+        """
+        # 2. NO REPETICIÓN — MODO B (memoria efímera, no persistente)
+        recent = modo_b_exclusion(
+            ephemeral_memory,
+            snapshot,
+            category_id,
+            self.client_key,
+            previous_lexical_item_id,
+        )
+        exercise = self._select_exercise(snapshot, category_id, recent)
 
         # Actualizar memoria efímera
-        ephemeral_memory.set_last(category_id, correct_item.lexical_item_id)
-
-        # 3. DISTRACTORES (misma categoría, 4 elementos)
-        distractor_pool = [
-            i for i in items if i.lexical_item_id != correct_item.lexical_item_id
-        ]
+        ephemeral_memory.remember(
+            category_id, exercise.lexical_item_id, client=self.client_key
+        )
+        return exercise
 
-        # Asumimos que hay al menos 4 distractores disponibles según el baseline de datos
-        distractors = random.sample(distractor_pool, 4)
+    def _select_exercise(
+        self, snapshot, category_id: int, recent: Container[int]
+    ) -> Exercise:
+        """
+        Selección (excluyendo como correcta los items de `recent`, la
+        ventana de Modo B), distractores y orden de opciones. No toca la
+        memoria efímera.
+        """
+        item_ids = snapshot.item_ids
+        texts = snapshot.texts
+        size = len(item_ids)
 
-        # 4. Construcción de opciones y aleatorización
-        option_texts = [correct_item.text] + [d.text for d in distractors]
-        random.shuffle(option_texts)
+        if size <= _DISTRACTORS:
+            # La ET habla de insufficient_items a nivel de API; aquí usamos
+            # ValueError para que la capa API lo traduzca al error normativo.
+            # (Sin 4 distractores posibles no hay ejercicio válido.)
+            raise ValueError("insufficient_items")
 
+        # La selección trabaja por índices sobre el snapshot, sin copiar
+        # listas de candidatos: coste O(k) esperado, independiente de size.
+        correct_idx = _choose_outside(item_ids, recent)
+        correct_item_id = item_ids[correct_idx]
         option_order = [1, 2, 3, 4, 5]
 
+        if self.seeded:
+            # Distractores y posición de la correcta derivados de la semilla
+            seed = random.getrandbits(63)
+            correct_option_id = seeded_correct_option_id(seed)
+            exercise = Exercise(
+                category_id=category_id,
+                lexical_item_id=correct_item_id,
+                option_order=option_order,
+                seed=seed,
+                content_version=content_version(snapshot),
+            )
+            exercise.options = [
+                ExerciseOption(
+                    option_id=idx,
+                    text=text,
+                    is_correct=(idx == correct_option_id),
+                )
+                for idx, text in enumerate(
+                    _seeded_option_texts(snapshot, correct_idx, seed), start=1
+                )
+            ]
+            return exercise
+
+        # 3. DISTRACTORES (misma categoría, 4 elementos distintos)
+        distractors = _sample_other_indices(size, correct_idx, _DISTRACTORS)
+
+        # 4. Construcción de opciones y aleatorización (por índice: cada
+        #    opción conserva su lexical_item_id)
+        option_indices = [correct_idx] + distractors
+        random.shuffle(option_indices)
+        correct_option_id = option_indices.index(correct_idx) + 1
+
+        # Almacenamiento compacto (0007): ids de las opciones y posición de
+        # la correcta en la propia fila exercise; el texto sale del contenido
         exercise = Exercise(
             category_id=category_id,
-            lexical_item_id=correct_item.lexical_item_id,
+            lexical_item_id=correct_item_id,
             option_order=option_order,
+            option_item_ids=[item_ids[idx] for idx in option_indices],
+            correct_option_id=correct_option_id,
         )
 
         exercise.options = []
-        for idx, text in enumerate(option_texts, start=1):
+        for option_id, idx in enumerate(option_indices, start=1):
             exercise.options.append(
                 ExerciseOption(
-                    option_id=idx,
-                    text=text,
-                    is_correct=(text == correct_item.text),
+                    option_id=option_id,
+                    text=texts[idx],
+                    is_correct=(option_id == correct_option_id),
                 )
             )
 
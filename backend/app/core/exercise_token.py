@@ -0,0 +1,113 @@
+# backend/app/core/exercise_token.py
+
+import base64
+import hashlib
+import hmac
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import get_settings
+
+_TOKEN_VERSION = 1
+# version (B) + exercise_id (I) + nº de opciones (B)
+_HEADER = struct.Struct(">BIB")
+# HMAC-SHA256 truncado: suficiente contra falsificación y mantiene el token corto
+_MAC_SIZE = 16
+
+
+@dataclass(frozen=True)
+class ExerciseClaims:
+    """
+    Lo que /exercise/validate necesita saber de un ejercicio.
+    """
+
+    exercise_id: int
+    option_ids: tuple[int, ...]
+    correct_option_id: int
+
+    @classmethod
+    def from_exercise(cls, exercise) -> "ExerciseClaims":
+        """
+        Claims de un Exercise con exercise_id y opciones en memoria.
+        """
+        return cls(
+            exercise_id=exercise.exercise_id,
+            option_ids=tuple(opt.option_id for opt in exercise.options),
+            correct_option_id=next(
+                opt.option_id for opt in exercise.options if opt.is_correct
+            ),
+        )
+
+
+class ExerciseTokenSigner:
+    """
+    Tokens firmados (HMAC) que llevan consigo la solución del ejercicio,
+    para que /exercise/validate pueda resolver sin leer de la BD.
+
+    Formato (base64url sin padding, ~38 caracteres para 5 opciones):
+        version | exercise_id | n | option_id * n | correct_option_id ^ mask | mac
+
+    La opción correcta va enmascarada con un byte derivado de la clave:
+    el cliente no puede leer la solución decodificando el token.
+    """
+
+    def __init__(self, secret: str):
+        self._key = secret.encode("utf-8")
+
+    def sign(
+        self,
+        exercise_id: int,
+        option_ids,
+        correct_option_id: int,
+    ) -> str:
+        option_ids = tuple(option_ids)
+        prefix = (
+            _HEADER.pack(_TOKEN_VERSION, exercise_id, len(option_ids))
+            + bytes(option_ids)
+        )
+        payload = prefix + bytes((correct_option_id ^ self._mask(prefix),))
+        raw = payload + self._mac(payload)
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    def verify(self, token: str) -> Optional[ExerciseClaims]:
+        """
+        Devuelve los claims si el token es auténtico; None si está
+        mal formado, es de otra versión o la firma no coincide.
+        """
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except (ValueError, TypeError):
+            return None
+
+        if len(raw) < _HEADER.size + 1 + _MAC_SIZE:
+            return None
+        payload, mac = raw[:-_MAC_SIZE], raw[-_MAC_SIZE:]
+        if not hmac.compare_digest(mac, self._mac(payload)):
+            return None
+
+        version, exercise_id, count = _HEADER.unpack_from(payload)
+        if version != _TOKEN_VERSION or len(payload) != _HEADER.size + count + 1:
+            return None
+        prefix = payload[:-1]
+        return ExerciseClaims(
+            exercise_id=exercise_id,
+            option_ids=tuple(prefix[_HEADER.size:]),
+            correct_option_id=payload[-1] ^ self._mask(prefix),
+        )
+
+    def _mask(self, prefix: bytes) -> int:
+        return hmac.new(self._key, b"mask" + prefix, hashlib.sha256).digest()[0]
+
+    def _mac(self, payload: bytes) -> bytes:
+        return hmac.new(self._key, payload, hashlib.sha256).digest()[:_MAC_SIZE]
+
+
+_settings = get_settings()
+
+# Instancia global; None si no hay EXERCISE_TOKEN_SECRET (modo desactivado)
+exercise_token_signer: Optional[ExerciseTokenSigner] = (
+    ExerciseTokenSigner(_settings.exercise_token_secret)
+    if _settings.exercise_token_secret
+    else None
+)
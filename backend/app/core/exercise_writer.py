@@ -0,0 +1,347 @@
+# backend/app/core/exercise_writer.py
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from sqlalchemy import exc, text
+
+from app.core.config import get_settings
+from app.core.exercise_persistence import persist_exercises_with_ids
+from app.core.exercise_token import ExerciseClaims
+
+logger = logging.getLogger(__name__)
+
+# nextval() no es transaccional: los ids reservados no se liberan con el
+# rollback de la sesión del request (como cualquier INSERT fallido).
+_NEXT_IDS_SQL = text(
+    "SELECT nextval(pg_get_serial_sequence('exercise', 'exercise_id')) "
+    "FROM generate_series(1, :n)"
+)
+
+# 5 opciones x 4 columnas por ejercicio: con 1000 ejercicios el INSERT de
+# exercise_option queda en 20000 parámetros, lejos del límite de 65535.
+_MAX_BATCH_SIZE = 1000
+
+# Reintentos de un lote durante el apagado antes de darlo por perdido
+_SHUTDOWN_ATTEMPTS = 3
+# Reintentos de un lote con un error no transitorio (p.ej. una FK rota
+# porque se borró el lexical_item) antes de aislar / descartar ejercicios
+_PERMANENT_ATTEMPTS = 3
+
+# Resultado de _write()
+_PERSISTED = "persisted"
+_GAVE_UP = "gave_up"  # apagado: sin más reintentos
+_FAILED = "failed"  # error no transitorio
+
+
+def _is_transient(error: Exception) -> bool:
+    """
+    Errores de conexión / servidor que se resuelven reintentando: la BD
+    caída o reiniciándose, conexión cortada, pool agotado, deadlock...
+    Cualquier otro (integridad, datos) fallará igual en cada reintento.
+    """
+    if isinstance(error, exc.DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(
+        error,
+        (exc.OperationalError, exc.InterfaceError, exc.TimeoutError, ConnectionError),
+    )
+
+
+class ExerciseWriteBehind:
+    """
+    Persistencia diferida (write-behind) de ejercicios generados.
+
+    /exercise/generate reserva el exercise_id de la secuencia (en bloques,
+    sin commit), deja el ejercicio en una cola acotada y responde; un hilo
+    lo escribe en exercise / exercise_option por lotes, al llegar a
+    `batch_size` o pasados `flush_interval` segundos.
+
+    - Backpressure: con `max_pending` ejercicios sin persistir, submit()
+      devuelve False y el llamador persiste en línea como siempre.
+    - Sin start() (o tras close()) submit() también devuelve False.
+    - Mientras no se han escrito, get_pending() devuelve sus claims para
+      que /exercise/validate los encuentre. La cola es de cada worker: con
+      varios workers de uvicorn, un validate que llega a otro worker antes
+      del flush (como mucho ~flush_interval) no lo encuentra y responde
+      404 exercise_not_found; el cliente debe validar tras un reintento.
+    - Errores: los de conexión (ver _is_transient) se reintentan sin límite
+      mientras el writer está en marcha. Con cualquier otro, tras
+      _PERMANENT_ATTEMPTS intentos el lote se escribe ejercicio a ejercicio
+      y los que siguen fallando se descartan (log + contador `dropped`),
+      para que un ejercicio roto no bloquee el hilo ni llene la cola.
+    - close() vacía la cola antes de parar (lifespan de la app).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        max_pending: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        id_block_size: int = 100,
+        session_factory=None,
+    ):
+        self.enabled = enabled
+        self.max_pending = max_pending
+        self.batch_size = max(1, min(batch_size, _MAX_BATCH_SIZE))
+        self.flush_interval = flush_interval
+        self.id_block_size = max(1, id_block_size)
+        self._session_factory = session_factory
+
+        self._cond = threading.Condition()
+        self._queue: deque = deque()
+        # exercise_id → claims de los ejercicios aún no confirmados en BD
+        self._pending: dict[int, ExerciseClaims] = {}
+        # Encolados + en vuelo (el límite de max_pending cuenta ambos)
+        self._reserved = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._ids_lock = threading.Lock()
+        self._ids: deque[int] = deque()
+
+        self.submitted = 0
+        self.flushed = 0
+        self.batches = 0
+        self.rejected = 0
+        self.flush_errors = 0
+        self.dropped = 0
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if not self.enabled or self._running:
+            return
+        if self._session_factory is None:
+            from app.core.db import SessionLocal
+
+            self._session_factory = SessionLocal
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="exercise-write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """
+        Deja de aceptar ejercicios y espera a que se escriban los pendientes.
+        """
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.error(
+                    "Write-behind did not finish in %ss; %d exercises pending",
+                    timeout,
+                    len(self._pending),
+                )
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Productores (handlers de /exercise/generate)
+    # ------------------------------------------------------------------
+    def submit(self, session, exercises) -> bool:
+        """
+        Asigna exercise_id y encola los ejercicios. False si el modo está
+        parado o la cola llena: el llamador debe persistirlos en línea.
+        """
+        count = len(exercises)
+        if not self._reserve(count):
+            return False
+        try:
+            ids = self._take_ids(count)
+            if ids is None:
+                ids = self._store_ids(
+                    count,
+                    session.execute(
+                        _NEXT_IDS_SQL, {"n": self._block(count)}
+                    ).scalars().all(),
+                )
+        except Exception:
+            self._release(count)
+            raise
+        self._enqueue(exercises, ids)
+        return True
+
+    async def asubmit(self, session, exercises) -> bool:
+        """
+        Variante async de submit() para AsyncSession.
+        """
+        count = len(exercises)
+        if not self._reserve(count):
+            return False
+        try:
+            ids = self._take_ids(count)
+            if ids is None:
+                result = await session.execute(
+                    _NEXT_IDS_SQL, {"n": self._block(count)}
+                )
+                ids = self._store_ids(count, result.scalars().all())
+        except Exception:
+            self._release(count)
+            raise
+        self._enqueue(exercises, ids)
+        return True
+
+    def get_pending(self, exercise_id: int) -> Optional[ExerciseClaims]:
+        with self._cond:
+            return self._pending.get(exercise_id)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "enabled": self.enabled,
+                "running": self._running,
+                "pending": self._reserved,
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "flushed": self.flushed,
+                "batches": self.batches,
+                "rejected": self.rejected,
+                "flush_errors": self.flush_errors,
+                "dropped": self.dropped,
+            }
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _reserve(self, count: int) -> bool:
+        with self._cond:
+            if not self._running:
+                return False
+            if self._reserved + count > self.max_pending:
+                self.rejected += count
+                return False
+            self._reserved += count
+            return True
+
+    def _release(self, count: int) -> None:
+        with self._cond:
+            self._reserved -= count
+            self._cond.notify()
+
+    def _block(self, count: int) -> int:
+        return max(count, self.id_block_size)
+
+    def _take_ids(self, count: int) -> Optional[list[int]]:
+        with self._ids_lock:
+            if len(self._ids) < count:
+                return None
+            return [self._ids.popleft() for _ in range(count)]
+
+    def _store_ids(self, count: int, ids) -> list[int]:
+        """
+        Usa los `count` primeros ids del bloque y guarda el resto.
+        """
+        with self._ids_lock:
+            self._ids.extend(ids[count:])
+        return list(ids[:count])
+
+    def _enqueue(self, exercises, ids) -> None:
+        for exercise, exercise_id in zip(exercises, ids):
+            exercise.exercise_id = exercise_id
+        claims = [ExerciseClaims.from_exercise(e) for e in exercises]
+        with self._cond:
+            self._queue.extend(exercises)
+            for c in claims:
+                self._pending[c.exercise_id] = c
+            self.submitted += len(exercises)
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                # Al parar, esperar también a los submit() ya admitidos
+                self._cond.wait_for(
+                    lambda: self._queue
+                    or (not self._running and self._reserved == 0)
+                )
+                if not self._queue:
+                    return  # parado y sin pendientes
+                if self._running and len(self._queue) < self.batch_size:
+                    # Agrupar lo que llegue durante flush_interval
+                    self._cond.wait_for(
+                        lambda: len(self._queue) >= self.batch_size
+                        or not self._running,
+                        timeout=self.flush_interval,
+                    )
+                size = min(len(self._queue), self.batch_size)
+                batch = [self._queue.popleft() for _ in range(size)]
+            self._flush(batch)
+
+    def _flush(self, batch) -> None:
+        outcome = self._write(batch)
+        if outcome == _FAILED and len(batch) > 1:
+            # Aislar el ejercicio defectuoso: el resto del lote se persiste
+            logger.warning(
+                "Write-behind batch of %d exercises keeps failing; "
+                "retrying them one by one",
+                len(batch),
+            )
+            for exercise in batch:
+                self._flush([exercise])
+            return
+        if outcome == _FAILED:
+            logger.error(
+                "Dropping unpersistable exercise %s", batch[0].exercise_id
+            )
+        elif outcome == _GAVE_UP:
+            logger.error("Dropping %d unpersisted exercises on shutdown", len(batch))
+
+        with self._cond:
+            # Solo tras el commit: validate pasa de _pending a la BD sin hueco
+            for exercise in batch:
+                self._pending.pop(exercise.exercise_id, None)
+            self._reserved -= len(batch)
+            if outcome == _PERSISTED:
+                self.flushed += len(batch)
+                self.batches += 1
+            else:
+                self.dropped += len(batch)
+
+    def _write(self, batch) -> str:
+        attempt = 0
+        while True:
+            try:
+                with self._session_factory() as session:
+                    persist_exercises_with_ids(session, batch)
+                    session.commit()
+                return _PERSISTED
+            except Exception as error:
+                attempt += 1
+                transient = _is_transient(error)
+                with self._cond:
+                    self.flush_errors += 1
+                    stopping = not self._running
+                logger.exception(
+                    "Write-behind flush of %d exercises failed (attempt %d)",
+                    len(batch),
+                    attempt,
+                )
+                if not transient and attempt >= _PERMANENT_ATTEMPTS:
+                    return _FAILED
+                if stopping and attempt >= _SHUTDOWN_ATTEMPTS:
+                    return _GAVE_UP
+                # Los ejercicios siguen en _pending: validate los resuelve
+                time.sleep(min(0.1 * 2 ** attempt, 5.0))
+
+
+_settings = get_settings()
+
+# Instancia global del proceso; start()/close() desde el lifespan de la app
+exercise_writer = ExerciseWriteBehind(
+    enabled=_settings.write_behind,
+    max_pending=_settings.write_behind_max_pending,
+    batch_size=_settings.write_behind_batch_size,
+    flush_interval=_settings.write_behind_flush_interval_seconds,
+    id_block_size=_settings.write_behind_id_block_size,
+)
@@ -0,0 +1,227 @@
+# backend/app/core/export.py
+"""
+Exportación NDJSON (una línea JSON por registro) de ejercicios y contenido
+para analítica, con memoria constante sea cual sea el tamaño de las tablas:
+
+- Cursor de servidor de PostgreSQL (stream_results) leído por bloques de
+  `yield_per` filas; nunca se materializa el resultado completo.
+- Las líneas se emiten en trozos a medida que llegan las filas.
+
+La usan los endpoints GET /export/* (app/api/export.py) y la CLI:
+
+    uv run python -m app.core.export exercises --category-id 1 > exercises.ndjson
+    uv run python -m app.core.export content > content.ndjson
+"""
+import argparse
+import itertools
+import json
+import sys
+from typing import Iterator, Optional
+
+from sqlalchemy import and_, func, select, true
+
+from app.core.config import get_settings
+from app.models.category import Category
+from app.models.exercise import Exercise
+from app.models.exercise_option import ExerciseOption
+from app.models.lexical_item import LexicalItem
+
+
+def _dumps(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def exercises_query(
+    category_id: Optional[int] = None,
+    min_id: Optional[int] = None,
+    max_id: Optional[int] = None,
+):
+    """
+    Filas exercise + opciones ordenadas por (exercise_id, option_id): las
+    opciones de un ejercicio llegan consecutivas.
+
+    - Opciones compactas (0007): unnest(option_item_ids) WITH ORDINALITY
+      y el texto actual de cada lexical_item (NULL si se ha borrado).
+    - Filas exercise_option: ejercicios anteriores no convertidos.
+    - Ejercicios con semilla: una sola fila con option_id NULL.
+
+    Cada ejercicio tiene como mucho una de las dos fuentes de opciones,
+    así que los dos outer join no multiplican filas.
+    """
+    compact = (
+        func.unnest(Exercise.option_item_ids)
+        .table_valued("lexical_item_id", with_ordinality="option_id")
+        .render_derived(name="compact_option")
+    )
+    option_id = func.coalesce(ExerciseOption.option_id, compact.c.option_id).label(
+        "option_id"
+    )
+    query = (
+        select(
+            Exercise.exercise_id,
+            Exercise.category_id,
+            Exercise.lexical_item_id,
+            Exercise.option_order,
+            Exercise.created_at,
+            Exercise.seed,
+            Exercise.content_version,
+            option_id,
+            func.coalesce(ExerciseOption.text, LexicalItem.text).label("text"),
+            func.coalesce(
+                ExerciseOption.is_correct,
+                compact.c.option_id == Exercise.correct_option_id,
+            ).label("is_correct"),
+        )
+        .outerjoin(
+            ExerciseOption,
+            # created_at en el join: poda de particiones (migración 0004)
+            and_(
+                ExerciseOption.exercise_id == Exercise.exercise_id,
+                ExerciseOption.created_at == Exercise.created_at,
+            ),
+        )
+        # Una función en FROM ya es LATERAL en PostgreSQL
+        .outerjoin(compact, true())
+        .outerjoin(LexicalItem, LexicalItem.lexical_item_id == compact.c.lexical_item_id)
+        .order_by(Exercise.exercise_id, option_id)
+    )
+    if category_id is not None:
+        query = query.where(Exercise.category_id == category_id)
+    if min_id is not None:
+        query = query.where(Exercise.exercise_id >= min_id)
+    if max_id is not None:
+        query = query.where(Exercise.exercise_id <= max_id)
+    return query
+
+
+def content_query(
+    category_id: Optional[int] = None,
+    min_id: Optional[int] = None,
+    max_id: Optional[int] = None,
+):
+    """
+    Un registro por lexical_item con su categoría, ordenados por
+    (category_id, lexical_item_id). El rango filtra lexical_item_id.
+    """
+    query = (
+        select(
+            Category.category_id,
+            Category.name,
+            LexicalItem.lexical_item_id,
+            LexicalItem.text,
+        )
+        .join(LexicalItem, LexicalItem.category_id == Category.category_id)
+        .order_by(Category.category_id, LexicalItem.lexical_item_id)
+    )
+    if category_id is not None:
+        query = query.where(Category.category_id == category_id)
+    if min_id is not None:
+        query = query.where(LexicalItem.lexical_item_id >= min_id)
+    if max_id is not None:
+        query = query.where(LexicalItem.lexical_item_id <= max_id)
+    return query
+
+
+def exercise_lines(rows) -> Iterator[str]:
+    """
+    Agrupa las filas consecutivas de un mismo ejercicio en una línea:
+    {"exercise_id", "category_id", "lexical_item_id", "option_order",
+     "created_at", "seed", "content_version",
+     "options": [{"option_id", "text", "is_correct"}, ...]}
+
+    Los ejercicios con semilla salen con "options": null; se reconstruyen
+    con exercise_service.seeded_option_texts() y el contenido de la
+    categoría (GET /export/content) mientras su versión no cambie.
+    """
+    for exercise_id, group in itertools.groupby(rows, key=lambda r: r[0]):
+        first = next(group)
+        options = [first] + list(group)
+        yield _dumps(
+            {
+                "exercise_id": exercise_id,
+                "category_id": first[1],
+                "lexical_item_id": first[2],
+                "option_order": list(first[3]),
+                "created_at": first[4].isoformat() if first[4] else None,
+                "seed": first[5],
+                "content_version": first[6],
+                "options": None
+                if first[5] is not None
+                else [
+                    {"option_id": o[7], "text": o[8], "is_correct": o[9]}
+                    for o in options
+                ],
+            }
+        )
+
+
+def content_lines(rows) -> Iterator[str]:
+    for category_id, name, lexical_item_id, text in rows:
+        yield _dumps(
+            {
+                "category_id": category_id,
+                "category_name": name,
+                "lexical_item_id": lexical_item_id,
+                "text": text,
+            }
+        )
+
+
+def _chunks(lines: Iterator[str], size: int) -> Iterator[str]:
+    """
+    Junta las líneas de `size` en `size` para no escribir (ni enviar
+    al socket) cada una por separado.
+    """
+    while True:
+        chunk = "".join(itertools.islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def stream_ndjson(
+    engine,
+    query,
+    to_lines,
+    yield_per: int = 1000,
+) -> Iterator[str]:
+    """
+    Ejecuta `query` con un cursor de servidor y emite NDJSON por trozos.
+    La conexión se abre al empezar a iterar y se devuelve al pool al
+    terminar (o al cerrar el generador si el cliente se desconecta).
+    """
+    with engine.connect() as conn:
+        result = conn.execution_options(
+            stream_results=True, yield_per=yield_per
+        ).execute(query)
+        yield from _chunks(to_lines(result), yield_per)
+
+
+EXPORTS = {
+    "exercises": (exercises_query, exercise_lines),
+    "content": (content_query, content_lines),
+}
+
+
+def main() -> None:
+    from app.core.db import engine
+
+    parser = argparse.ArgumentParser(
+        description="Exporta ejercicios o contenido en NDJSON a stdout."
+    )
+    parser.add_argument("what", choices=sorted(EXPORTS))
+    parser.add_argument("--category-id", type=int)
+    parser.add_argument("--min-id", type=int)
+    parser.add_argument("--max-id", type=int)
+    args = parser.parse_args()
+
+    build_query, to_lines = EXPORTS[args.what]
+    query = build_query(args.category_id, args.min_id, args.max_id)
+    for chunk in stream_ndjson(
+        engine, query, to_lines, yield_per=get_settings().export_yield_per
+    ):
+        sys.stdout.write(chunk)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+# backend/app/core/metrics.py
+"""
+Métricas del proceso en formato de texto de Prometheus (GET /metrics).
+
+Registro propio y mínimo (contadores e histogramas con etiquetas, sin
+dependencias): cada observación es una búsqueda binaria en los buckets y
+una suma bajo un lock, así que se puede dejar activo en producción.
+
+- HTTP: requests y latencia por ruta (plantilla, no path concreto) y
+  errores por código normativo ({"error": ...}); ver app/api/metrics.py.
+- SQL: sentencias y su duración por engine y operación, con los eventos
+  before/after_cursor_execute de SQLAlchemy, y sentencias por request
+  y ruta (app/core/query_budget.py).
+- Pools de conexiones: gauges y contadores de checkout (get_pool_stats).
+
+Como /health/*, los valores son de ESTE worker: con varios workers de
+uvicorn Prometheus debe agregar por instancia (etiqueta pid).
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import event
+
+from app.core.db import get_pool_stats
+
+# Buckets por defecto de los clientes de Prometheus (segundos)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Sentencias SQL por request (app/core/query_budget.py)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+# Las sentencias SQL son más cortas: más resolución por debajo de 10 ms
+DB_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def family(
+    name: str, kind: str, help_text: str, samples: Iterable[tuple[dict, float]]
+) -> list[str]:
+    """
+    Líneas de texto de una familia de métricas (HELP, TYPE y muestras).
+    Para los collectors que calculan sus valores al renderizar.
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        names = tuple(labels)
+        lines.append(
+            f"{name}{_labels(names, tuple(labels.values()))} {_number(value)}"
+        )
+    return lines
+
+
+class Counter:
+    """
+    Contador monótono con etiquetas (valores en el orden de labelnames).
+    """
+
+    def __init__(
+        self, name: str, help_text: str, labelnames: tuple[str, ...] = ()
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: tuple = ()) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in values:
+            lines.append(
+                f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            )
+        return lines
+
+
+class Histogram:
+    """
+    Histograma con buckets fijos y etiquetas.
+
+    Por combinación de etiquetas guarda un contador por bucket (no
+    acumulado: una sola suma por observación) y la suma de valores;
+    los acumulados de Prometheus se calculan al renderizar.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = HTTP_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels → [contadores por bucket (+Inf al final), suma]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, labels: tuple = ()) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[0]) if series else 0
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            series = sorted(
+                (labels, list(counts), total)
+                for labels, (counts, total) in self._series.items()
+            )
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        names = self.labelnames + ("le",)
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_labels(names, labels + (_number(bound),))} {cumulative}"
+                )
+            suffix = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {_number(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Métricas registradas + collectors (funciones que devuelven líneas ya
+    formateadas, para valores que se leen al renderizar, como los pools).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: list = []
+        self._collectors: list[Callable[[], list[str]]] = []
+
+    def counter(
+        self, name: str, help_text: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = HTTP_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], list[str]]) -> None:
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        for collector in collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+
+# Registro global del proceso (como content_cache / exercise_writer)
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "http_requests_total",
+    "Requests HTTP atendidos por ruta, método y status.",
+    ("method", "route", "status"),
+)
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "Latencia de los requests HTTP (hasta el último byte de la respuesta).",
+    ("method", "route"),
+    HTTP_BUCKETS,
+)
+http_errors = metrics.counter(
+    "http_errors_total",
+    'Respuestas de error por ruta y código normativo ({"error": ...}).',
+    ("route", "error"),
+)
+http_request_db_queries = metrics.histogram(
+    "http_request_db_queries",
+    "Sentencias SQL emitidas por request, por ruta.",
+    ("route",),
+    QUERY_COUNT_BUCKETS,
+)
+db_statement_duration = metrics.histogram(
+    "db_statement_duration_seconds",
+    "Sentencias SQL ejecutadas y su duración, por engine y operación.",
+    ("engine", "operation"),
+    DB_BUCKETS,
+)
+db_statement_errors = metrics.counter(
+    "db_statement_errors_total",
+    "Sentencias SQL que fallaron, por engine y operación.",
+    ("engine", "operation"),
+)
+
+
+# ----------------------------------------------------------------------
+# SQLAlchemy: eventos de cursor
+# ----------------------------------------------------------------------
+_STARTED_KEY = "metrics_statement_started"
+_OPERATIONS = {
+    "SELECT": "select",
+    "INSERT": "insert",
+    "UPDATE": "update",
+    "DELETE": "delete",
+}
+
+_instrumented_lock = threading.Lock()
+_instrumented_engines: set[str] = set()
+
+
+def statement_operation(statement: str) -> str:
+    """
+    select / insert / update / delete / other (primera palabra).
+    """
+    return _OPERATIONS.get(statement.lstrip()[:6].upper(), "other")
+
+
+def instrument_engine(engine, name: str) -> None:
+    """
+    Registra los eventos de cursor en `engine` (el engine síncrono; para
+    un AsyncEngine, su .sync_engine) con la etiqueta engine=`name`.
+    Idempotente: create_app() se llama varias veces en los tests.
+    """
+    with _instrumented_lock:
+        if name in _instrumented_engines:
+            return
+        _instrumented_engines.add(name)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info[_STARTED_KEY] = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop(_STARTED_KEY, None)
+        if started is not None:
+            db_statement_duration.observe(
+                (name, statement_operation(statement)), time.perf_counter() - started
+            )
+
+    def handle_error(exception_context):
+        if exception_context.connection is not None:
+            exception_context.connection.info.pop(_STARTED_KEY, None)
+        if exception_context.statement is not None:
+            db_statement_errors.inc(
+                (name, statement_operation(exception_context.statement))
+            )
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+# ----------------------------------------------------------------------
+# Pools de conexiones (se leen al renderizar)
+# ----------------------------------------------------------------------
+_POOL_GAUGES = (
+    ("db_pool_size", "size", "Conexiones fijas del pool."),
+    ("db_pool_checked_out", "checked_out", "Conexiones en uso."),
+    ("db_pool_checked_in", "checked_in", "Conexiones libres en el pool."),
+    ("db_pool_overflow", "overflow", "Overflow del pool (negativo: huecos sin abrir)."),
+)
+_POOL_COUNTERS = (
+    ("db_pool_checkouts_total", "checkouts", "Checkouts de conexión servidos."),
+    ("db_pool_waits_total", "waits", "Checkouts que esperaron por pool agotado."),
+    ("db_pool_timeouts_total", "timeouts", "Checkouts que agotaron DB_POOL_TIMEOUT."),
+    (
+        "db_pool_checkout_seconds_total",
+        "checkout_seconds_total",
+        "Tiempo acumulado en checkouts.",
+    ),
+)
+
+
+def pool_metrics(stats: Optional[dict] = None) -> list[str]:
+    """
+    Collector de los pools (sync y async) a partir de get_pool_stats().
+    """
+    if stats is None:
+        stats = get_pool_stats()
+    pid = str(os.getpid())
+    pools = [(name, pool) for name, pool in stats.items() if pool]
+    lines: list[str] = []
+    for kind, definitions in (("gauge", _POOL_GAUGES), ("counter", _POOL_COUNTERS)):
+        for metric, key, help_text in definitions:
+            lines.extend(
+                family(
+                    metric,
+                    kind,
+                    help_text,
+                    [({"pool": name, "pid": pid}, pool[key]) for name, pool in pools],
+                )
+            )
+    return lines
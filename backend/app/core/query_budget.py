@@ -0,0 +1,172 @@
+# backend/app/core/query_budget.py
+"""
+Registro de las sentencias SQL que emite cada request (presupuesto de
+queries).
+
+Los endpoints encadenan varias consultas secuenciales (generate: categoría,
+items, inserts, commit...) y nada impide que un cambio añada otra, o un
+N+1, sin que se note. Aquí se cuentan con el evento before_cursor_execute
+de SQLAlchemy:
+
+- queries: sentencias enviadas al servidor (cada ejecución del cursor;
+  un INSERT de varias filas con insertmanyvalues cuenta por lote).
+- round_trips: queries + COMMIT / ROLLBACK. El pre-ping del pool
+  (DB_POOL_PRE_PING) no pasa por el cursor y no se cuenta.
+
+Dos formas de registrar:
+
+- recording(): registra lo que ejecuta el contexto actual (contextvar;
+  se propaga al threadpool de los handlers síncronos). Lo usa
+  MetricsMiddleware para el histograma de queries por ruta.
+- capture_queries() / assert_max_queries(): todo lo que ejecuta el
+  proceso mientras dura el bloque, con listeners temporales. Son los
+  helpers de los tests de presupuesto por ruta (tests/test_api_query_budget.py).
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+
+
+@dataclass
+class QueryRecorder:
+    """
+    Sentencias registradas (texto SQL, en orden) y transacciones cerradas.
+    """
+
+    statements: list[str] = field(default_factory=list)
+    transactions: int = 0
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def queries(self) -> int:
+        return len(self.statements)
+
+    @property
+    def round_trips(self) -> int:
+        return len(self.statements) + self.transactions
+
+    def add_statement(self, statement: str) -> None:
+        with self._lock:
+            self.statements.append(statement)
+
+    def add_transaction(self) -> None:
+        with self._lock:
+            self.transactions += 1
+
+    def report(self) -> str:
+        lines = [
+            f"{self.queries} queries, {self.round_trips} round trips:",
+            *(f"  {i}. {' '.join(s.split())}" for i, s in enumerate(self.statements, 1)),
+        ]
+        return "\n".join(lines)
+
+
+_current: ContextVar[Optional[QueryRecorder]] = ContextVar(
+    "query_recorder", default=None
+)
+
+_installed_lock = threading.Lock()
+_installed_engines: set[int] = set()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.add_statement(statement)
+
+
+def _end_transaction(conn):
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.add_transaction()
+
+
+def install(engine) -> None:
+    """
+    Listeners permanentes de recording() en `engine` (el síncrono; para un
+    AsyncEngine, su .sync_engine). Sin recording() activo solo cuestan un
+    ContextVar.get(). Idempotente.
+    """
+    with _installed_lock:
+        if id(engine) in _installed_engines:
+            return
+        _installed_engines.add(id(engine))
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "commit", _end_transaction)
+    event.listen(engine, "rollback", _end_transaction)
+
+
+@contextmanager
+def recording() -> Iterator[QueryRecorder]:
+    """
+    Registra las sentencias del contexto actual en un QueryRecorder nuevo
+    (los engines deben tener install()).
+    """
+    recorder = QueryRecorder()
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+def _default_engines() -> tuple:
+    from app.core.db import async_engine, engine
+
+    return (engine, async_engine.sync_engine)
+
+
+@contextmanager
+def capture_queries(*engines) -> Iterator[QueryRecorder]:
+    """
+    Registra TODAS las sentencias de `engines` (por defecto el sync y el
+    async de app.core.db) mientras dura el bloque, en cualquier hilo.
+    """
+    engines = engines or _default_engines()
+    recorder = QueryRecorder()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        recorder.add_statement(statement)
+
+    def end_transaction(conn):
+        recorder.add_transaction()
+
+    listeners = [
+        ("before_cursor_execute", before_cursor_execute),
+        ("commit", end_transaction),
+        ("rollback", end_transaction),
+    ]
+    for engine in engines:
+        for name, fn in listeners:
+            event.listen(engine, name, fn)
+    try:
+        yield recorder
+    finally:
+        for engine in engines:
+            for name, fn in listeners:
+                event.remove(engine, name, fn)
+
+
+@contextmanager
+def assert_max_queries(
+    max_queries: int, max_round_trips: Optional[int] = None, *engines
+) -> Iterator[QueryRecorder]:
+    """
+    Falla (AssertionError con las sentencias) si el bloque emite más de
+    `max_queries` sentencias o más de `max_round_trips` idas a la BD.
+    """
+    with capture_queries(*engines) as recorder:
+        yield recorder
+    assert recorder.queries <= max_queries, (
+        f"query budget exceeded (max {max_queries}): {recorder.report()}"
+    )
+    if max_round_trips is not None:
+        assert recorder.round_trips <= max_round_trips, (
+            f"round-trip budget exceeded (max {max_round_trips}): {recorder.report()}"
+        )
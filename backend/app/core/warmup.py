@@ -0,0 +1,128 @@
+# backend/app/core/warmup.py
+"""
+Calentamiento al arrancar y estado de readiness (GET /health/ready).
+
+El lifespan de la app, antes de aceptar tráfico:
+
+- abre DB_POOL_WARMUP_CONNECTIONS conexiones del pool que van a usar
+  los routers (sync o async) y las deja en el pool;
+- con WARMUP_CONTENT, carga la caché de contenido (categorías e items,
+  content_cache.reload) y el bundle de contenido.
+
+Hasta que termina, /health/ready responde 503 y el orquestador no envía
+tráfico. Si falla (BD no disponible al arrancar), la app arranca igual
+sin estar lista y cada sondeo de /health/ready lo reintenta. Al parar,
+vuelve a 503 (draining) antes de cerrar writer, pools y engines.
+"""
+import logging
+import time
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.content_bundle import content_bundle_cache
+from app.core.content_cache import content_cache
+from app.core.db import awarm_pool, init_engines, warm_pool
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """
+    Estado del calentamiento del proceso (uno por worker).
+
+    arun() se llama desde el event loop: el flag _running (comprobado y
+    fijado sin await de por medio) evita calentamientos simultáneos.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self._running = False
+
+        self.attempts = 0
+        self.connections = 0
+        self.categories = 0
+        self.duration_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    async def arun(self, async_db: bool) -> bool:
+        """
+        Calienta pool y cachés; True si la app queda lista.
+        No lanza: un fallo se registra y deja ready=False.
+        """
+        if self.ready or self.draining or self._running:
+            return self.ready
+        self._running = True
+        self.attempts += 1
+        started = time.perf_counter()
+        try:
+            settings = get_settings()
+            await run_in_threadpool(init_engines)
+            connections = min(settings.db_pool_warmup_connections, settings.db_pool_size)
+            if async_db:
+                self.connections = await awarm_pool(connections)
+            else:
+                self.connections = await run_in_threadpool(warm_pool, connections)
+            if settings.warmup_content:
+                self.categories = await run_in_threadpool(_warm_content)
+        except Exception as exc:
+            logger.exception("Warmup failed; /health/ready will retry")
+            self.last_error = type(exc).__name__
+            return False
+        finally:
+            self._running = False
+        self.duration_seconds = round(time.perf_counter() - started, 4)
+        self.last_error = None
+        self.ready = True
+        logger.info(
+            "Warmup done in %.3fs (%d connections, %d categories)",
+            self.duration_seconds,
+            self.connections,
+            self.categories,
+        )
+        return True
+
+    def reset(self) -> None:
+        """
+        Inicio de un lifespan: aún no listo ni en apagado.
+        """
+        self.ready = False
+        self.draining = False
+
+    def drain(self) -> None:
+        """
+        Apagado: deja de estar listo (el orquestador deja de enviar tráfico).
+        """
+        self.draining = True
+        self.ready = False
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "draining": self.draining,
+            "attempts": self.attempts,
+            "connections": self.connections,
+            "categories": self.categories,
+            "duration_seconds": self.duration_seconds,
+            "last_error": self.last_error,
+        }
+
+
+def _warm_content() -> int:
+    """
+    Carga la caché de contenido y el bundle con una sesión síncrona
+    (las cachés son compartidas por los routers sync y async).
+    Devuelve el nº de categorías cargadas.
+    """
+    from app.core.db import SessionLocal
+
+    with SessionLocal() as session:
+        content_cache.reload(session)
+        content_bundle_cache.get_bundle(session)
+        return content_cache.stats()["categories_cached"]
+
+
+# Instancia global del proceso (como exercise_writer / exercise_pool)
+warmup = Warmup()
@@ -1,35 +1,121 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.db import dispose_engines, on_engines_created
+from app.core.exercise_pool import exercise_pool
+from app.core.exercise_writer import exercise_writer
+from app.core.metrics import instrument_engine, metrics, pool_metrics
+from app.core import query_budget
+from app.core.warmup import warmup
 
 # Routers del backend
 from app.api import content
+from app.api import health as health_api
 from app.api import exercise as exercise_api
+from app.api import export as export_api
+from app.api import metrics as metrics_api
 from app.api import validate as validate_api
 
+# Routers async (opt-in con ASYNC_DB)
+from app.api import content_async
+from app.api import exercise_async
+from app.api import validate_async
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Engines (se crean aquí, no al importar) y calentamiento de pool y
+    # cachés; /health/ready responde 200 al terminar. Si la BD no está,
+    # la app arranca sin estar lista y /health/ready lo reintenta.
+    warmup.reset()
+    await warmup.arun(app.state.async_db)
+    # Write-behind (WRITE_BEHIND): hilo de flush mientras la app está viva;
+    # al parar se escriben los ejercicios pendientes antes de salir.
+    exercise_writer.start()
+    # Pools de ejercicios (EXERCISE_POOL): hilo de relleno
+    exercise_pool.start()
+    try:
+        yield
+    finally:
+        warmup.drain()
+        await run_in_threadpool(exercise_pool.close)
+        await run_in_threadpool(exercise_writer.close)
+        await dispose_engines()
+
+
+def _instrument_engines(engines) -> None:
+    instrument_engine(engines.engine, "sync")
+    instrument_engine(engines.async_engine.sync_engine, "async")
+    query_budget.install(engines.engine)
+    query_budget.install(engines.async_engine.sync_engine)
+
+
+def create_app(async_db: Optional[bool] = None) -> FastAPI:
+    """
+    Construye la aplicación.
 
-def create_app() -> FastAPI:
-    app = FastAPI(title="Wintagma SW Backend")
+    async_db=None toma el valor de ASYNC_DB; True monta los routers async
+    (AsyncSession), False los síncronos de siempre. Los contratos son idénticos.
+    """
+    settings = get_settings()
+    if async_db is None:
+        async_db = settings.async_db
+
+    app = FastAPI(title="Wintagma SW Backend", lifespan=lifespan)
+    app.state.async_db = async_db
+
+    content_router = content_async.router if async_db else content.router
+    exercise_router = exercise_async.router if async_db else exercise_api.router
+    validate_router = validate_async.router if async_db else validate_api.router
 
     # ----- Routers del módulo CONTENT -----
     app.include_router(
-        content.router,
+        content_router,
         prefix="/content",
         tags=["content"]
     )
 
     # ----- Routers del módulo EXERCISE -----
     app.include_router(
-        exercise_api.router,
+        exercise_router,
         prefix="/exercise",
         tags=["exercise"]
     )
 
     # ----- Routers del módulo VALIDATION -----
     app.include_router(
-        validate_api.router,
+        validate_router,
         prefix="/exercise",
         tags=["exercise"]
     )
 
+    # ----- Exportación NDJSON para analítica (solo con EXPORT_TOKEN) -----
+    if settings.export_token is not None:
+        app.include_router(
+            export_api.router,
+            prefix="/export",
+            tags=["export"]
+        )
+
+    # ----- Observabilidad (liveness/readiness, pool, cachés, write-behind...) -----
+    app.include_router(
+        health_api.router,
+        prefix="/health",
+        tags=["health"]
+    )
+
+    # ----- Métricas Prometheus (METRICS, activo por defecto) -----
+    if settings.metrics:
+        # Al crear los engines (lifespan o primer uso)
+        on_engines_created(_instrument_engines)
+        metrics.add_collector(pool_metrics)
+        app.add_middleware(metrics_api.MetricsMiddleware)
+        app.include_router(metrics_api.router, tags=["metrics"])
+
     return app
 
 
@@ -2,10 +2,12 @@ from .category import Category
 from .lexical_item import LexicalItem
 from .exercise import Exercise
 from .exercise_option import ExerciseOption
+from .content_change import ContentChange
 
 __all__ = [
     "Category",
     "LexicalItem",
     "Exercise",
     "ExerciseOption",
+    "ContentChange",
 ]
@@ -1,6 +1,7 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from sqlalchemy import Integer, ForeignKey
+from sqlalchemy import BigInteger, DateTime, Integer, ForeignKey, SmallInteger, func
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -10,6 +11,9 @@ from app.db.base import Base
 class Exercise(Base):
     __tablename__ = "exercise"
 
+    # En BD la PK es (exercise_id, created_at) porque la tabla está
+    # particionada por created_at (0004); exercise_id sigue siendo único
+    # (secuencia) y es la identidad del ORM.
     exercise_id: Mapped[int] = mapped_column(
         Integer, primary_key=True, autoincrement=True
     )
@@ -23,6 +27,24 @@ class Exercise(Base):
     option_order: Mapped[List[int]] = mapped_column(
         ARRAY(Integer), nullable=False
     )
+    # Opciones compactas (0007): lexical_item_id de las 5 opciones en orden
+    # de option_id y option_id de la correcta; el texto se resuelve contra
+    # el contenido al leer. NULL en ejercicios con semilla y en los que
+    # conservan sus filas exercise_option (anteriores a 0007 no resolubles)
+    option_item_ids: Mapped[Optional[List[int]]] = mapped_column(
+        ARRAY(Integer), nullable=True
+    )
+    correct_option_id: Mapped[Optional[int]] = mapped_column(
+        SmallInteger, nullable=True
+    )
+    # Ejercicios con semilla (EXERCISE_SEEDED, 0006): las opciones no se
+    # guardan, se derivan de (seed, lexical_item_id, content_version)
+    seed: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    content_version: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Clave de partición (mensual); la asigna la BD con now()
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
 
     # Relaciones mínimas, sin alterar ingeniería
     category = relationship("Category")
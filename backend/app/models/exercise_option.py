@@ -1,4 +1,6 @@
-from sqlalchemy import Integer, String, Boolean, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, Boolean, ForeignKey, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -7,7 +9,8 @@ from app.db.base import Base
 class ExerciseOption(Base):
     __tablename__ = "exercise_option"
 
-    # Clave primaria compuesta: (exercise_id, option_id)
+    # Clave primaria compuesta: (exercise_id, option_id). En BD incluye
+    # además created_at y la FK es (exercise_id, created_at) (0004).
     exercise_id: Mapped[int] = mapped_column(
         ForeignKey("exercise.exercise_id"),
         primary_key=True,
@@ -24,6 +27,12 @@ class ExerciseOption(Base):
         Boolean,
         nullable=False,
     )
+    # Clave de partición: mismo now() que su ejercicio (misma transacción)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
 
     exercise = relationship(
         "Exercise",
@@ -1,12 +1,22 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from typing_extensions import TypedDict
 
 class CategorySchema(BaseModel):
     category_id: int
     name: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CategoryListResponse(BaseModel):
     categories: list[CategorySchema]
+
+
+# Misma forma como TypedDict (ver app/schemas/lexical_item.py)
+class CategoryDict(TypedDict):
+    category_id: int
+    name: str
+
+
+class CategoryListDict(TypedDict):
+    categories: list[CategoryDict]
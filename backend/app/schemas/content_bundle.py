@@ -0,0 +1,22 @@
+# backend/app/schemas/content_bundle.py
+from pydantic import BaseModel
+
+from app.schemas.category import CategorySchema
+from app.schemas.lexical_item import LexicalItemSchema
+
+
+class CategoryChanges(BaseModel):
+    upserted: list[CategorySchema]
+    deleted: list[int]
+
+
+class LexicalItemChanges(BaseModel):
+    upserted: list[LexicalItemSchema]
+    deleted: list[int]
+
+
+class ContentDeltaResponse(BaseModel):
+    version: int
+    since: int
+    categories: CategoryChanges
+    items: LexicalItemChanges
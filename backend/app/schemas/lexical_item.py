@@ -1,5 +1,6 @@
 # backend/app/schemas/lexical_item.py
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from typing_extensions import TypedDict
 
 
 class LexicalItemSchema(BaseModel):
@@ -7,9 +8,21 @@ class LexicalItemSchema(BaseModel):
     category_id: int
     text: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class LexicalItemListResponse(BaseModel):
     items: list[LexicalItemSchema]
+
+
+# Misma forma como TypedDict: validarla no crea un objeto por item, así
+# que la respuesta de una categoría grande se valida y serializa rápido
+# (ver app/api/serialization.py). Debe coincidir con los modelos de arriba.
+class LexicalItemDict(TypedDict):
+    lexical_item_id: int
+    category_id: int
+    text: str
+
+
+class LexicalItemListDict(TypedDict):
+    items: list[LexicalItemDict]
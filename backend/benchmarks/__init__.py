@@ -0,0 +1,2 @@
+# Benchmarks del backend (no se ejecutan con pytest).
+# Ejecutar desde backend/: uv run python -m benchmarks.<modulo>
@@ -0,0 +1,141 @@
+# backend/benchmarks/bench_async_vs_sync.py
+"""
+Benchmark de throughput: routers síncronos vs async (ASYNC_DB).
+
+Arranca `uvicorn app.main:app` dos veces (ASYNC_DB=0 y ASYNC_DB=1) contra la
+BD de DATABASE_URL y lanza N clientes concurrentes que repiten el flujo
+categories → items → generate → validate durante unos segundos.
+
+Uso (desde backend/, con la BD migrada):
+
+    uv run python -m benchmarks.bench_async_vs_sync --concurrency 500 --duration 20
+
+Imprime un JSON con req/s, latencias y estado del pool (/health/pool)
+por modo. El tamaño del pool se ajusta con DB_POOL_SIZE / DB_MAX_OVERFLOW.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+async def _wait_until_up(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get("/docs")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+async def _client_loop(client, category_id, stop_at, latencies, errors):
+    while time.monotonic() < stop_at:
+        started = time.perf_counter()
+        try:
+            r = await client.get("/content/categories")
+            r.raise_for_status()
+            r = await client.get(f"/content/items/{category_id}")
+            r.raise_for_status()
+            r = await client.post(
+                "/exercise/generate", json={"category_id": category_id}
+            )
+            r.raise_for_status()
+            data = r.json()
+            r = await client.post(
+                "/exercise/validate",
+                json={
+                    "exercise_id": data["exercise_id"],
+                    "selected_option_id": data["options"][0]["option_id"],
+                },
+            )
+            r.raise_for_status()
+        except (httpx.HTTPError, KeyError, ValueError):
+            errors.append(1)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def _run_load(base_url, concurrency, duration, category_id) -> dict:
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    latencies: list[float] = []
+    errors: list[int] = []
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60.0
+    ) as client:
+        stop_at = time.monotonic() + duration
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                _client_loop(client, category_id, stop_at, latencies, errors)
+                for _ in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        pool = (await client.get("/health/pool")).json()
+
+    flows = len(latencies)
+    quantiles = statistics.quantiles(latencies, n=100) if flows >= 2 else [0.0] * 99
+    return {
+        "flows": flows,
+        "errors": len(errors),
+        "requests_per_second": round(flows * 4 / elapsed, 1),
+        "flow_latency_ms": {
+            "p50": round(quantiles[49] * 1000, 1),
+            "p95": round(quantiles[94] * 1000, 1),
+            "p99": round(quantiles[98] * 1000, 1),
+        },
+        "pool": pool,
+    }
+
+
+def _bench_mode(async_db: bool, args) -> dict:
+    env = dict(os.environ, ASYNC_DB="1" if async_db else "0")
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(args.port),
+            "--log-level", "warning",
+        ],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(_wait_until_up(base_url))
+        return asyncio.run(
+            _run_load(base_url, args.concurrency, args.duration, args.category_id)
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--category-id", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    results = {
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "sync": _bench_mode(False, args),
+        "async": _bench_mode(True, args),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
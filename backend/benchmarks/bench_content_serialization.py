@@ -0,0 +1,121 @@
+# backend/benchmarks/bench_content_serialization.py
+"""
+Micro-benchmark de la serialización de GET /content/items/{category_id}
+(sin BD ni HTTP) para categorías grandes.
+
+Por tamaño de categoría compara el coste por request de producir el
+cuerpo JSON a partir del snapshot de ContentCache:
+
+  - response_model: el handler devuelve un dict y FastAPI lo valida contra
+                    response_model y lo serializa (serialize_response con
+                    el response_field real de la ruta; sin contar el salto
+                    extra al threadpool de los handlers síncronos)
+  - type_adapter:   un TypeAdapter precompilado valida una vez y serializa
+                    con dump_json (coste de la primera request por snapshot)
+  - cached:         cuerpo ya serializado de EncodedBodyCache (resto de
+                    requests mientras no cambie el snapshot)
+
+Uso (desde backend/):
+
+    uv run python -m benchmarks.bench_content_serialization --sizes 100,10000,100000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi.routing import serialize_response
+
+from app.api import content as content_api
+from app.api.serialization import EncodedBodyCache
+from app.core.content_cache import ContentCache
+
+_CATEGORY_ID = 1
+
+
+def _items_route():
+    for route in content_api.router.routes:
+        if route.path == "/items/{category_id}":
+            return route
+    raise RuntimeError("route /items/{category_id} not found")
+
+
+def _legacy_payload(snapshot) -> dict:
+    return {
+        "items": [
+            {
+                "lexical_item_id": item_id,
+                "category_id": snapshot.category_id,
+                "text": text,
+            }
+            for item_id, text in zip(snapshot.item_ids, snapshot.texts)
+        ]
+    }
+
+
+def _time_per_call(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e3
+
+
+def _bench_size(size: int, iterations: int, field) -> dict:
+    snapshot = ContentCache()._store_items(
+        _CATEGORY_ID, 0, [(i, f"wort{i}") for i in range(1, size + 1)]
+    )
+
+    def response_model():
+        return asyncio.run(
+            serialize_response(
+                field=field,
+                response_content=_legacy_payload(snapshot),
+                is_coroutine=True,
+                dump_json=True,
+            )
+        )
+
+    def type_adapter():
+        # Caché vacía en cada llamada: siempre valida + serializa
+        content_api.content_bodies = EncodedBodyCache(max_entries=0)
+        return content_api.items_body(snapshot)
+
+    cache = EncodedBodyCache()
+
+    def cached():
+        content_api.content_bodies = cache
+        return content_api.items_body(snapshot)
+
+    # Mismo JSON en las tres variantes
+    assert json.loads(response_model()) == json.loads(type_adapter())
+    assert cached() == type_adapter()
+
+    return {
+        "items": size,
+        "body_bytes": len(type_adapter()),
+        "response_model_ms": round(_time_per_call(response_model, iterations), 3),
+        "type_adapter_ms": round(_time_per_call(type_adapter, iterations), 3),
+        "cached_ms": round(_time_per_call(cached, iterations), 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="100,10000,100000")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    field = _items_route().response_field
+    original = content_api.content_bodies
+    try:
+        results = [
+            _bench_size(int(size), args.iterations, field)
+            for size in args.sizes.split(",")
+        ]
+    finally:
+        content_api.content_bodies = original
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# backend/benchmarks/bench_exercise_persistence.py
+"""
+Micro-benchmark de persistencia de un ejercicio generado.
+
+Compara, contra la BD de DATABASE_URL (migrada, con contenido 0003):
+
+  - orm:  db.add(exercise); db.commit(); db.refresh(exercise)   (ruta antigua)
+  - rows: persist_exercises() con 5 filas exercise_option       (antes de 0007)
+  - bulk: persist_exercises(db, [exercise]); db.commit()        (ruta actual,
+          opciones compactas en la fila exercise)
+  - seeded: igual que bulk con EXERCISE_SEEDED (solo la semilla)
+
+Para cada ruta cuenta sentencias SQL (before_cursor_execute), idas y
+vueltas al servidor (sentencias + COMMIT), filas escritas, crecimiento
+de exercise + exercise_option en disco (heap e índices de todas las
+particiones) y tiempo medio por generate. Antes de cada ruta hace
+VACUUM FULL de ambas tablas, para que el crecimiento medido no
+reutilice el espacio de filas borradas.
+Al final borra los ejercicios creados.
+
+Uso (desde backend/):
+
+    uv run python -m benchmarks.bench_exercise_persistence --iterations 500
+"""
+import argparse
+import json
+import time
+
+from sqlalchemy import delete, event, text
+
+from app.core.content_cache import content_cache
+from app.core.db import SessionLocal, engine
+from app.core.exercise_persistence import persist_exercises
+from app.core.exercise_service import ExerciseService
+from app.models.exercise import Exercise
+from app.models.exercise_option import ExerciseOption
+
+
+class _Counter:
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+    def on_execute(self, *_args):
+        self.statements += 1
+
+    def on_commit(self, *_args):
+        self.commits += 1
+
+
+# Tamaño en disco (heap + índices + TOAST) de las particiones de ambas tablas
+_TABLES_SIZE_SQL = text(
+    "SELECT coalesce(sum(pg_total_relation_size(inhrelid)), 0)::bigint FROM pg_inherits "
+    "WHERE inhparent IN ('exercise'::regclass, 'exercise_option'::regclass)"
+)
+
+
+def _vacuum_full() -> None:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM FULL exercise, exercise_option"))
+
+
+def _as_option_rows(exercise) -> None:
+    """
+    Ejercicio como antes de 0007: sin columnas compactas, las opciones
+    se escriben como filas exercise_option.
+    """
+    exercise.option_item_ids = None
+    exercise.correct_option_id = None
+
+
+def _persist_orm(db, exercise) -> int:
+    db.add(exercise)
+    db.commit()
+    db.refresh(exercise)
+    # La respuesta lee las opciones: con el ORM esto puede ser otra consulta
+    _ = [opt.option_id for opt in exercise.options]
+    return exercise.exercise_id
+
+
+def _persist_bulk(db, exercise) -> int:
+    persist_exercises(db, [exercise])
+    db.commit()
+    return exercise.exercise_id
+
+
+def _run(mode: str, iterations: int, category_id: int, created: list[int]) -> dict:
+    persist = _persist_orm if mode == "orm" else _persist_bulk
+    counter = _Counter()
+    rows = 0
+    db = SessionLocal()
+    service = ExerciseService(db, seeded=(mode == "seeded"))
+    try:
+        # Calentar la caché de contenido: solo medimos la persistencia
+        content_cache.get_items(db, category_id)
+
+        _vacuum_full()
+        size_before = db.execute(_TABLES_SIZE_SQL).scalar()
+        db.commit()
+
+        event.listen(engine, "before_cursor_execute", counter.on_execute)
+        event.listen(engine, "commit", counter.on_commit)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            exercise = service.generate_exercise(category_id=category_id)
+            if mode in ("orm", "rows"):
+                _as_option_rows(exercise)
+            rows += 1 if exercise.option_item_ids or exercise.seed else 6
+            created.append(persist(db, exercise))
+        elapsed = time.perf_counter() - started
+        event.remove(engine, "before_cursor_execute", counter.on_execute)
+        event.remove(engine, "commit", counter.on_commit)
+
+        size_after = db.execute(_TABLES_SIZE_SQL).scalar()
+        db.commit()
+    finally:
+        if event.contains(engine, "commit", counter.on_commit):
+            event.remove(engine, "before_cursor_execute", counter.on_execute)
+            event.remove(engine, "commit", counter.on_commit)
+        db.close()
+
+    return {
+        "statements_per_generate": round(counter.statements / iterations, 2),
+        "round_trips_per_generate": round(
+            (counter.statements + counter.commits) / iterations, 2
+        ),
+        "rows_per_generate": round(rows / iterations, 2),
+        "bytes_per_generate": round((size_after - size_before) / iterations, 1),
+        "ms_per_generate": round(elapsed / iterations * 1000, 3),
+    }
+
+
+def _cleanup(exercise_ids: list[int]) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            delete(ExerciseOption).where(ExerciseOption.exercise_id.in_(exercise_ids))
+        )
+        db.execute(delete(Exercise).where(Exercise.exercise_id.in_(exercise_ids)))
+        db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--category-id", type=int, default=1)
+    args = parser.parse_args()
+
+    created: list[int] = []
+    try:
+        results = {
+            "iterations": args.iterations,
+            "orm": _run("orm", args.iterations, args.category_id, created),
+            "rows": _run("rows", args.iterations, args.category_id, created),
+            "bulk": _run("bulk", args.iterations, args.category_id, created),
+            "seeded": _run("seeded", args.iterations, args.category_id, created),
+        }
+    finally:
+        if created:
+            _cleanup(created)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# backend/benchmarks/bench_exercise_selection.py
+"""
+Micro-benchmark de la selección de ejercicio (sin BD ni HTTP).
+
+Para varios tamaños de categoría compara:
+
+  - legacy: listas por comprensión de candidatos Modo B y de distractores
+            + random.sample (selección anterior, O(n) por ejercicio)
+  - index:  ExerciseService._build_exercise sobre el snapshot con ids en
+            array('i') y muestreo por índice con rechazo (O(k))
+
+"selection_us" mide solo la elección de índices; "build_us" el ejercicio
+completo (incluye construir los objetos Exercise / ExerciseOption).
+
+Uso (desde backend/):
+
+    uv run python -m benchmarks.bench_exercise_selection --sizes 10,1000,10000,100000
+"""
+import argparse
+import json
+import random
+import time
+
+from app.core.content_cache import ContentCache
+from app.core.exercise_service import ExerciseService, _sample_other_indices
+
+_CATEGORY_ID = 1
+
+
+def _legacy_select(item_ids, last_mem):
+    candidates = range(len(item_ids))
+    if len(item_ids) > 1 and last_mem is not None:
+        filtered = [idx for idx in candidates if item_ids[idx] != last_mem]
+        candidates = filtered or candidates
+    correct_idx = random.choice(candidates)
+    distractor_pool = [idx for idx in range(len(item_ids)) if idx != correct_idx]
+    return correct_idx, random.sample(distractor_pool, 4)
+
+
+def _index_select(item_ids, last_mem):
+    size = len(item_ids)
+    correct_idx = random.randrange(size)
+    while item_ids[correct_idx] == last_mem:
+        correct_idx = random.randrange(size)
+    return correct_idx, _sample_other_indices(size, correct_idx, 4)
+
+
+def _time_per_call(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def _bench_size(size: int, iterations: int) -> dict:
+    snapshot = ContentCache()._store_items(
+        _CATEGORY_ID, 0, [(i, f"wort{i}") for i in range(1, size + 1)]
+    )
+    legacy_ids = tuple(snapshot.item_ids)  # el snapshot anterior usaba tuple
+    last_mem = size // 2
+    service = ExerciseService(db=None)
+
+    return {
+        "size": size,
+        "iterations": iterations,
+        "selection_us": {
+            "legacy": round(
+                _time_per_call(lambda: _legacy_select(legacy_ids, last_mem), iterations), 2
+            ),
+            "index": round(
+                _time_per_call(
+                    lambda: _index_select(snapshot.item_ids, last_mem), iterations
+                ),
+                2,
+            ),
+        },
+        "build_us": {
+            "index": round(
+                _time_per_call(
+                    lambda: service._build_exercise(snapshot, _CATEGORY_ID), iterations
+                ),
+                2,
+            ),
+        },
+        "ids_bytes": {
+            # Aproximado: puntero de la tupla + objeto int (28 bytes) por id
+            "tuple": legacy_ids.__sizeof__() + 28 * size,
+            "array": snapshot.item_ids.buffer_info()[1] * snapshot.item_ids.itemsize,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10,1000,10000,100000")
+    parser.add_argument(
+        "--budget", type=int, default=2_000_000,
+        help="items recorridos por la ruta legacy por tamaño (fija las iteraciones)",
+    )
+    args = parser.parse_args()
+
+    results = [
+        _bench_size(size, max(200, min(20_000, args.budget // size)))
+        for size in (int(s) for s in args.sizes.split(","))
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
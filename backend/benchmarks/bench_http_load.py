@@ -0,0 +1,391 @@
+# backend/benchmarks/bench_http_load.py
+"""
+Benchmark de carga HTTP de los cuatro endpoints públicos.
+
+1) Siembra en la BD de DATABASE_URL (migrada) categorías sintéticas
+   "bench:<n>" con n items cada una (por defecto 10, 1000 y 100000).
+2) Arranca `create_app()` en un subproceso uvicorn instrumentado: cuenta
+   las sentencias SQL de cada request y las agrupa por endpoint.
+3) Lanza N clientes concurrentes que repiten el flujo de un quiz
+   (categories → items → generate → validate) sobre las categorías
+   sembradas durante unos segundos.
+4) Imprime (y opcionalmente guarda) un JSON con p50/p95/p99, req/s y
+   sentencias SQL por request de cada endpoint, para seguir regresiones.
+5) Borra las categorías sembradas y los ejercicios generados sobre ellas.
+
+Uso (desde backend/):
+
+    uv run python -m benchmarks.bench_http_load --concurrency 50 --duration 20 \\
+        --sizes 10,1000,100000 --output bench-http.json
+
+    # Ruta async, y clientes que revalidan contenido con If-None-Match
+    uv run python -m benchmarks.bench_http_load --async-db --conditional
+"""
+import argparse
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+from sqlalchemy import text
+
+_PREFIX = "bench:"
+_ENDPOINTS = (
+    "GET /content/categories",
+    "GET /content/items/{category_id}",
+    "POST /exercise/generate",
+    "POST /exercise/validate",
+)
+
+
+# ----------------------------------------------------------------------
+# Datos sintéticos
+# ----------------------------------------------------------------------
+def _seed(sizes: list[int]) -> list[int]:
+    from app.core.db import engine
+
+    category_ids = []
+    with engine.begin() as conn:
+        # 0003_load_initial_content inserta ids explícitos sin avanzar las
+        # secuencias: se sincronizan antes de insertar con ids automáticos
+        for table, column in (
+            ("category", "category_id"),
+            ("lexical_item", "lexical_item_id"),
+        ):
+            conn.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+                    f"COALESCE((SELECT MAX({column}) FROM {table}), 0) + 1, false)"
+                )
+            )
+        for size in sizes:
+            category_id = conn.execute(
+                text(
+                    "INSERT INTO category (name) VALUES (:name) "
+                    "RETURNING category_id"
+                ),
+                {"name": f"{_PREFIX}{size}"},
+            ).scalar_one()
+            conn.execute(
+                text(
+                    "INSERT INTO lexical_item (category_id, text) "
+                    "SELECT :category_id, 'bench-' || :size || '-' || g "
+                    "FROM generate_series(1, :size) AS g"
+                ),
+                {"category_id": category_id, "size": size},
+            )
+            category_ids.append(category_id)
+    return category_ids
+
+
+def _cleanup() -> None:
+    from app.core.db import engine
+
+    by_prefix = "SELECT category_id FROM category WHERE name LIKE :prefix"
+    params = {"prefix": f"{_PREFIX}%"}
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "DELETE FROM exercise_option WHERE exercise_id IN ("
+                f"SELECT exercise_id FROM exercise WHERE category_id IN ({by_prefix}))"
+            ),
+            params,
+        )
+        conn.execute(
+            text(f"DELETE FROM exercise WHERE category_id IN ({by_prefix})"), params
+        )
+        conn.execute(
+            text(f"DELETE FROM lexical_item WHERE category_id IN ({by_prefix})"),
+            params,
+        )
+        conn.execute(text("DELETE FROM category WHERE name LIKE :prefix"), params)
+
+
+# ----------------------------------------------------------------------
+# Servidor instrumentado (subproceso)
+# ----------------------------------------------------------------------
+def _endpoint_key(method: str, path: str) -> str:
+    if path.startswith("/content/items/"):
+        path = "/content/items/{category_id}"
+    return f"{method} {path}"
+
+
+def _serve(port: int) -> None:
+    """
+    create_app() + un contador de sentencias SQL por endpoint.
+
+    El endpoint en curso viaja en un ContextVar, que Starlette copia
+    al threadpool de los handlers síncronos, así que el listener del
+    engine sabe a qué request pertenece cada sentencia.
+    """
+    import uvicorn
+    from sqlalchemy import event
+
+    from app.core.db import async_engine, engine
+    from app.main import create_app
+
+    current = contextvars.ContextVar("bench_endpoint", default=None)
+    requests: dict[str, int] = defaultdict(int)
+    statements: dict[str, int] = defaultdict(int)
+
+    def on_execute(*_args):
+        key = current.get()
+        if key is not None:
+            statements[key] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", on_execute)
+
+    app = create_app()
+
+    @app.middleware("http")
+    async def count_statements(request, call_next):
+        key = _endpoint_key(request.method, request.url.path)
+        token = current.set(key if key in _ENDPOINTS else None)
+        try:
+            return await call_next(request)
+        finally:
+            current.reset(token)
+            if key in _ENDPOINTS:
+                requests[key] += 1
+
+    @app.post("/_bench/statements")
+    def pop_statement_counts():
+        snapshot = {
+            key: {"requests": requests[key], "statements": statements[key]}
+            for key in _ENDPOINTS
+        }
+        requests.clear()
+        statements.clear()
+        return snapshot
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+# ----------------------------------------------------------------------
+# Carga (proceso cliente)
+# ----------------------------------------------------------------------
+async def _wait_until_up(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get("/docs")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+class _Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+        self.errors = 0
+
+    async def call(self, client, endpoint: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        self.statuses[endpoint][response.status_code] += 1
+        if response.status_code >= 400:
+            raise httpx.HTTPStatusError(
+                "bench", request=response.request, response=response
+            )
+        return response
+
+
+async def _quiz_flow(client, recorder, categories, stop_at, conditional):
+    etags: dict[str, str] = {}
+
+    def headers(url):
+        if conditional and url in etags:
+            return {"If-None-Match": etags[url]}
+        return {}
+
+    async def get(endpoint, url):
+        response = await recorder.call(
+            client, endpoint, "GET", url, headers=headers(url)
+        )
+        if "etag" in response.headers:
+            etags[url] = response.headers["etag"]
+
+    while time.monotonic() < stop_at:
+        category_id = next(categories)
+        try:
+            await get(_ENDPOINTS[0], "/content/categories")
+            await get(_ENDPOINTS[1], f"/content/items/{category_id}")
+            response = await recorder.call(
+                client,
+                _ENDPOINTS[2],
+                "POST",
+                "/exercise/generate",
+                json={"category_id": category_id},
+            )
+            data = response.json()
+            payload = {
+                "exercise_id": data["exercise_id"],
+                "selected_option_id": data["options"][0]["option_id"],
+            }
+            if data.get("token"):
+                payload["token"] = data["token"]
+            await recorder.call(
+                client, _ENDPOINTS[3], "POST", "/exercise/validate", json=payload
+            )
+        except (httpx.HTTPError, KeyError, ValueError):
+            recorder.errors += 1
+
+
+def _percentiles(samples: list[float]) -> dict:
+    if len(samples) < 2:
+        value = round(samples[0] * 1000, 2) if samples else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+    q = statistics.quantiles(samples, n=100)
+    return {
+        "p50": round(q[49] * 1000, 2),
+        "p95": round(q[94] * 1000, 2),
+        "p99": round(q[98] * 1000, 2),
+    }
+
+
+async def _run_load(base_url, category_ids, args) -> dict:
+    limits = httpx.Limits(
+        max_connections=args.concurrency,
+        max_keepalive_connections=args.concurrency,
+    )
+    recorder = _Recorder()
+    categories = itertools.cycle(category_ids)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60.0
+    ) as client:
+        # Calentamiento (cachés de contenido, pool) fuera de la medición
+        for category_id in category_ids:
+            await client.get(f"/content/items/{category_id}")
+        await client.post("/_bench/statements")
+
+        stop_at = time.monotonic() + args.duration
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                _quiz_flow(client, recorder, categories, stop_at, args.conditional)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        db_counts = (await client.post("/_bench/statements")).json()
+        pool = (await client.get("/health/pool")).json()
+
+    endpoints = {}
+    for endpoint in _ENDPOINTS:
+        samples = recorder.latencies[endpoint]
+        counts = db_counts[endpoint]
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "requests_per_second": round(len(samples) / elapsed, 1),
+            "latency_ms": _percentiles(samples),
+            "statuses": dict(recorder.statuses[endpoint]),
+            "db_statements_per_request": (
+                round(counts["statements"] / counts["requests"], 3)
+                if counts["requests"]
+                else None
+            ),
+        }
+    total = sum(len(s) for s in recorder.latencies.values())
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_second": round(total / elapsed, 1),
+        "flow_errors": recorder.errors,
+        "endpoints": endpoints,
+        "pool": pool,
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _bench(args) -> dict:
+    _cleanup()  # restos de una ejecución interrumpida
+    sizes = [int(s) for s in args.sizes.split(",")]
+    category_ids = _seed(sizes)
+
+    env = dict(os.environ, ASYNC_DB="1" if args.async_db else "0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_http_load", "--serve",
+         "--port", str(args.port)],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(_wait_until_up(base_url))
+        load = asyncio.run(_run_load(base_url, category_ids, args))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        if not args.keep_data:
+            _cleanup()
+
+    return {
+        "meta": {
+            "git_revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "async_db": args.async_db,
+            "conditional": args.conditional,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "category_sizes": sizes,
+        },
+        **load,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument(
+        "--sizes", default="10,1000,100000",
+        help="items por categoría sintética, separados por comas",
+    )
+    parser.add_argument("--async-db", action="store_true")
+    parser.add_argument(
+        "--conditional", action="store_true",
+        help="los clientes reenvían el ETag recibido (If-None-Match)",
+    )
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="fichero donde guardar el JSON")
+    parser.add_argument("--keep-data", action="store_true")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(args.port)
+        return
+
+    results = _bench(args)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
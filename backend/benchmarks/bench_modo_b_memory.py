@@ -0,0 +1,94 @@
+# backend/benchmarks/bench_modo_b_memory.py
+"""
+Micro-benchmark de la memoria Modo B (get_last + set_last por generate).
+
+Compara el backend "process" (dict) con el "shared" (mmap + flock), con
+uno o varios procesos escribiendo a la vez en la misma tabla compartida,
+y comprueba que con "shared" todos los procesos ven la última escritura.
+
+Uso (desde backend/):
+
+    uv run python -m benchmarks.bench_modo_b_memory --iterations 200000 --processes 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from app.core.exercise_memory import ProcessEphemeralMemory, SharedEphemeralMemory
+
+_CATEGORIES = 16
+
+
+def _loop(memory, iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        category_id = i % _CATEGORIES
+        memory.get_last(category_id)
+        memory.set_last(category_id, i)
+    return time.perf_counter() - started
+
+
+def _shared_worker(path: str, owner: int, iterations: int, queue) -> None:
+    memory = SharedEphemeralMemory(path, owner=owner)
+    queue.put(_loop(memory, iterations))
+    memory.close()
+
+
+def _run_shared(path: str, iterations: int, processes: int) -> dict:
+    owner = os.getpid()
+    # Crear (y vaciar) la tabla antes de lanzar los workers
+    SharedEphemeralMemory(path, owner=owner).close()
+
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    workers = [
+        ctx.Process(target=_shared_worker, args=(path, owner, iterations, queue))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    elapsed = [queue.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    # La última escritura de cualquier worker es visible para todos
+    check = SharedEphemeralMemory(path, owner=owner)
+    visible = check.get_last(0) is not None
+    check.close()
+
+    return {
+        "processes": processes,
+        "us_per_op": round(max(elapsed) / iterations * 1e6, 3),
+        "ops_per_second_total": round(processes * iterations / max(elapsed)),
+        "shared_state_visible": visible,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    process_elapsed = _loop(ProcessEphemeralMemory(), args.iterations)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "modo_b.mem")
+        results = {
+            "iterations": args.iterations,
+            "process": {
+                "us_per_op": round(process_elapsed / args.iterations * 1e6, 3),
+            },
+            "shared_1": _run_shared(path, args.iterations, 1),
+            f"shared_{args.processes}": _run_shared(
+                path, args.iterations, args.processes
+            ),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+
+
+def _skip_if_db_unavailable(response):
+    """
+    Igual que en test_integration_backend_flow: 500 → sin BD en el entorno.
+    """
+    if response.status_code == 500:
+        pytest.skip("Base de datos no disponible para tests integrados (500 internal_error).")
+
+
+def test_async_routes_full_flow():
+    """
+    Mismo flujo integrado que la ruta síncrona, pero con ASYNC_DB activado:
+    categories → items → generate → validate.
+    """
+    app = create_app(async_db=True)
+
+    # Un único event loop para todo el test (el pool async queda ligado a él)
+    with TestClient(app) as client:
+        resp_categories = client.get("/content/categories")
+        _skip_if_db_unavailable(resp_categories)
+        assert resp_categories.status_code == 200
+        category_id = resp_categories.json()["categories"][0]["category_id"]
+
+        resp_items = client.get(f"/content/items/{category_id}")
+        _skip_if_db_unavailable(resp_items)
+        assert resp_items.status_code == 200
+        assert len(resp_items.json()["items"]) > 0
+
+        resp_missing = client.get("/content/items/999999")
+        assert resp_missing.status_code == 404
+        assert resp_missing.json() == {"error": "category_not_found"}
+
+        resp_generate = client.post(
+            "/exercise/generate",
+            json={"category_id": category_id, "previous_lexical_item_id": None},
+        )
+        _skip_if_db_unavailable(resp_generate)
+        assert resp_generate.status_code == 200
+        data_generate = resp_generate.json()
+        assert len(data_generate["options"]) == 5
+
+        resp_validate = client.post(
+            "/exercise/validate",
+            json={
+                "exercise_id": data_generate["exercise_id"],
+                "selected_option_id": data_generate["options"][0]["option_id"],
+            },
+        )
+        _skip_if_db_unavailable(resp_validate)
+        assert resp_validate.status_code == 200
+        data_validate = resp_validate.json()
+        assert data_validate["score_delta"] == (1 if data_validate["correct"] else 0)
@@ -0,0 +1,209 @@
+# backend/tests/test_api_content_bundle.py
+
+import gzip
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+from sqlalchemy.orm import Session
+
+from app.api import content as content_api
+from app.api.http_cache import accepts_gzip
+from app.core.content_bundle import ContentBundleCache
+from app.core.db import engine, get_db
+from app.main import create_app
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, False),
+        ("identity", False),
+        ("gzip", True),
+        ("br, gzip;q=0.5", True),
+        ("gzip;q=0", False),
+        ("*", True),
+    ],
+)
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+@pytest.fixture
+def db():
+    """
+    Sesión dentro de una transacción que se deshace al final: los
+    cambios de contenido del test (y sus content_change) no quedan.
+    """
+    try:
+        connection = engine.connect()
+    except exc.OperationalError:
+        pytest.skip("Base de datos no disponible para tests integrados.")
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        session.execute(text("SELECT 1 FROM content_change LIMIT 1"))
+    except exc.ProgrammingError:
+        session.close()
+        transaction.rollback()
+        connection.close()
+        pytest.skip("BD sin la migración 0005 (content_change).")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(content_api, "content_bundle_cache", ContentBundleCache())
+    app = create_app(async_db=False)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def test_bundle_is_gzipped_versioned_and_conditional(client):
+    response = client.get("/content/bundle", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    # httpx descomprime de forma transparente
+    bundle = response.json()
+    assert bundle["version"] > 0
+    assert {c["category_id"] for c in bundle["categories"]} >= {1, 2}
+    assert len(bundle["items"]) >= 60
+    assert response.headers["etag"] == f'"bundle-{bundle["version"]}-gzip"'
+
+    again = client.get(
+        "/content/bundle",
+        headers={
+            "Accept-Encoding": "gzip",
+            "If-None-Match": response.headers["etag"],
+        },
+    )
+    assert again.status_code == 304
+
+    plain = client.get("/content/bundle", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == bundle
+    assert len(gzip.compress(plain.content)) < len(plain.content)
+
+
+def test_delta_returns_changed_and_deleted_items(client, db):
+    version = client.get("/content/bundle").json()["version"]
+
+    empty = client.get(f"/content/bundle/delta?since={version}").json()
+    assert empty["version"] == version
+    assert empty["items"] == {"upserted": [], "deleted": []}
+
+    new_id = db.execute(
+        text(
+            "INSERT INTO lexical_item (lexical_item_id, category_id, text) "
+            "VALUES ((SELECT MAX(lexical_item_id) + 1 FROM lexical_item), 1, 'neu') "
+            "RETURNING lexical_item_id"
+        )
+    ).scalar_one()
+    db.execute(text("UPDATE lexical_item SET text = 'Strichcode' WHERE lexical_item_id = 1"))
+    db.execute(text("DELETE FROM exercise_option"))
+    db.execute(text("DELETE FROM exercise"))
+    db.execute(text("DELETE FROM lexical_item WHERE lexical_item_id = 2"))
+
+    delta = client.get(f"/content/bundle/delta?since={version}").json()
+
+    assert delta["since"] == version
+    assert delta["version"] > version
+    upserted = {i["lexical_item_id"]: i["text"] for i in delta["items"]["upserted"]}
+    assert upserted == {1: "Strichcode", new_id: "neu"}
+    assert delta["items"]["deleted"] == [2]
+    assert delta["categories"] == {"upserted": [], "deleted": []}
+
+    # El bundle nuevo refleja los cambios y cambia de ETag
+    bundle = client.get("/content/bundle").json()
+    assert bundle["version"] == delta["version"]
+    assert 2 not in {i["lexical_item_id"] for i in bundle["items"]}
+
+
+def test_key_update_is_recorded_as_delete_and_upsert(client, db):
+    version = client.get("/content/bundle").json()["version"]
+    db.execute(text("DELETE FROM exercise_option"))
+    db.execute(text("DELETE FROM exercise"))
+    db.execute(
+        text("UPDATE lexical_item SET lexical_item_id = 100000 WHERE lexical_item_id = 3")
+    )
+
+    delta = client.get(f"/content/bundle/delta?since={version}").json()
+
+    assert [i["lexical_item_id"] for i in delta["items"]["upserted"]] == [100000]
+    assert delta["items"]["deleted"] == [3]
+
+
+@pytest.mark.parametrize("since", [-1, 10**12])
+def test_delta_rejects_unknown_versions(client, since):
+    response = client.get(f"/content/bundle/delta?since={since}")
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "invalid_version"}
+
+
+
+def test_concurrent_content_writers_commit_change_ids_in_order(db):
+    """
+    Dos transacciones de contenido entrelazadas: la segunda no obtiene
+    change_id hasta que la primera termina, así que MAX(change_id) nunca
+    publica una versión con un cambio menor aún pendiente.
+    """
+    locked = db.execute(
+        text(
+            "SELECT prosrc LIKE '%pg_advisory_xact_lock%' FROM pg_proc "
+            "WHERE proname = 'record_content_change'"
+        )
+    ).scalar_one()
+    if not locked:
+        pytest.skip("BD sin la migración 0008 (escrituras de contenido serializadas).")
+
+    version_sql = text("SELECT COALESCE(MAX(change_id), 0) FROM content_change")
+    update_sql = text(
+        "UPDATE lexical_item SET text = text WHERE lexical_item_id = :id "
+        "RETURNING (SELECT MAX(change_id) FROM content_change)"
+    )
+    first = engine.connect()
+    second = engine.connect()
+    reader = engine.connect()
+    first_tx = first.begin()
+    second_tx = second.begin()
+    try:
+        published = reader.execute(version_sql).scalar_one()
+        first.execute(update_sql, {"id": 1})
+        first_change = first.execute(version_sql).scalar_one()
+
+        result = {}
+        writer = threading.Thread(
+            target=lambda: result.update(
+                change=(
+                    second.execute(update_sql, {"id": 2}),
+                    second.execute(version_sql).scalar_one(),
+                )[1]
+            )
+        )
+        writer.start()
+        writer.join(timeout=0.5)
+
+        # El segundo escritor espera al primero: nada nuevo publicado
+        assert writer.is_alive()
+        reader.rollback()
+        assert reader.execute(version_sql).scalar_one() == published
+
+        first_tx.rollback()
+        writer.join(timeout=10)
+        assert not writer.is_alive()
+        assert result["change"] > first_change
+    finally:
+        if first_tx.is_active:
+            first_tx.rollback()
+        second_tx.rollback()
+        for connection in (first, second, reader):
+            connection.close()
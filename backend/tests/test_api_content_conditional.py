@@ -0,0 +1,78 @@
+# backend/tests/test_api_content_conditional.py
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import content as content_api
+from app.core.content_cache import ContentCache
+from app.core.db import get_db
+from app.main import create_app
+from app.models.category import Category
+from app.models.lexical_item import LexicalItem
+from tests.test_core_content_cache import CountingSession
+
+
+@pytest.fixture
+def db():
+    return CountingSession(
+        [Category(category_id=1, name="Compras en supermercado")],
+        [
+            LexicalItem(lexical_item_id=i, category_id=1, text=f"wort{i}")
+            for i in range(1, 6)
+        ],
+    )
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(
+        content_api,
+        "content_cache",
+        ContentCache(max_categories=4, revalidate_seconds=3600),
+    )
+    app = create_app(async_db=False)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/content/categories", "/content/items/1"])
+def test_content_responses_carry_etag_and_cache_control(client, path):
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"].startswith("public, max-age=")
+
+
+@pytest.mark.parametrize("path", ["/content/categories", "/content/items/1"])
+def test_matching_if_none_match_returns_304_without_querying(client, db, path):
+    etag = client.get(path).headers["etag"]
+    queries_before = len(db.queries)
+
+    response = client.get(path, headers={"If-None-Match": f'W/"x", {etag}'})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert len(db.queries) == queries_before
+
+
+def test_stale_etag_returns_full_response(client):
+    response = client.get("/content/items/1", headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 5
+
+
+def test_etag_differs_per_category_content(client):
+    items_etag = client.get("/content/items/1").headers["etag"]
+    categories_etag = client.get("/content/categories").headers["etag"]
+
+    assert items_etag != categories_etag
+
+
+def test_errors_are_not_cacheable(client):
+    response = client.get("/content/items/999", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 404
+    assert "etag" not in response.headers
@@ -0,0 +1,166 @@
+# backend/tests/test_api_export.py
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc
+
+from app.core.content_cache import content_cache
+from app.core.db import SessionLocal
+from app.core.exercise_persistence import persist_exercises
+from app.core.exercise_service import ExerciseService
+from app.core.export import exercise_lines
+from app.main import create_app
+from app.models.exercise import Exercise
+from app.models.exercise_option import ExerciseOption
+
+_AUTH = {"Authorization": "Bearer s3cret"}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("EXPORT_TOKEN", "s3cret")
+    with TestClient(create_app(async_db=False)) as client:
+        yield client
+
+
+def _rows(exercise_id: int):
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        (
+            exercise_id, 1, 7, [1, 2, 3, 4, 5], created_at,
+            None, None, i, f"wort{i}", i == 2,
+        )
+        for i in range(1, 6)
+    ]
+
+
+def test_exercise_lines_groups_options_per_exercise():
+    lines = list(exercise_lines(iter(_rows(10) + _rows(11))))
+
+    assert len(lines) == 2
+    record = json.loads(lines[0])
+    assert record["exercise_id"] == 10
+    assert record["created_at"] == "2024-01-01T00:00:00+00:00"
+    assert [o["option_id"] for o in record["options"]] == [1, 2, 3, 4, 5]
+    assert [o["is_correct"] for o in record["options"]].count(True) == 1
+    assert lines[1].endswith("\n")
+
+
+def test_exercise_lines_seeded_exercise_has_no_options():
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    row = (12, 1, 7, [1, 2, 3, 4, 5], created_at, 987, 4321, None, None, None)
+
+    record = json.loads(next(exercise_lines(iter([row]))))
+
+    assert record["seed"] == 987
+    assert record["content_version"] == 4321
+    assert record["options"] is None
+
+
+def test_export_is_not_mounted_without_token(monkeypatch):
+    monkeypatch.delenv("EXPORT_TOKEN", raising=False)
+    client = TestClient(create_app(async_db=False))
+
+    assert client.get("/export/exercises").status_code == 404
+
+
+def test_export_requires_bearer_token(client):
+    response = client.get("/export/exercises")
+    assert response.status_code == 401
+    assert response.json() == {"error": "unauthorized"}
+
+    wrong = client.get("/export/content", headers={"Authorization": "Bearer x"})
+    assert wrong.status_code == 401
+
+
+def test_export_rejects_inverted_range(client):
+    response = client.get("/export/exercises?min_id=5&max_id=1", headers=_AUTH)
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "invalid_range"}
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        session.connection()
+    except exc.OperationalError:
+        session.close()
+        pytest.skip("Base de datos no disponible para tests integrados.")
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+def test_export_streams_exercises_in_id_range(db, client):
+    exercises = []
+    for lexical_item_id in (1, 2, 3):
+        exercise = Exercise(
+            category_id=1, lexical_item_id=lexical_item_id, option_order=[1, 2, 3, 4, 5]
+        )
+        exercise.options = [
+            ExerciseOption(option_id=i, text=f"wort{i}", is_correct=(i == 1))
+            for i in range(1, 6)
+        ]
+        exercises.append(exercise)
+    # La exportación usa su propia conexión: hay que confirmar
+    ids = persist_exercises(db, exercises)
+    db.commit()
+    try:
+        response = client.get(
+            f"/export/exercises?category_id=1&min_id={ids[0]}&max_id={ids[1]}",
+            headers=_AUTH,
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["exercise_id"] for r in records] == ids[:2]
+        assert all(len(r["options"]) == 5 for r in records)
+    finally:
+        db.query(ExerciseOption).filter(
+            ExerciseOption.exercise_id.in_(ids)
+        ).delete(synchronize_session=False)
+        db.query(Exercise).filter(Exercise.exercise_id.in_(ids)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+
+
+def test_export_resolves_compact_options_from_content(db, client):
+    snapshot = content_cache.get_items(db, 1)
+    exercise = ExerciseService(db, seeded=False).build_exercises(snapshot, 1, 1)[0]
+    ids = persist_exercises(db, [exercise])
+    db.commit()
+    try:
+        response = client.get(
+            f"/export/exercises?min_id={ids[0]}&max_id={ids[0]}", headers=_AUTH
+        )
+
+        (record,) = [json.loads(line) for line in response.text.splitlines()]
+        assert record["options"] == [
+            {"option_id": opt.option_id, "text": opt.text, "is_correct": opt.is_correct}
+            for opt in exercise.options
+        ]
+    finally:
+        db.query(Exercise).filter(Exercise.exercise_id.in_(ids)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+
+
+def test_export_streams_content_of_a_category(db, client):
+    response = client.get("/export/content?category_id=1", headers=_AUTH)
+
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records
+    assert {r["category_id"] for r in records} == {1}
+    ids = [r["lexical_item_id"] for r in records]
+    assert ids == sorted(ids)
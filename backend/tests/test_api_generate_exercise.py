@@ -19,3 +19,13 @@ def test_generate_exercise_request_schema():
     # 404  → category_not_found
     # 500  → internal_error (p.ej. sin BD real en tests)
     assert response.status_code in (200, 400, 404, 500)
+
+
+def test_generate_rejects_an_oversized_client_key():
+    response = client.post(
+        "/exercise/generate",
+        json={"category_id": 1},
+        headers={"X-Client-Id": "x" * 129},
+    )
+
+    assert response.status_code == 422
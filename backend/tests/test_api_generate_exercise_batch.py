@@ -0,0 +1,144 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.content_cache import content_cache
+from app.core.exercise_memory import ephemeral_memory
+from app.core.exercise_service import ExerciseService
+from app.main import app
+from app.models.lexical_item import LexicalItem
+
+client = TestClient(app)
+
+
+class FakeQuery:
+    def __init__(self, items):
+        self._items = items
+
+    def filter(self, *_args, **_kwargs):
+        return self
+
+    def all(self):
+        return list(self._items)
+
+
+class FakeSession:
+    """
+    Sesión falsa: cuenta las consultas a LexicalItem.
+    """
+
+    def __init__(self, items):
+        self._items = items
+        self.item_queries = 0
+
+    def query(self, model):
+        if model is LexicalItem:
+            self.item_queries += 1
+            return FakeQuery(self._items)
+        return FakeQuery([])
+
+
+def test_generate_exercises_loads_items_once_and_keeps_modo_b():
+    ephemeral_memory._last_items.clear()
+    content_cache.invalidate()
+
+    items = [
+        LexicalItem(lexical_item_id=i, category_id=1, text=f"wort{i}")
+        for i in range(1, 7)
+    ]
+    db = FakeSession(items)
+
+    exercises = ExerciseService(db).generate_exercises(category_id=1, count=20)
+
+    assert len(exercises) == 20
+    assert db.item_queries == 1
+    for previous, current in zip(exercises, exercises[1:]):
+        assert current.lexical_item_id != previous.lexical_item_id
+    for exercise in exercises:
+        assert len(exercise.options) == 5
+        assert sum(1 for opt in exercise.options if opt.is_correct) == 1
+
+
+def test_generate_batch_rejects_invalid_count():
+    response = client.post(
+        "/exercise/generate/batch",
+        json={"category_id": 1, "count": 0},
+    )
+
+    assert response.status_code == 422
+
+
+def test_generate_batch_endpoint():
+    response = client.post(
+        "/exercise/generate/batch",
+        json={"category_id": 1, "count": 5},
+    )
+    if response.status_code == 500:
+        pytest.skip("Base de datos no disponible para tests integrados (500 internal_error).")
+
+    assert response.status_code in (200, 400, 404)
+    if response.status_code != 200:
+        return
+
+    exercises = response.json()["exercises"]
+    assert len(exercises) == 5
+    assert len({e["exercise_id"] for e in exercises}) == 5
+    for previous, current in zip(exercises, exercises[1:]):
+        # El prompt es el texto del item correcto: Modo B dentro del lote
+        assert current["prompt"] != previous["prompt"]
+    for exercise in exercises:
+        assert len(exercise["options"]) == 5
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"count": 5},
+        {"category_id": 1, "categories": [{"category_id": 2}], "count": 5},
+        {"categories": [], "count": 5},
+        {"categories": [{"category_id": 1}, {"category_id": 1}], "count": 5},
+        {"categories": [{"category_id": 1, "weight": 0}], "count": 5},
+    ],
+)
+def test_generate_batch_rejects_invalid_category_selection(body):
+    response = client.post("/exercise/generate/batch", json=body)
+
+    assert response.status_code == 422
+
+
+def test_generate_batch_mixed_categories():
+    body = {
+        "categories": [{"category_id": 1}, {"category_id": 2, "weight": 3}],
+        "count": 40,
+    }
+    response = client.post("/exercise/generate/batch", json=body)
+    if response.status_code == 500:
+        pytest.skip("Base de datos no disponible para tests integrados (500 internal_error).")
+    assert response.status_code == 200
+
+    texts = {
+        category_id: {
+            item["text"]
+            for item in client.get(f"/content/items/{category_id}").json()["items"]
+        }
+        for category_id in (1, 2)
+    }
+    drawn = []
+    for exercise in response.json()["exercises"]:
+        options = {opt["text"] for opt in exercise["options"]}
+        # Distractores de la misma categoría que el item correcto
+        (category_id,) = [c for c, pool in texts.items() if options <= pool]
+        assert exercise["prompt"] in options
+        drawn.append(category_id)
+    assert set(drawn) == {1, 2}
+
+
+def test_generate_mixed_unknown_category_is_not_found():
+    response = client.post(
+        "/exercise/generate",
+        json={"categories": [{"category_id": 1}, {"category_id": 999999}]},
+    )
+    if response.status_code == 500:
+        pytest.skip("Base de datos no disponible para tests integrados (500 internal_error).")
+
+    assert response.status_code == 404
+    assert response.json() == {"error": "category_not_found"}
@@ -0,0 +1,108 @@
+# backend/tests/test_api_health_ready.py
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as main_module
+from app.api import health as health_api
+from app.core import warmup as warmup_module
+from app.core.warmup import Warmup
+from app.main import create_app
+
+_BACKEND = Path(__file__).resolve().parents[1]
+
+
+def test_importing_the_app_does_not_create_engines():
+    code = (
+        "import sys\n"
+        "import app.main\n"
+        "from app.core import db\n"
+        "assert not db.engines_created()\n"
+        "assert 'psycopg' not in sys.modules\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=_BACKEND,
+        env={"PATH": "", "PYTHONPATH": str(_BACKEND)},
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.fixture
+def fake_warmup(monkeypatch):
+    """
+    Warmup nuevo sin BD: pool y contenido sustituidos por funciones que
+    se pueden hacer fallar.
+    """
+    state = {"fail": True, "pool_calls": []}
+
+    def warm_pool(connections):
+        state["pool_calls"].append(connections)
+        if state["fail"]:
+            raise ConnectionError("database unavailable")
+        return connections
+
+    warmup = Warmup()
+    monkeypatch.setattr(warmup_module, "init_engines", lambda: None)
+    monkeypatch.setattr(warmup_module, "warm_pool", warm_pool)
+    monkeypatch.setattr(warmup_module, "_warm_content", lambda: 3)
+    monkeypatch.setattr(health_api, "warmup", warmup)
+    monkeypatch.setattr(main_module, "warmup", warmup)
+    state["warmup"] = warmup
+    return state
+
+
+def test_live_does_not_depend_on_warmup(fake_warmup):
+    client = TestClient(create_app(async_db=False))
+
+    response = client.get("/health/live")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+    assert fake_warmup["pool_calls"] == []
+
+
+def test_ready_retries_failed_warmup_on_each_probe(fake_warmup, monkeypatch):
+    monkeypatch.setenv("DB_POOL_WARMUP_CONNECTIONS", "3")
+    client = TestClient(create_app(async_db=False))
+
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json() == {"error": "not_ready"}
+    assert fake_warmup["warmup"].last_error == "ConnectionError"
+
+    fake_warmup["fail"] = False
+    response = client.get("/health/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["attempts"] == 2
+    assert body["connections"] == 3
+    assert body["categories"] == 3
+    assert body["last_error"] is None
+    # Ya listo: los sondeos siguientes no vuelven a calentar
+    client.get("/health/ready")
+    assert fake_warmup["pool_calls"] == [3, 3]
+
+
+def test_lifespan_warms_up_before_serving_and_drains_on_shutdown(fake_warmup):
+    fake_warmup["fail"] = False
+    warmup = fake_warmup["warmup"]
+
+    with TestClient(create_app(async_db=False)) as client:
+        assert warmup.ready
+        assert client.get("/health/ready").status_code == 200
+
+    assert warmup.draining
+    assert not warmup.ready
+    response = TestClient(create_app(async_db=False)).get("/health/ready")
+    assert response.status_code == 503
+    assert response.json() == {"error": "draining"}
@@ -0,0 +1,129 @@
+# backend/tests/test_api_metrics.py
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.api.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, error_code
+from app.core.metrics import (
+    http_errors,
+    http_request_db_queries,
+    http_request_duration,
+    http_requests,
+)
+from app.core.query_budget import install
+from app.main import create_app
+
+
+def _client() -> TestClient:
+    """
+    App mínima con el middleware y un router incluido con prefijo.
+    """
+    router = APIRouter()
+    sqlite = create_engine("sqlite://")
+    install(sqlite)
+
+    @router.get("/items/{category_id}")
+    def get_items(category_id: int):
+        if category_id == 404:
+            return JSONResponse({"error": "category_not_found"}, status_code=404)
+        return {"category_id": category_id}
+
+    @router.get("/queries")
+    def run_queries():
+        # En el threadpool: el contador del request llega por contextvar
+        with sqlite.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {}
+
+    @router.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    app = FastAPI()
+    app.include_router(router, prefix="/metrics-test")
+    app.add_middleware(MetricsMiddleware)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_requests_are_labelled_with_route_template():
+    client = _client()
+    route = "/metrics-test/items/{category_id}"
+    before = http_requests.value(("GET", route, "200"))
+
+    client.get("/metrics-test/items/1")
+    client.get("/metrics-test/items/2")
+
+    assert http_requests.value(("GET", route, "200")) == before + 2
+    assert http_request_duration.count(("GET", route)) >= 2
+
+
+def test_errors_are_counted_by_normative_code():
+    client = _client()
+    route = "/metrics-test/items/{category_id}"
+    before = http_errors.value((route, "category_not_found"))
+
+    response = client.get("/metrics-test/items/404")
+
+    assert response.json() == {"error": "category_not_found"}
+    assert http_errors.value((route, "category_not_found")) == before + 1
+
+
+def test_unhandled_exceptions_and_unmatched_routes():
+    client = _client()
+    boom_before = http_errors.value(("/metrics-test/boom", "unhandled_exception"))
+    unmatched_before = http_requests.value(("GET", "unmatched", "404"))
+
+    assert client.get("/metrics-test/boom").status_code == 500
+    assert client.get("/does-not-exist").status_code == 404
+
+    assert (
+        http_errors.value(("/metrics-test/boom", "unhandled_exception"))
+        == boom_before + 1
+    )
+    assert http_requests.value(("GET", "unmatched", "404")) == unmatched_before + 1
+
+
+def test_db_queries_per_request_are_recorded():
+    client = _client()
+    histogram = http_request_db_queries
+    before = histogram.count(("/metrics-test/queries",))
+
+    client.get("/metrics-test/queries")
+
+    assert histogram.count(("/metrics-test/queries",)) == before + 1
+    lines = histogram.collect()
+    bucket = 'http_request_db_queries_bucket{route="/metrics-test/queries",le="%s"}'
+    assert f"{bucket % 1} 0" in lines
+    assert f"{bucket % 2} {before + 1}" in lines
+
+
+def test_error_code_falls_back_to_status():
+    assert error_code(400, b'{"error":"invalid_range"}') == "invalid_range"
+    assert error_code(422, b'{"detail":[]}') == "http_422"
+    assert error_code(502, b"Bad Gateway") == "http_502"
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    client = TestClient(create_app(async_db=False))
+    client.get("/health/pool")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == PROMETHEUS_CONTENT_TYPE
+    assert (
+        'http_requests_total{method="GET",route="/health/pool",status="200"}'
+        in response.text
+    )
+    assert "# TYPE db_statement_duration_seconds histogram" in response.text
+    assert 'db_pool_size{pool="sync"' in response.text
+
+
+def test_metrics_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("METRICS", "false")
+    client = TestClient(create_app(async_db=False))
+
+    assert client.get("/metrics").status_code == 404
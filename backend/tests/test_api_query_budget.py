@@ -0,0 +1,234 @@
+# backend/tests/test_api_query_budget.py
+"""
+Presupuesto de queries por ruta: cada endpoint de app/api tiene un máximo
+de sentencias SQL y de idas a la BD (sentencias + COMMIT/ROLLBACK) con
+las cachés frías. Una consulta de más, o un N+1 en los lotes, hace fallar
+la suite; si el cambio es intencionado, se sube el presupuesto aquí.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+
+from app.api import content as content_api
+from app.api import content_async as content_async_api
+from app.core.content_bundle import ContentBundleCache
+from app.core.content_cache import content_cache
+from app.core.db import engine
+from app.core.exercise_cache import recent_exercises
+from app.core.query_budget import (
+    assert_max_queries,
+    capture_queries,
+    install,
+    recording,
+)
+from app.core.warmup import warmup
+from app.main import create_app
+
+_TOKEN = "budget"
+_AUTH = {"Authorization": f"Bearer {_TOKEN}"}
+
+# (método, ruta) → (máx. queries, máx. round trips), peor caso: cachés frías
+# y revalidación de la versión de contenido en cada request (la lectura de
+# alembic_version va en la sesión del request, entre SAVEPOINT y RELEASE)
+ROUTE_BUDGETS = {
+    ("GET", "/content/categories"): (4, 5),
+    ("GET", "/content/items/{category_id}"): (8, 9),
+    ("GET", "/content/bundle"): (3, 4),
+    ("GET", "/content/bundle/delta"): (4, 5),
+    ("POST", "/exercise/generate"): (12, 13),
+    ("POST", "/exercise/generate/batch"): (9, 10),
+    ("POST", "/exercise/validate"): (1, 2),
+    ("GET", "/export/exercises"): (1, 2),
+    ("GET", "/export/content"): (1, 2),
+    ("GET", "/health/live"): (0, 0),
+    # Sondeo con el calentamiento ya hecho (ver _requests)
+    ("GET", "/health/ready"): (0, 0),
+    ("GET", "/health/pool"): (0, 0),
+    ("GET", "/health/caches"): (0, 0),
+    ("GET", "/health/write-behind"): (0, 0),
+    ("GET", "/health/exercise-pool"): (0, 0),
+    ("GET", "/metrics"): (0, 0),
+}
+
+
+def _routes(app) -> set[tuple[str, str]]:
+    return {
+        (method.upper(), path)
+        for path, operations in app.openapi()["paths"].items()
+        for method in operations
+    }
+
+
+@pytest.mark.parametrize("async_db", [False, True])
+def test_every_route_has_a_query_budget(monkeypatch, async_db):
+    monkeypatch.setenv("EXPORT_TOKEN", _TOKEN)
+
+    assert _routes(create_app(async_db=async_db)) == set(ROUTE_BUDGETS)
+
+
+def test_recorder_counts_statements_and_transactions():
+    sqlite = create_engine("sqlite://")
+
+    with capture_queries(sqlite) as recorder:
+        with sqlite.begin() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+
+    assert recorder.queries == 2
+    assert recorder.round_trips == 3
+    assert "SELECT 2" in recorder.report()
+
+    with pytest.raises(AssertionError, match="query budget exceeded"):
+        with assert_max_queries(1, None, sqlite):
+            with sqlite.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+
+def test_recording_only_sees_its_own_context():
+    sqlite = create_engine("sqlite://")
+    install(sqlite)
+
+    with sqlite.connect() as conn:
+        conn.execute(text("SELECT 0"))
+        with recording() as recorder:
+            conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2"))
+
+    assert recorder.statements == ["SELECT 1"]
+
+
+# ----------------------------------------------------------------------
+# Presupuestos contra la BD real
+# ----------------------------------------------------------------------
+@pytest.fixture
+def cold_caches(monkeypatch):
+    """
+    Cachés en proceso vacías y revalidación en cada request: las rutas
+    emiten el máximo de queries que pueden emitir.
+    """
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1 FROM content_change LIMIT 1"))
+    except (exc.OperationalError, exc.ProgrammingError):
+        pytest.skip("Base de datos (migrada a 0005) no disponible para tests integrados.")
+    monkeypatch.setenv("EXPORT_TOKEN", _TOKEN)
+    monkeypatch.setattr(content_cache, "revalidate_seconds", 0.0)
+    monkeypatch.setattr(recent_exercises, "max_entries", 0)
+    # Sin lifespan en estos clientes: un apagado de otro test no cuenta
+    monkeypatch.setattr(warmup, "draining", False)
+    bundles = ContentBundleCache()
+    monkeypatch.setattr(content_api, "content_bundle_cache", bundles)
+    monkeypatch.setattr(content_async_api, "content_bundle_cache", bundles)
+    content_cache.invalidate()
+    yield
+    content_cache.invalidate()
+
+
+def _generate(client) -> dict:
+    response = client.post("/exercise/generate", json={"category_id": 1})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _requests(client):
+    """
+    (método, ruta, llamada) para cada ruta de ROUTE_BUDGETS.
+    """
+    exercise = _generate(client)
+    assert client.get("/health/ready").status_code == 200
+    content_cache.invalidate()
+    validate = {
+        "exercise_id": exercise["exercise_id"],
+        "selected_option_id": exercise["options"][0]["option_id"],
+    }
+    exercise_range = f"min_id={exercise['exercise_id']}&max_id={exercise['exercise_id']}"
+    return [
+        ("GET", "/content/categories", lambda: client.get("/content/categories")),
+        ("GET", "/content/items/{category_id}", lambda: client.get("/content/items/1")),
+        ("GET", "/content/bundle", lambda: client.get("/content/bundle")),
+        (
+            "GET",
+            "/content/bundle/delta",
+            lambda: client.get("/content/bundle/delta?since=0"),
+        ),
+        (
+            "POST",
+            "/exercise/generate",
+            lambda: client.post("/exercise/generate", json={"category_id": 1}),
+        ),
+        (
+            "POST",
+            "/exercise/generate/batch",
+            lambda: client.post(
+                "/exercise/generate/batch", json={"category_id": 1, "count": 20}
+            ),
+        ),
+        (
+            "POST",
+            "/exercise/validate",
+            lambda: client.post("/exercise/validate", json=validate),
+        ),
+        (
+            "GET",
+            "/export/exercises",
+            lambda: client.get(f"/export/exercises?{exercise_range}", headers=_AUTH),
+        ),
+        ("GET", "/export/content", lambda: client.get("/export/content", headers=_AUTH)),
+        ("GET", "/health/live", lambda: client.get("/health/live")),
+        ("GET", "/health/ready", lambda: client.get("/health/ready")),
+        ("GET", "/health/pool", lambda: client.get("/health/pool")),
+        ("GET", "/health/caches", lambda: client.get("/health/caches")),
+        ("GET", "/health/write-behind", lambda: client.get("/health/write-behind")),
+        ("GET", "/health/exercise-pool", lambda: client.get("/health/exercise-pool")),
+        ("GET", "/metrics", lambda: client.get("/metrics")),
+    ]
+
+
+@pytest.mark.parametrize("async_db", [False, True])
+def test_routes_stay_within_query_budget(cold_caches, async_db):
+    client = TestClient(create_app(async_db=async_db))
+    requests = _requests(client)
+    assert {(method, path) for method, path, _ in requests} == set(ROUTE_BUDGETS)
+
+    for method, path, call in requests:
+        content_cache.invalidate()
+        max_queries, max_round_trips = ROUTE_BUDGETS[(method, path)]
+        with assert_max_queries(max_queries, max_round_trips):
+            response = call()
+        assert response.status_code == 200, (method, path, response.text)
+
+
+@pytest.mark.parametrize("async_db", [False, True])
+def test_batch_queries_do_not_grow_with_count(cold_caches, async_db):
+    client = TestClient(create_app(async_db=async_db))
+    counts = []
+    for count in (1, 2, 30):
+        content_cache.invalidate()
+        with capture_queries() as recorder:
+            response = client.post(
+                "/exercise/generate/batch", json={"category_id": 1, "count": count}
+            )
+        assert response.status_code == 200
+        counts.append(recorder.queries)
+
+    assert len(set(counts)) == 1, counts
+
+
+@pytest.mark.parametrize("async_db", [False, True])
+@pytest.mark.parametrize("path", ["/exercise/generate", "/exercise/generate/batch"])
+def test_mixed_sessions_do_not_grow_with_categories(cold_caches, async_db, path):
+    client = TestClient(create_app(async_db=async_db))
+    counts = []
+    for category_ids in ([1], [1, 2]):
+        content_cache.invalidate()
+        body = {"categories": [{"category_id": c} for c in category_ids]}
+        if path.endswith("/batch"):
+            body["count"] = 10
+        with capture_queries() as recorder:
+            response = client.post(path, json=body)
+        assert response.status_code == 200
+        counts.append(recorder.queries)
+
+    assert counts[0] == counts[1], counts
+    assert counts[0] <= ROUTE_BUDGETS[("POST", path)][0]
@@ -0,0 +1,88 @@
+# backend/tests/test_api_serialization.py
+
+import json
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.api.serialization import EncodedBodyCache, json_response
+from app.schemas.category import CategoryListDict, CategoryListResponse
+from app.schemas.lexical_item import LexicalItemListDict, LexicalItemListResponse
+
+
+def _properties(schema: dict) -> dict:
+    """
+    Propiedades (nombre → tipo) de cada objeto de un JSON schema.
+    """
+    definitions = schema.get("$defs", {})
+    return {
+        name: {
+            field: spec.get("type")
+            for field, spec in definition["properties"].items()
+        }
+        for name, definition in definitions.items()
+    }
+
+
+@pytest.mark.parametrize(
+    ("fast", "model"),
+    [
+        (LexicalItemListDict, LexicalItemListResponse),
+        (CategoryListDict, CategoryListResponse),
+    ],
+)
+def test_typed_dicts_match_response_models(fast, model):
+    fast_schema = TypeAdapter(fast).json_schema()
+    model_schema = model.model_json_schema()
+
+    assert sorted(_properties(fast_schema).values(), key=str) == sorted(
+        _properties(model_schema).values(), key=str
+    )
+
+
+def test_body_cache_validates_and_encodes_once_per_key():
+    cache = EncodedBodyCache(max_entries=2)
+    adapter = TypeAdapter(LexicalItemListDict)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"items": [{"lexical_item_id": 1, "category_id": 1, "text": "Kasse"}]}
+
+    first = cache.get_or_encode("etag-a", adapter, build)
+    second = cache.get_or_encode("etag-a", adapter, build)
+
+    assert first is second
+    assert len(builds) == 1
+    assert json.loads(first)["items"][0]["text"] == "Kasse"
+    assert cache.stats()["hits"] == 1
+
+
+def test_body_cache_is_bounded():
+    cache = EncodedBodyCache(max_entries=2)
+    adapter = TypeAdapter(CategoryListDict)
+    for key in ("a", "b", "c"):
+        cache.get_or_encode(key, adapter, lambda: {"categories": []})
+
+    assert cache.stats()["entries"] == 2
+
+
+def test_body_cache_rejects_invalid_payloads():
+    cache = EncodedBodyCache()
+    adapter = TypeAdapter(CategoryListDict)
+
+    with pytest.raises(ValueError):
+        cache.get_or_encode("x", adapter, lambda: {"categories": [{"name": 1}]})
+    assert cache.stats()["entries"] == 0
+
+
+def test_json_response_serializes_without_revalidating():
+    adapter = TypeAdapter(CategoryListResponse)
+    model = CategoryListResponse(categories=[{"category_id": 1, "name": "Compras"}])
+
+    response = json_response(adapter, model)
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {
+        "categories": [{"category_id": 1, "name": "Compras"}]
+    }
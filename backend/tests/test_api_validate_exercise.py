@@ -1,4 +1,11 @@
+import json
+from types import SimpleNamespace
+
 from fastapi.testclient import TestClient
+
+from app.api.validate import ValidateExerciseRequest, evaluate_rows
+from app.core.exercise_cache import recent_exercises
+from app.core.exercise_service import seeded_correct_option_id
 from app.main import app
 
 client = TestClient(app)
@@ -12,3 +19,42 @@ def test_validate_exercise_schema():
 
     # El endpoint existe y devuelve un código normativo
     assert response.status_code in (200, 400, 404, 500)
+
+
+def _row(option_item_ids=None, correct_option_id=None, seed=None, option_id=None,
+         is_correct=None):
+    return SimpleNamespace(
+        exercise_id=1,
+        option_item_ids=option_item_ids,
+        correct_option_id=correct_option_id,
+        seed=seed,
+        option_id=option_id,
+        is_correct=is_correct,
+    )
+
+
+def _evaluate(rows, selected_option_id):
+    recent_exercises.clear()
+    payload = ValidateExerciseRequest(exercise_id=1, selected_option_id=selected_option_id)
+    response = evaluate_rows(payload, rows)
+    return response.status_code, json.loads(response.body)
+
+
+def test_evaluate_rows_reads_every_option_storage():
+    # Opciones compactas (0007): una fila sin opciones
+    compact = [_row(option_item_ids=[7, 3, 9, 4, 1], correct_option_id=4)]
+    assert _evaluate(compact, 4) == (
+        200, {"correct": True, "correct_option_id": 4, "score_delta": 1}
+    )
+    assert _evaluate(compact, 6)[1] == {"error": "invalid_option_id"}
+
+    # Ejercicio con semilla
+    seeded = [_row(seed=12345)]
+    correct = seeded_correct_option_id(12345)
+    assert _evaluate(seeded, correct)[1]["correct"] is True
+
+    # Compatibilidad: filas exercise_option anteriores a 0007
+    legacy = [_row(option_id=i, is_correct=(i == 2)) for i in range(1, 6)]
+    assert _evaluate(legacy, 1) == (
+        200, {"correct": False, "correct_option_id": 2, "score_delta": 0}
+    )
@@ -0,0 +1,76 @@
+# backend/tests/test_core_category_sampler.py
+
+import random
+from array import array
+from collections import Counter
+
+import pytest
+
+from app.core.category_sampler import (
+    AliasTable,
+    CategorySampler,
+    WeightedCategories,
+)
+from app.core.content_cache import CategorySnapshot
+
+
+def _snapshot(category_id: int, size: int) -> CategorySnapshot:
+    return CategorySnapshot(
+        category_id=category_id,
+        version=1,
+        item_ids=array("i", range(category_id * 1000, category_id * 1000 + size)),
+        texts=tuple(f"wort{category_id}_{i}" for i in range(size)),
+        etag=f"{category_id:024x}",
+    )
+
+
+def test_alias_table_follows_the_weights():
+    weights = [1, 0, 3, 6]
+    table = AliasTable(weights)
+    rng = random.Random(7)
+
+    draws = Counter(table.sample(rng) for _ in range(100_000))
+
+    assert draws[1] == 0
+    for i, weight in enumerate(weights):
+        assert draws[i] / 100_000 == pytest.approx(weight / 10, abs=0.01)
+
+
+def test_alias_table_rejects_empty_or_zero_weights():
+    with pytest.raises(ValueError):
+        AliasTable([])
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
+
+
+def test_categories_are_weighted_by_item_count_and_weight():
+    # 10 items con peso 1 frente a 30 items con peso 3: 10 vs 90
+    categories = WeightedCategories([_snapshot(1, 10), _snapshot(2, 30)], [1.0, 3.0], 5)
+    rng = random.Random(3)
+
+    draws = Counter(categories.choose(rng).category_id for _ in range(50_000))
+
+    assert draws[1] / 50_000 == pytest.approx(0.1, abs=0.01)
+
+
+def test_categories_without_enough_items_are_not_drawn():
+    categories = WeightedCategories([_snapshot(1, 4), _snapshot(2, 5)], [100.0, 1.0], 5)
+
+    assert {categories.choose().category_id for _ in range(100)} == {2}
+    with pytest.raises(ValueError, match="insufficient_items"):
+        WeightedCategories([_snapshot(1, 4)], [1.0], 5)
+
+
+def test_sampler_reuses_tables_until_a_snapshot_changes():
+    sampler = CategorySampler(max_entries=2)
+    snapshots = [_snapshot(1, 10), _snapshot(2, 10)]
+
+    first = sampler.get(snapshots, [1.0, 2.0], 5)
+    assert sampler.get(snapshots, [1.0, 2.0], 5) is first
+    # Otros pesos: otra tabla
+    assert sampler.get(snapshots, [2.0, 1.0], 5) is not first
+    # Categoría recargada (otro snapshot): se reconstruye
+    reloaded = sampler.get([snapshots[0], _snapshot(2, 12)], [1.0, 2.0], 5)
+    assert reloaded is not first
+
+    assert sampler.stats() == {"entries": 2, "max_entries": 2, "hits": 1, "builds": 3}
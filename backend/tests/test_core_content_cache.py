@@ -0,0 +1,186 @@
+# backend/tests/test_core_content_cache.py
+
+import pytest
+from sqlalchemy import event, exc, text
+
+from app.core import content_cache as content_cache_module
+from app.core.content_cache import ContentCache
+from app.core.db import SessionLocal
+from app.models.category import Category
+from app.models.lexical_item import LexicalItem
+
+
+class CountingQuery:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def filter(self, *_args, **_kwargs):
+        return self
+
+    def all(self):
+        return list(self._rows)
+
+
+class CountingSession:
+    """
+    Sesión falsa que cuenta cuántas veces se consulta cada modelo.
+    Sin get_bind(): la revalidación contra BD se omite sin error.
+    """
+
+    def __init__(self, categories, items):
+        self._categories = categories
+        self._items = items
+        self.queries: list = []
+
+    def query(self, model):
+        self.queries.append(model)
+        if model is Category:
+            return CountingQuery(self._categories)
+        if model is LexicalItem:
+            return CountingQuery(self._items)
+        return CountingQuery([])
+
+
+def _session(count: int = 5) -> CountingSession:
+    categories = [Category(category_id=1, name="Compras en supermercado")]
+    items = [
+        LexicalItem(lexical_item_id=i, category_id=1, text=f"wort{i}")
+        for i in range(count, 0, -1)
+    ]
+    return CountingSession(categories, items)
+
+
+def test_items_are_loaded_once_and_sorted_by_id():
+    cache = ContentCache(max_categories=4, revalidate_seconds=3600)
+    db = _session()
+
+    first = cache.get_items(db, 1)
+    second = cache.get_items(db, 1)
+
+    assert first is second
+    assert first.item_ids.tolist() == [1, 2, 3, 4, 5]
+    assert first.texts == ("wort1", "wort2", "wort3", "wort4", "wort5")
+    assert db.queries.count(LexicalItem) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalidate_forces_reload_with_new_version():
+    cache = ContentCache(max_categories=4, revalidate_seconds=3600)
+    db = _session()
+
+    first = cache.get_items(db, 1)
+    cache.invalidate()
+    second = cache.get_items(db, 1)
+
+    assert second is not first
+    assert second.version == first.version + 1
+    assert db.queries.count(LexicalItem) == 2
+
+
+def test_cache_is_bounded_by_max_categories():
+    cache = ContentCache(max_categories=2, revalidate_seconds=3600)
+    db = _session()
+
+    for category_id in (1, 2, 3):
+        cache.get_items(db, category_id)
+
+    assert cache.stats()["categories_cached"] == 2
+
+
+def test_categories_and_reload():
+    cache = ContentCache(max_categories=4, revalidate_seconds=3600)
+    db = _session()
+
+    assert cache.has_category(db, 1)
+    assert not cache.has_category(db, 99)
+    assert db.queries.count(Category) == 1
+
+    version = cache.reload(db)
+    assert version == 1
+    # reload precarga listado + items de cada categoría
+    assert db.queries.count(Category) == 2
+    assert db.queries.count(LexicalItem) == 1
+
+
+def test_etag_depends_on_content_not_cache_version():
+    cache = ContentCache(max_categories=4, revalidate_seconds=3600)
+
+    first = cache.get_items(_session(), 1)
+    cache.invalidate()
+    same_content = cache.get_items(_session(), 1)
+    cache.invalidate()
+    more_items = cache.get_items(_session(count=6), 1)
+
+    assert same_content.version != first.version
+    assert same_content.etag == first.etag
+    assert more_items.etag != first.etag
+
+
+# ----------------------------------------------------------------------
+# Contra la BD real
+# ----------------------------------------------------------------------
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        session.execute(text("SELECT 1 FROM content_change LIMIT 1"))
+    except (exc.OperationalError, exc.ProgrammingError):
+        session.close()
+        pytest.skip("Base de datos (migrada a 0005) no disponible para tests integrados.")
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+def test_content_edits_are_picked_up_on_revalidation(db):
+    """
+    Una edición de lexical_item (sin migración) invalida la caché en la
+    siguiente revalidación: items, ETag y generación ven el texto nuevo.
+    """
+    cache = ContentCache(max_categories=4, revalidate_seconds=0)
+    before = cache.get_items(db, 1)
+    db.rollback()
+    original = before.texts[0]
+    lexical_item_id = before.item_ids[0]
+
+    update = text("UPDATE lexical_item SET text = :text WHERE lexical_item_id = :id")
+    db.execute(update, {"text": original + " (neu)", "id": lexical_item_id})
+    db.commit()
+    try:
+        after = cache.get_items(db, 1)
+        db.rollback()
+
+        assert after.texts[0] == original + " (neu)"
+        assert after.etag != before.etag
+    finally:
+        db.execute(update, {"text": original, "id": lexical_item_id})
+        db.commit()
+
+
+def test_revalidation_reuses_the_request_connection(db, monkeypatch):
+    """
+    La versión se lee en la conexión de la sesión (sin otro checkout del
+    pool) y, si la lectura falla, la transacción del request sigue viva.
+    """
+    checkouts = []
+    bind = db.get_bind()
+
+    def listener(*args):
+        checkouts.append(args)
+
+    db.execute(text("SELECT 1"))
+    event.listen(bind, "checkout", listener)
+    try:
+        assert ContentCache._read_source_version(db) is not None
+
+        monkeypatch.setattr(
+            content_cache_module, "_SOURCE_VERSION_SQL", "SELECT version FROM missing_table"
+        )
+        assert ContentCache._read_source_version(db) is None
+        assert db.execute(text("SELECT 1")).scalar() == 1
+    finally:
+        event.remove(bind, "checkout", listener)
+
+    assert checkouts == []
@@ -0,0 +1,63 @@
+# backend/tests/test_core_db_pool.py
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+
+from app.core.db_pool import InstrumentedQueuePool, pool_stats
+from app.main import create_app
+
+
+def _sqlite_engine():
+    """
+    Engine SQLite en memoria con el pool instrumentado: basta para
+    comprobar los contadores sin PostgreSQL.
+    """
+    return create_engine(
+        "sqlite://",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+
+def test_pool_counts_checkouts_and_checked_out():
+    engine = _sqlite_engine()
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        stats = pool_stats(engine.pool)
+        assert stats["checked_out"] == 1
+
+    stats = pool_stats(engine.pool)
+    assert stats["checkouts"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["waits"] == 0
+    assert stats["timeouts"] == 0
+
+
+def test_pool_counts_waits_and_timeouts_when_exhausted():
+    engine = _sqlite_engine()
+
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = pool_stats(engine.pool)
+    assert stats["checkouts"] == 1
+    assert stats["waits"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["checkout_seconds_max"] >= 0.05
+
+
+def test_health_pool_endpoint_exposes_sync_and_async_pools():
+    client = TestClient(create_app())
+
+    response = client.get("/health/pool")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert {"sync", "async"} <= set(data)
+    for key in ("size", "checked_out", "overflow", "waits", "timeouts"):
+        assert key in data["sync"]
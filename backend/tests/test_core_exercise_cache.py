@@ -0,0 +1,74 @@
+# backend/tests/test_core_exercise_cache.py
+
+from fastapi.testclient import TestClient
+
+from app.core.exercise_cache import RecentExerciseCache, recent_exercises
+from app.core.exercise_token import ExerciseClaims
+from app.main import create_app
+
+
+def _claims(exercise_id: int, correct: int = 2) -> ExerciseClaims:
+    return ExerciseClaims(
+        exercise_id=exercise_id,
+        option_ids=(1, 2, 3, 4, 5),
+        correct_option_id=correct,
+    )
+
+
+def test_hit_and_miss_counters():
+    cache = RecentExerciseCache(max_entries=10, ttl_seconds=60)
+    cache.put(_claims(1))
+
+    assert cache.get(1) == _claims(1)
+    assert cache.get(2) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_lru_is_bounded_by_entry_count():
+    cache = RecentExerciseCache(max_entries=2, ttl_seconds=60)
+    cache.put(_claims(1))
+    cache.put(_claims(2))
+    cache.get(1)  # 1 pasa a ser el más reciente
+    cache.put(_claims(3))
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    assert cache.get(3) is not None
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = RecentExerciseCache(max_entries=10, ttl_seconds=0)
+    cache.put(_claims(1))
+
+    assert cache.get(1) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = RecentExerciseCache(max_entries=0, ttl_seconds=60)
+    cache.put(_claims(1))
+
+    assert cache.get(1) is None
+
+
+def test_validate_is_served_from_recent_exercises_without_db():
+    recent_exercises.put(_claims(987654320, correct=5))
+    client = TestClient(create_app())
+
+    response = client.post(
+        "/exercise/validate",
+        json={"exercise_id": 987654320, "selected_option_id": 5},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "correct": True,
+        "correct_option_id": 5,
+        "score_delta": 1,
+    }
+    assert client.get("/health/caches").json()["recent_exercises"]["hits"] >= 1
@@ -0,0 +1,104 @@
+# backend/tests/test_core_exercise_persistence.py
+
+import pytest
+from sqlalchemy import event, exc, select
+
+from app.core.content_cache import content_cache
+from app.core.db import SessionLocal, engine
+from app.core.exercise_persistence import persist_exercises
+from app.core.exercise_service import ExerciseService
+from app.models.exercise import Exercise
+from app.models.exercise_option import ExerciseOption
+
+
+def _make_exercise(lexical_item_id: int = 1) -> Exercise:
+    exercise = Exercise(
+        category_id=1,
+        lexical_item_id=lexical_item_id,
+        option_order=[1, 2, 3, 4, 5],
+    )
+    exercise.options = [
+        ExerciseOption(option_id=i, text=f"wort{i}", is_correct=(i == 3))
+        for i in range(1, 6)
+    ]
+    return exercise
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        session.connection()
+    except exc.OperationalError:
+        session.close()
+        pytest.skip("Base de datos no disponible para tests integrados.")
+    try:
+        yield session
+    finally:
+        # Nada se confirma: el test no deja filas en la BD
+        session.rollback()
+        session.close()
+
+
+def test_persist_exercises_uses_two_statements_for_a_batch(db):
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    exercises = [_make_exercise(i) for i in (1, 2, 3)]
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        exercise_ids = persist_exercises(db, exercises)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert len(statements) == 2
+    assert statements[0].startswith("INSERT INTO exercise ")
+    assert statements[1].startswith("INSERT INTO exercise_option ")
+
+    # Ids en el orden de los ejercicios y asignados a los objetos
+    assert exercise_ids == sorted(exercise_ids)
+    assert [e.exercise_id for e in exercises] == exercise_ids
+
+    rows = db.execute(
+        select(ExerciseOption.exercise_id, ExerciseOption.is_correct).where(
+            ExerciseOption.exercise_id.in_(exercise_ids)
+        )
+    ).all()
+    assert len(rows) == 15
+    assert sum(1 for r in rows if r.is_correct) == 3
+
+
+def test_generated_exercises_are_one_row_each(db):
+    snapshot = content_cache.get_items(db, 1)
+    exercises = ExerciseService(db, seeded=False).build_exercises(snapshot, 1, 3)
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        exercise_ids = persist_exercises(db, exercises)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert len(statements) == 1
+    stored = db.execute(
+        select(Exercise.option_item_ids, Exercise.correct_option_id)
+        .where(Exercise.exercise_id.in_(exercise_ids))
+        .order_by(Exercise.exercise_id)
+    ).all()
+    assert [tuple(r) for r in stored] == [
+        (e.option_item_ids, e.correct_option_id) for e in exercises
+    ]
+    assert db.execute(
+        select(ExerciseOption.option_id).where(
+            ExerciseOption.exercise_id.in_(exercise_ids)
+        )
+    ).all() == []
+
+
+def test_persist_exercises_with_no_exercises_is_a_noop(db):
+    assert persist_exercises(db, []) == []
@@ -0,0 +1,278 @@
+# backend/tests/test_core_exercise_pool.py
+
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc
+
+from app.core.content_cache import ContentCache, content_cache
+from app.core.db import SessionLocal
+from app.core.exercise_memory import ProcessEphemeralMemory
+from app.core.exercise_pool import ExercisePool, exercise_pool
+from app.main import create_app
+from app.models.exercise import Exercise
+from app.models.lexical_item import LexicalItem
+
+
+class _Result:
+    def __init__(self, values):
+        self._values = values
+
+    def scalars(self):
+        return iter(self._values)
+
+
+class _Query:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def filter(self, *_args, **_kwargs):
+        return self
+
+    def all(self):
+        return list(self._rows)
+
+
+class PoolSessionFactory:
+    """
+    Sesiones del hilo de relleno: items fijos para la caché de contenido
+    y los 2 INSERT de persist_exercises (el primero devuelve los ids).
+    """
+
+    def __init__(self, item_count: int):
+        self.items = [
+            LexicalItem(lexical_item_id=i, category_id=1, text=f"wort{i}")
+            for i in range(1, item_count + 1)
+        ]
+        self._ids = itertools.count(1)
+        self.inserts = 0
+        self.commits = 0
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def query(self, _model):
+        return _Query(self.items)
+
+    def execute(self, _statement, rows=None):
+        self.inserts += 1
+        if rows is None:
+            return None
+        return _Result([next(self._ids) for _ in rows])
+
+    def commit(self):
+        self.commits += 1
+
+
+def _pool(item_count: int = 20, **kwargs) -> ExercisePool:
+    options = {
+        "enabled": True,
+        "capacity": 6,
+        "low_water": 0,
+        "refill_interval": 60,
+        "session_factory": PoolSessionFactory(item_count),
+        "content": ContentCache(revalidate_seconds=3600),
+        "memory": ProcessEphemeralMemory(),
+    }
+    options.update(kwargs)
+    return ExercisePool(**options)
+
+
+@pytest.fixture
+def pool():
+    pool = _pool()
+    pool.start()
+    try:
+        yield pool
+    finally:
+        pool.close()
+
+
+def test_take_is_disabled_until_started():
+    pool = _pool()
+
+    assert pool.take(1) is None
+    assert pool.stats()["categories"] == 0
+
+
+def test_first_request_registers_category_and_refill_fills_it(pool):
+    assert pool.take(1) is None  # la categoría entra en el pool
+    pool.refill()
+
+    stats = pool.stats()
+    assert stats["depth"] == {1: 6}
+    assert stats["refilled"] == 6
+    # Una sola transacción: 1 INSERT (opciones compactas) + 1 commit
+    assert pool._session_factory.inserts == 1
+    assert pool._session_factory.commits == 1
+
+    exercise = pool.take(1)
+    assert exercise.exercise_id is not None
+    assert len(exercise.options) == 5
+    assert sum(1 for o in exercise.options if o.is_correct) == 1
+    assert pool.stats()["hits"] == 1
+    assert pool.stats()["depth"] == {1: 5}
+
+
+def test_taken_exercises_follow_modo_b(pool):
+    pool.take(1)
+    pool.refill()
+
+    previous = None
+    for _ in range(5):
+        exercise = pool.take(1)
+        assert exercise.lexical_item_id != previous
+        assert pool._memory.get_last(1) == exercise.lexical_item_id
+        previous = exercise.lexical_item_id
+
+
+def test_head_repeating_last_item_is_skipped(pool):
+    pool.take(1)
+    pool.refill()
+    head = pool._pools[1].ring[0]
+    pool._memory.set_last(1, head.lexical_item_id)
+
+    exercise = pool.take(1)
+
+    assert exercise is not head
+    assert exercise.lexical_item_id != head.lexical_item_id
+    assert pool.stats()["modo_b_skips"] == 1
+    # El saltado sigue disponible para la siguiente petición
+    assert pool.take(1) is head
+
+
+def test_modo_b_is_applied_per_client(pool):
+    pool.take(1)
+    pool.refill()
+    head = pool._pools[1].ring[0]
+    pool._memory.remember(1, head.lexical_item_id, client="a")
+
+    # Otro cliente no hereda la ventana de "a"
+    assert pool.take(1, client_key="b") is head
+    assert pool._memory.get_last(1, client="b") == head.lexical_item_id
+    assert pool._memory.get_last(1) is None
+
+    # previous_lexical_item_id se excluye además de la ventana (anónima)
+    head = pool._pools[1].ring[0]
+    exercise = pool.take(1, previous_lexical_item_id=head.lexical_item_id)
+    assert exercise is not head
+    assert pool._memory.get_last(1) == exercise.lexical_item_id
+    # 0 (cliente que no conoce el id) no cambia nada
+    assert pool.take(1, previous_lexical_item_id=0).lexical_item_id != (
+        exercise.lexical_item_id
+    )
+
+
+def test_pool_serves_when_the_window_covers_the_category():
+    """
+    K >= nº de items: la ventana se recorta a size - 1 como en línea, así
+    que el pool sigue sirviendo (antes excluía todo y devolvía None).
+    """
+    pool = _pool(item_count=6, memory=ProcessEphemeralMemory(window=10))
+    pool.start()
+    try:
+        pool.take(1)
+        pool.refill()
+        head = pool._pools[1].ring[0]
+        # Los 6 items en la ventana; el más antiguo es el del primero del anillo
+        pool._memory.remember(1, head.lexical_item_id)
+        for item_id in range(1, 7):
+            if item_id != head.lexical_item_id:
+                pool._memory.remember(1, item_id)
+
+        assert pool.take(1) is head
+    finally:
+        pool.close()
+
+
+def test_content_change_discards_pooled_exercises(pool):
+    pool.take(1)
+    pool.refill()
+
+    pool._content.invalidate()
+
+    assert pool.take(1) is None
+    stats = pool.stats()
+    assert stats["discarded"] == 6
+    assert stats["depth"] == {1: 0}
+
+
+def test_category_without_enough_items_stays_inline():
+    pool = _pool(item_count=4)
+    pool.start()
+    try:
+        pool.take(1)
+        pool.refill()
+
+        assert pool.stats()["categories"] == 0
+        assert pool.take(1) is None
+        assert pool.stats()["categories"] == 0
+    finally:
+        pool.close()
+
+
+def test_pools_are_limited_to_max_categories():
+    pool = _pool(max_categories=1)
+    pool.start()
+    try:
+        pool.take(1)
+        pool.take(2)
+
+        assert list(pool.stats()["depth"]) == [1]
+    finally:
+        pool.close()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        session.connection()
+    except exc.OperationalError:
+        session.close()
+        pytest.skip("Base de datos no disponible para tests integrados.")
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+def test_generate_serves_persisted_exercises_from_pool(db, monkeypatch):
+    """
+    Flujo HTTP con EXERCISE_POOL: tras el primer generate (en línea) la
+    categoría se rellena y los siguientes salen del pool ya persistidos.
+    """
+    monkeypatch.setattr(exercise_pool, "enabled", True)
+    monkeypatch.setattr(exercise_pool, "capacity", 4)
+    # Otros tests cargan contenido falso en la caché global
+    content_cache.invalidate()
+
+    with TestClient(create_app(async_db=False)) as client:
+        assert client.post("/exercise/generate", json={"category_id": 1}).status_code == 200
+        exercise_pool.refill()
+        assert exercise_pool.stats()["depth"][1] > 0
+
+        generated = client.post("/exercise/generate", json={"category_id": 1})
+        assert generated.status_code == 200
+        assert exercise_pool.stats()["hits"] >= 1
+        data = generated.json()
+
+        validated = client.post(
+            "/exercise/validate",
+            json={
+                "exercise_id": data["exercise_id"],
+                "selected_option_id": data["options"][0]["option_id"],
+            },
+        )
+        assert validated.status_code == 200
+        assert client.get("/health/exercise-pool").json()["enabled"] is True
+
+    assert db.get(Exercise, data["exercise_id"]) is not None
@@ -0,0 +1,171 @@
+# backend/tests/test_core_exercise_retention.py
+
+from datetime import date
+
+import pytest
+from sqlalchemy import exc, text
+
+from app.core.db import engine
+from app.core.exercise_retention import (
+    add_months,
+    existing_months,
+    expired_months,
+    months_to_create,
+    partition_name,
+    retention_cutoff,
+    run_partition_maintenance,
+)
+
+
+def test_add_months_crosses_years():
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+
+
+def test_months_to_create_covers_current_and_premake():
+    existing = {date(2025, 3, 1)}
+
+    missing = months_to_create(existing, date(2025, 3, 18), premake=2)
+
+    assert missing == [date(2025, 4, 1), date(2025, 5, 1)]
+
+
+def test_expired_months_only_when_the_whole_month_is_older():
+    existing = {date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)}
+
+    # Corte: 2025-03-01 → enero y febrero terminan antes del corte
+    assert expired_months(existing, date(2025, 3, 31), 30) == [
+        date(2025, 1, 1),
+        date(2025, 2, 1),
+    ]
+    # Corte: 2025-02-28 → febrero aún tiene filas dentro de la retención
+    assert expired_months(existing, date(2025, 3, 30), 30) == [date(2025, 1, 1)]
+    assert expired_months(existing, date(2025, 3, 31), 0) == []
+
+
+def test_retention_cutoff_matches_expired_months():
+    today = date(2024, 5, 20)
+
+    assert retention_cutoff(today, 0) is None
+    # Corte el 2024-04-10: caduca todo lo anterior a abril
+    assert retention_cutoff(today, 40) == date(2024, 4, 1)
+    assert expired_months({date(2024, 3, 1), date(2024, 4, 1)}, today, 40) == [
+        date(2024, 3, 1)
+    ]
+
+
+def test_partition_name():
+    assert partition_name("exercise_option", date(2025, 7, 1)) == (
+        "exercise_option_p2025_07"
+    )
+
+
+@pytest.fixture
+def conn():
+    """
+    Conexión con una transacción que se deshace al final: el DDL de
+    PostgreSQL es transaccional, así que el test no deja particiones.
+    """
+    try:
+        connection = engine.connect()
+        partitioned = connection.execute(
+            text(
+                "SELECT relkind = 'p' FROM pg_class WHERE relname = 'exercise'"
+            )
+        ).scalar()
+    except exc.OperationalError:
+        pytest.skip("Base de datos no disponible para tests integrados.")
+    if not partitioned:
+        connection.close()
+        pytest.skip("exercise no está particionada (migración 0004 sin aplicar).")
+    try:
+        yield connection
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+def _insert_exercise(conn, created_at: str) -> int:
+    exercise_id = conn.execute(
+        text(
+            "INSERT INTO exercise "
+            "(category_id, lexical_item_id, option_order, created_at) "
+            "VALUES (1, 1, '{1,2,3,4,5}', :created_at) RETURNING exercise_id"
+        ),
+        {"created_at": created_at},
+    ).scalar_one()
+    conn.execute(
+        text(
+            "INSERT INTO exercise_option "
+            "(exercise_id, option_id, text, is_correct, created_at) "
+            "VALUES (:id, 1, 'wort', true, :created_at)"
+        ),
+        {"id": exercise_id, "created_at": created_at},
+    )
+    return exercise_id
+
+
+def test_maintenance_creates_and_drops_month_partitions(conn):
+    # Un "hoy" ficticio en el pasado, lejos de las particiones reales
+    result = run_partition_maintenance(
+        conn, retention_days=0, premake_months=1, today=date(2001, 1, 10)
+    )
+    assert result["created"] == ["exercise_p2001_01", "exercise_p2001_02"]
+
+    exercise_id = _insert_exercise(conn, "2001-01-15 12:00:00+00")
+    assert conn.execute(
+        text("SELECT tableoid::regclass::text FROM exercise WHERE exercise_id = :id"),
+        {"id": exercise_id},
+    ).scalar() == "exercise_p2001_01"
+
+    result = run_partition_maintenance(
+        conn, retention_days=30, premake_months=0, today=date(2001, 3, 5)
+    )
+    assert "exercise_p2001_01" in result["dropped"]
+    assert date(2001, 1, 1) not in existing_months(conn)
+    assert conn.execute(
+        text("SELECT count(*) FROM exercise_option WHERE exercise_id = :id"),
+        {"id": exercise_id},
+    ).scalar() == 0
+
+
+def test_rows_in_default_partition_are_moved_to_new_partition(conn):
+    # Sin partición para 2001-05: las filas caen en la DEFAULT
+    exercise_id = _insert_exercise(conn, "2001-05-20 08:00:00+00")
+
+    run_partition_maintenance(
+        conn, retention_days=0, premake_months=0, today=date(2001, 5, 21)
+    )
+
+    located = conn.execute(
+        text(
+            "SELECT e.tableoid::regclass::text, o.tableoid::regclass::text "
+            "FROM exercise e JOIN exercise_option o USING (exercise_id, created_at) "
+            "WHERE e.exercise_id = :id"
+        ),
+        {"id": exercise_id},
+    ).one()
+    assert tuple(located) == ("exercise_p2001_05", "exercise_option_p2001_05")
+
+
+def test_expired_rows_in_default_partition_are_purged(conn):
+    # 2001-07 nunca tuvo partición: la fila queda en la DEFAULT
+    old_id = _insert_exercise(conn, "2001-07-10 08:00:00+00")
+    recent_id = _insert_exercise(conn, "2001-09-02 08:00:00+00")
+
+    result = run_partition_maintenance(
+        conn, retention_days=40, premake_months=0, today=date(2001, 9, 20)
+    )
+
+    assert result["purged_default"] == 1
+    remaining = set(
+        conn.execute(
+            text("SELECT exercise_id FROM exercise WHERE exercise_id IN (:a, :b)"),
+            {"a": old_id, "b": recent_id},
+        ).scalars()
+    )
+    assert remaining == {recent_id}
+    assert conn.execute(
+        text("SELECT count(*) FROM exercise_option WHERE exercise_id = :id"),
+        {"id": old_id},
+    ).scalar() == 0
@@ -0,0 +1,159 @@
+# backend/tests/test_core_exercise_seeded.py
+
+from array import array
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, exc, select
+
+from app.core.content_cache import CategorySnapshot
+from app.core.db import SessionLocal, engine
+from app.core.exercise_cache import recent_exercises
+from app.core.exercise_persistence import persist_exercises
+from app.core.exercise_service import (
+    SEEDED_OPTION_IDS,
+    ExerciseService,
+    content_version,
+    seeded_correct_option_id,
+    seeded_option_texts,
+)
+from app.main import create_app
+from app.models.exercise import Exercise
+from app.models.exercise_option import ExerciseOption
+
+
+def _snapshot(size: int = 40, etag: str = "0123456789abcdef01234567") -> CategorySnapshot:
+    return CategorySnapshot(
+        category_id=1,
+        version=1,
+        item_ids=array("i", range(100, 100 + size)),
+        texts=tuple(f"wort{i}" for i in range(size)),
+        etag=etag,
+    )
+
+
+def test_options_are_a_pure_function_of_seed_item_and_content():
+    snapshot = _snapshot()
+    service = ExerciseService(db=None, seeded=True)
+
+    for exercise in service.build_exercises(snapshot, 1, 20):
+        assert exercise.seed is not None
+        assert exercise.content_version == content_version(snapshot)
+        texts = [opt.text for opt in exercise.options]
+        assert texts == seeded_option_texts(
+            snapshot, exercise.seed, exercise.lexical_item_id, exercise.content_version
+        )
+        assert len(set(texts)) == 5
+        correct = [opt.option_id for opt in exercise.options if opt.is_correct]
+        assert correct == [seeded_correct_option_id(exercise.seed)]
+        assert [opt.option_id for opt in exercise.options] == list(SEEDED_OPTION_IDS)
+
+
+def test_options_cannot_be_rebuilt_after_content_changes():
+    snapshot = _snapshot()
+    exercise = ExerciseService(db=None, seeded=True).build_exercises(snapshot, 1, 1)[0]
+    changed = _snapshot(etag="ffffffff89abcdef01234567")
+
+    assert (
+        seeded_option_texts(
+            changed, exercise.seed, exercise.lexical_item_id, exercise.content_version
+        )
+        is None
+    )
+    assert seeded_option_texts(snapshot, exercise.seed, 99, exercise.content_version) is None
+
+
+def test_unseeded_mode_is_unchanged():
+    exercise = ExerciseService(db=None, seeded=False).build_exercises(_snapshot(), 1, 1)[0]
+
+    assert exercise.seed is None
+    assert exercise.content_version is None
+    assert sum(opt.is_correct for opt in exercise.options) == 1
+
+
+# ----------------------------------------------------------------------
+# Contra la BD real
+# ----------------------------------------------------------------------
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        session.execute(select(Exercise.seed).limit(1))
+    except (exc.OperationalError, exc.ProgrammingError):
+        session.close()
+        pytest.skip("Base de datos (migrada a 0006) no disponible para tests integrados.")
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+def test_seeded_exercises_are_persisted_with_one_statement(db):
+    exercises = ExerciseService(db=None, seeded=True).build_exercises(_snapshot(), 1, 3)
+    for exercise in exercises:
+        # lexical_item_id reales (FK): la semilla no depende del contenido en BD
+        exercise.lexical_item_id = 1
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        exercise_ids = persist_exercises(db, exercises)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert len(statements) == 1
+    assert db.execute(
+        select(ExerciseOption.option_id).where(ExerciseOption.exercise_id.in_(exercise_ids))
+    ).all() == []
+    seeds = db.execute(
+        select(Exercise.seed).where(Exercise.exercise_id.in_(exercise_ids))
+    ).scalars()
+    assert sorted(seeds) == sorted(e.seed for e in exercises)
+
+
+@pytest.mark.parametrize("async_db", [False, True])
+def test_validate_recomputes_the_correct_option(db, monkeypatch, async_db):
+    from app.core import exercise_service
+
+    monkeypatch.setattr(exercise_service._settings, "exercise_seeded", True)
+    # Sin caché de recientes: validate tiene que ir a la BD
+    monkeypatch.setattr(recent_exercises, "max_entries", 0)
+    client = TestClient(create_app(async_db=async_db))
+
+    generated = client.post("/exercise/generate", json={"category_id": 1}).json()
+    exercise_id = generated["exercise_id"]
+    try:
+        row = db.execute(
+            select(Exercise.seed).where(Exercise.exercise_id == exercise_id)
+        ).one()
+        correct_option_id = seeded_correct_option_id(row.seed)
+
+        response = client.post(
+            "/exercise/validate",
+            json={"exercise_id": exercise_id, "selected_option_id": correct_option_id},
+        )
+        assert response.json() == {
+            "correct": True,
+            "correct_option_id": correct_option_id,
+            "score_delta": 1,
+        }
+        wrong = next(i for i in SEEDED_OPTION_IDS if i != correct_option_id)
+        response = client.post(
+            "/exercise/validate",
+            json={"exercise_id": exercise_id, "selected_option_id": wrong},
+        )
+        assert response.json()["correct"] is False
+        response = client.post(
+            "/exercise/validate",
+            json={"exercise_id": exercise_id, "selected_option_id": 6},
+        )
+        assert response.json() == {"error": "invalid_option_id"}
+    finally:
+        db.query(Exercise).filter(Exercise.exercise_id == exercise_id).delete(
+            synchronize_session=False
+        )
+        db.commit()
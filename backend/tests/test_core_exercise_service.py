@@ -1,7 +1,10 @@
 # backend/tests/test_core_exercise_service.py
 
+import pytest
+
+from app.core.content_cache import content_cache
 from app.core.exercise_service import ExerciseService
-from app.core.exercise_memory import ephemeral_memory
+from app.core.exercise_memory import ProcessEphemeralMemory, ephemeral_memory
 from app.models.lexical_item import LexicalItem
 
 
@@ -75,6 +78,7 @@ def test_generate_simple():
     # Aseguramos memoria efímera limpia
     if hasattr(ephemeral_memory, "_last_items"):
         ephemeral_memory._last_items.clear()
+    content_cache.invalidate()
 
     items = _make_items_for_category(category_id=1, count=5)
     db = FakeSession(items)
@@ -102,6 +106,7 @@ def test_generate_no_immediate_repetition_modo_b():
     """
     if hasattr(ephemeral_memory, "_last_items"):
         ephemeral_memory._last_items.clear()
+    content_cache.invalidate()
 
     items = _make_items_for_category(category_id=1, count=5)
     db = FakeSession(items)
@@ -120,3 +125,168 @@ def test_generate_no_immediate_repetition_modo_b():
 
     # Con más de un ítem, el segundo NO debe repetir el lexical_item anterior
     assert second.lexical_item_id != first_lex_id
+
+
+def test_generate_large_category_options_are_distinct():
+    """
+    Con una categoría grande (muestreo con rechazo) las 5 opciones son
+    items distintos y el correcto nunca repite el anterior (Modo B).
+    """
+    if hasattr(ephemeral_memory, "_last_items"):
+        ephemeral_memory._last_items.clear()
+    content_cache.invalidate()
+
+    items = _make_items_for_category(category_id=1, count=1000)
+    service = ExerciseService(FakeSession(items))
+
+    previous = None
+    for _ in range(200):
+        exercise = service.generate_exercise(category_id=1)
+        texts = [opt.text for opt in exercise.options]
+        correct = [opt.text for opt in exercise.options if opt.is_correct]
+
+        assert len(set(texts)) == 5
+        assert correct == [f"wort{exercise.lexical_item_id}"]
+        assert exercise.lexical_item_id != previous
+        previous = exercise.lexical_item_id
+
+
+def test_generate_requires_four_distractors():
+    """
+    Con menos de 5 items no hay ejercicio válido → insufficient_items.
+    """
+    content_cache.invalidate()
+
+    service = ExerciseService(FakeSession(_make_items_for_category(1, count=4)))
+
+    with pytest.raises(ValueError, match="insufficient_items"):
+        service.generate_exercise(category_id=1)
+
+
+def test_options_keep_their_lexical_item_ids():
+    """
+    Almacenamiento compacto: option_item_ids[option_id - 1] es el item de
+    cada opción y correct_option_id apunta al item correcto.
+    """
+    content_cache.invalidate()
+
+    service = ExerciseService(FakeSession(_make_items_for_category(1, count=50)))
+
+    for _ in range(20):
+        exercise = service.generate_exercise(category_id=1)
+
+        assert len(exercise.option_item_ids) == 5
+        assert [opt.text for opt in exercise.options] == [
+            f"wort{item_id}" for item_id in exercise.option_item_ids
+        ]
+        assert exercise.option_item_ids[exercise.correct_option_id - 1] == (
+            exercise.lexical_item_id
+        )
+        correct = [opt.option_id for opt in exercise.options if opt.is_correct]
+        assert correct == [exercise.correct_option_id]
+
+
+def test_window_excludes_the_last_k_items_per_category(monkeypatch):
+    """
+    Ventana de Modo B: ninguno de los últimos K correctos de la categoría
+    se repite; K por categoría y, como mucho, nº de items - 1.
+    """
+    from app.core import exercise_service
+
+    memory = ProcessEphemeralMemory(window=3, windows={2: 5, 3: 8})
+    monkeypatch.setattr(exercise_service, "ephemeral_memory", memory)
+    content_cache.invalidate()
+
+    for category_id, count, k in ((1, 50, 3), (2, 50, 5), (3, 6, 5)):
+        service = ExerciseService(FakeSession(_make_items_for_category(category_id, count)))
+        history = []
+        for _ in range(100):
+            exercise = service.generate_exercise(category_id=category_id)
+            assert exercise.lexical_item_id not in history[-k:]
+            history.append(exercise.lexical_item_id)
+        content_cache.invalidate()
+
+    # Categoría de 6 items con K = 8: la ventana efectiva es 5 y la
+    # secuencia recorre los 6 en ciclo
+    assert len(set(history[-6:])) == 6
+
+
+def test_build_exercises_applies_the_window_to_the_sequence(monkeypatch):
+    from app.core import exercise_service
+
+    monkeypatch.setattr(
+        exercise_service, "ephemeral_memory", ProcessEphemeralMemory(window=4)
+    )
+    content_cache.invalidate()
+    service = ExerciseService(FakeSession(_make_items_for_category(1, count=20)))
+    snapshot = content_cache.get_items(service.db, 1)
+
+    exercises = service.build_exercises(snapshot, 1, 50, previous_lexical_item_id=7)
+    history = [7] + [exercise.lexical_item_id for exercise in exercises]
+
+    for i in range(1, len(history)):
+        assert history[i] not in history[max(0, i - 4):i]
+
+
+def test_window_is_kept_per_client(monkeypatch):
+    """
+    Cada X-Client-Id tiene su ventana: lo que genera un cliente no cambia
+    lo que se excluye para otro. Sin clave se usa la ventana anónima.
+    """
+    from app.core import exercise_service
+
+    memory = ProcessEphemeralMemory(window=3)
+    monkeypatch.setattr(exercise_service, "ephemeral_memory", memory)
+    content_cache.invalidate()
+    items = _make_items_for_category(1, count=30)
+
+    history = {"a": [], "b": []}
+    for _ in range(50):
+        for client_key, seen in history.items():
+            service = ExerciseService(FakeSession(items), client_key=client_key)
+            exercise = service.generate_exercise(category_id=1)
+            assert exercise.lexical_item_id not in seen[-3:]
+            seen.append(exercise.lexical_item_id)
+
+    assert memory.get_last(1, client="a") == history["a"][-1]
+    assert memory.get_last(1, client="b") == history["b"][-1]
+    assert memory.get_last(1) is None
+
+    exercise = ExerciseService(FakeSession(items)).generate_exercise(
+        category_id=1, previous_lexical_item_id=7
+    )
+    assert exercise.lexical_item_id != 7
+    assert memory.get_last(1) == exercise.lexical_item_id
+
+
+def test_previous_item_zero_without_client_key_keeps_modo_b(monkeypatch):
+    """
+    Regresión: un cliente sin X-Client-Id que envía previous_lexical_item_id
+    = 0 (no conoce el id real) sigue teniendo Modo B en el servidor.
+    """
+    from app.core import exercise_service
+
+    monkeypatch.setattr(exercise_service, "ephemeral_memory", ProcessEphemeralMemory())
+    content_cache.invalidate()
+    service = ExerciseService(FakeSession(_make_items_for_category(1, count=30)))
+
+    previous = None
+    for _ in range(200):
+        exercise = service.generate_exercise(category_id=1, previous_lexical_item_id=0)
+        assert exercise.lexical_item_id != previous
+        previous = exercise.lexical_item_id
+
+
+def test_previous_item_is_excluded_with_a_full_window(monkeypatch):
+    from app.core import exercise_service
+
+    monkeypatch.setattr(
+        exercise_service, "ephemeral_memory", ProcessEphemeralMemory(window=10)
+    )
+    content_cache.invalidate()
+    service = ExerciseService(FakeSession(_make_items_for_category(1, count=6)))
+
+    for _ in range(50):
+        # Ventana recortada a size - 2: siempre queda un candidato
+        exercise = service.generate_exercise(category_id=1, previous_lexical_item_id=3)
+        assert exercise.lexical_item_id != 3
@@ -0,0 +1,77 @@
+# backend/tests/test_core_exercise_token.py
+
+from fastapi.testclient import TestClient
+
+import app.api.validate as validate_api
+from app.core.exercise_token import ExerciseTokenSigner
+from app.main import create_app
+
+
+def test_token_roundtrip():
+    signer = ExerciseTokenSigner("secreto")
+
+    token = signer.sign(123456, [1, 2, 3, 4, 5], 4)
+    claims = signer.verify(token)
+
+    assert claims is not None
+    assert claims.exercise_id == 123456
+    assert claims.option_ids == (1, 2, 3, 4, 5)
+    assert claims.correct_option_id == 4
+    # Compacto: cabe holgadamente en una respuesta móvil
+    assert len(token) <= 40
+
+
+def test_token_rejects_tampering_and_other_keys():
+    signer = ExerciseTokenSigner("secreto")
+    token = signer.sign(7, [1, 2, 3, 4, 5], 2)
+
+    tampered = ("A" if token[0] != "A" else "B") + token[1:]
+    assert signer.verify(tampered) is None
+    assert ExerciseTokenSigner("otro").verify(token) is None
+    assert signer.verify("") is None
+    assert signer.verify("not-a-token!") is None
+
+
+def test_validate_with_token_needs_no_database(monkeypatch):
+    """
+    Con un token válido /exercise/validate responde sin consultar la BD
+    (el exercise_id ni siquiera existe).
+    """
+    signer = ExerciseTokenSigner("secreto")
+    monkeypatch.setattr(validate_api, "exercise_token_signer", signer)
+    client = TestClient(create_app())
+
+    token = signer.sign(987654321, [1, 2, 3, 4, 5], 3)
+
+    response = client.post(
+        "/exercise/validate",
+        json={"exercise_id": 987654321, "selected_option_id": 3, "token": token},
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "correct": True,
+        "correct_option_id": 3,
+        "score_delta": 1,
+    }
+
+    response = client.post(
+        "/exercise/validate",
+        json={"exercise_id": 987654321, "selected_option_id": 9, "token": token},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"error": "invalid_option_id"}
+
+
+def test_validate_ignores_token_for_another_exercise(monkeypatch):
+    signer = ExerciseTokenSigner("secreto")
+    monkeypatch.setattr(validate_api, "exercise_token_signer", signer)
+    client = TestClient(create_app())
+
+    token = signer.sign(1, [1, 2, 3, 4, 5], 3)
+
+    # El token es de otro ejercicio → se valida contra la BD (404 o 500 sin BD)
+    response = client.post(
+        "/exercise/validate",
+        json={"exercise_id": 987654321, "selected_option_id": 3, "token": token},
+    )
+    assert response.status_code in (404, 500)
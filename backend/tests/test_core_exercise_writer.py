@@ -0,0 +1,304 @@
+# backend/tests/test_core_exercise_writer.py
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, select
+
+from app.core.content_cache import content_cache
+from app.core.db import SessionLocal
+from app.core import exercise_writer as exercise_writer_module
+from app.core.exercise_cache import recent_exercises
+from app.core.exercise_writer import ExerciseWriteBehind, exercise_writer
+from app.main import create_app
+from app.models.exercise import Exercise
+from app.models.exercise_option import ExerciseOption
+
+
+def _make_exercise(lexical_item_id: int = 1) -> Exercise:
+    exercise = Exercise(
+        category_id=1,
+        lexical_item_id=lexical_item_id,
+        option_order=[1, 2, 3, 4, 5],
+    )
+    exercise.options = [
+        ExerciseOption(option_id=i, text=f"wort{i}", is_correct=(i == 3))
+        for i in range(1, 6)
+    ]
+    return exercise
+
+
+class _Result:
+    def __init__(self, values):
+        self._values = values
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self._values)
+
+
+class SequenceSession:
+    """
+    Sesión del request: solo responde al nextval() de la reserva de ids.
+    """
+
+    def __init__(self):
+        self.next_id = 1000
+        self.calls = 0
+
+    def execute(self, _statement, params):
+        self.calls += 1
+        ids = range(self.next_id, self.next_id + params["n"])
+        self.next_id += params["n"]
+        return _Result(ids)
+
+
+class RecordingSessionFactory:
+    """
+    Sesiones del hilo de flush: registran las sentencias y los commits.
+    `gate` permite bloquear el flush para llenar la cola.
+    """
+
+    def __init__(self, gate: threading.Event | None = None):
+        self.gate = gate
+        self.statements = []
+        self.commits = 0
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def execute(self, statement):
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        self.statements.append(statement)
+
+    def commit(self):
+        self.commits += 1
+
+
+def _writer(**kwargs) -> ExerciseWriteBehind:
+    options = {"enabled": True, "flush_interval": 0.01, "id_block_size": 10}
+    options.update(kwargs)
+    return ExerciseWriteBehind(**options)
+
+
+def test_submit_is_refused_when_not_started():
+    writer = _writer(session_factory=RecordingSessionFactory())
+
+    assert writer.submit(SequenceSession(), [_make_exercise()]) is False
+
+
+def test_ids_are_reserved_in_blocks_and_pending_until_flushed():
+    gate = threading.Event()
+    factory = RecordingSessionFactory(gate)
+    writer = _writer(session_factory=factory)
+    writer.start()
+    request_db = SequenceSession()
+
+    exercises = [_make_exercise(i) for i in range(1, 4)]
+    for exercise in exercises:
+        assert writer.submit(request_db, [exercise]) is True
+
+    # Un solo nextval() para los 3 ejercicios (bloque de 10)
+    assert request_db.calls == 1
+    assert [e.exercise_id for e in exercises] == [1000, 1001, 1002]
+
+    claims = writer.get_pending(1001)
+    assert claims.option_ids == (1, 2, 3, 4, 5)
+    assert claims.correct_option_id == 3
+
+    gate.set()
+    writer.close()
+
+    assert writer.get_pending(1001) is None
+    assert factory.commits >= 1
+    stats = writer.stats()
+    assert stats["flushed"] == 3
+    assert stats["pending"] == 0
+
+
+def test_full_queue_applies_backpressure():
+    gate = threading.Event()
+    writer = _writer(max_pending=2, session_factory=RecordingSessionFactory(gate))
+    writer.start()
+    request_db = SequenceSession()
+
+    assert writer.submit(request_db, [_make_exercise(), _make_exercise()]) is True
+    assert writer.submit(request_db, [_make_exercise()]) is False
+    assert writer.stats()["rejected"] == 1
+
+    gate.set()
+    writer.close()
+    assert writer.stats()["flushed"] == 2
+
+
+def test_close_flushes_everything_in_batches():
+    factory = RecordingSessionFactory()
+    writer = _writer(batch_size=4, flush_interval=60, session_factory=factory)
+    writer.start()
+
+    writer.submit(SequenceSession(), [_make_exercise() for _ in range(10)])
+    writer.close()
+
+    stats = writer.stats()
+    assert stats["flushed"] == 10
+    assert stats["batches"] == 3
+    # 2 INSERT por lote (exercise + exercise_option)
+    assert len(factory.statements) == 6
+
+
+def _wait_until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _failing_persist(monkeypatch, fail):
+    """
+    Sustituye el INSERT del flush: `fail(batch)` devuelve la excepción a
+    lanzar (o None). Sin esperas entre reintentos.
+    """
+    persisted = []
+
+    def persist(_session, batch):
+        error = fail(batch)
+        if error is not None:
+            raise error
+        persisted.extend(e.exercise_id for e in batch)
+
+    monkeypatch.setattr(exercise_writer_module, "persist_exercises_with_ids", persist)
+    monkeypatch.setattr(exercise_writer_module.time, "sleep", lambda _s: None)
+    return persisted
+
+
+def test_permanent_error_drops_only_the_broken_exercise(monkeypatch):
+    # lexical_item 99 "borrado" entre generate y flush: FK rota
+    persisted = _failing_persist(
+        monkeypatch,
+        lambda batch: exc.IntegrityError("INSERT", {}, Exception("fk"))
+        if any(e.lexical_item_id == 99 for e in batch)
+        else None,
+    )
+    writer = _writer(session_factory=RecordingSessionFactory())
+    writer.start()
+    exercises = [_make_exercise(1), _make_exercise(99), _make_exercise(2)]
+
+    assert writer.submit(SequenceSession(), exercises) is True
+    # Con el writer en marcha (no en close): no se reintenta para siempre
+    _wait_until(lambda: writer.stats()["pending"] == 0)
+
+    stats = writer.stats()
+    assert stats["dropped"] == 1
+    assert stats["flushed"] == 2
+    assert sorted(persisted) == [exercises[0].exercise_id, exercises[2].exercise_id]
+    assert writer.get_pending(exercises[1].exercise_id) is None
+
+    # El hilo sigue escribiendo
+    writer.submit(SequenceSession(), [_make_exercise(3)])
+    _wait_until(lambda: writer.stats()["flushed"] == 3)
+    writer.close()
+
+
+def test_connection_errors_are_retried_until_they_succeed(monkeypatch):
+    failures = iter(range(5))
+    persisted = _failing_persist(
+        monkeypatch,
+        lambda _batch: exc.OperationalError("INSERT", {}, Exception("down"))
+        if next(failures, None) is not None
+        else None,
+    )
+    writer = _writer(session_factory=RecordingSessionFactory())
+    writer.start()
+    exercise = _make_exercise()
+
+    writer.submit(SequenceSession(), [exercise])
+    _wait_until(lambda: writer.stats()["pending"] == 0)
+    writer.close()
+
+    stats = writer.stats()
+    assert stats["flush_errors"] == 5
+    assert stats["dropped"] == 0
+    assert persisted == [exercise.exercise_id]
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        session.connection()
+    except exc.OperationalError:
+        session.close()
+        pytest.skip("Base de datos no disponible para tests integrados.")
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+def test_write_behind_persists_to_database(db):
+    writer = _writer()
+    writer.start()
+
+    exercises = [_make_exercise(i) for i in (1, 2)]
+    assert writer.submit(db, exercises) is True
+    writer.close()
+
+    exercise_ids = [e.exercise_id for e in exercises]
+    rows = db.execute(
+        select(ExerciseOption.exercise_id, ExerciseOption.is_correct).where(
+            ExerciseOption.exercise_id.in_(exercise_ids)
+        )
+    ).all()
+    assert len(rows) == 10
+    assert sum(1 for r in rows if r.is_correct) == 2
+
+    # El flush confirma: limpiar lo que ha escrito
+    db.query(ExerciseOption).filter(
+        ExerciseOption.exercise_id.in_(exercise_ids)
+    ).delete(synchronize_session=False)
+    db.query(Exercise).filter(Exercise.exercise_id.in_(exercise_ids)).delete(
+        synchronize_session=False
+    )
+    db.commit()
+
+
+def test_generate_and_validate_with_write_behind(db, monkeypatch):
+    """
+    Flujo HTTP con WRITE_BEHIND: generate responde sin commit y validate
+    encuentra el ejercicio (en cola o ya escrito) aunque la caché de
+    ejercicios recientes esté desactivada.
+    """
+    monkeypatch.setattr(exercise_writer, "enabled", True)
+    monkeypatch.setattr(recent_exercises, "max_entries", 0)
+    # Otros tests cargan contenido falso en la caché global
+    content_cache.invalidate()
+
+    with TestClient(create_app(async_db=False)) as client:
+        generated = client.post("/exercise/generate", json={"category_id": 1})
+        assert generated.status_code == 200
+        data = generated.json()
+
+        validated = client.post(
+            "/exercise/validate",
+            json={
+                "exercise_id": data["exercise_id"],
+                "selected_option_id": data["options"][0]["option_id"],
+            },
+        )
+        assert validated.status_code == 200
+        assert exercise_writer.stats()["submitted"] >= 1
+
+    # Tras el lifespan (close) el ejercicio está en la BD
+    assert db.get(Exercise, data["exercise_id"]) is not None
@@ -1,5 +1,6 @@
 # backend/tests/test_core_exercise_service.py
 
+from app.core.content_cache import content_cache
 from app.core.exercise_service import ExerciseService
 from app.core.exercise_memory import ephemeral_memory
 from app.models.lexical_item import LexicalItem
@@ -75,6 +76,7 @@ def test_generate_simple():
     # Aseguramos memoria efímera limpia
     if hasattr(ephemeral_memory, "_last_items"):
         ephemeral_memory._last_items.clear()
+    content_cache.invalidate()
 
     items = _make_items_for_category(category_id=1, count=5)
     db = FakeSession(items)
@@ -102,6 +104,7 @@ def test_generate_no_immediate_repetition_modo_b():
     """
     if hasattr(ephemeral_memory, "_last_items"):
         ephemeral_memory._last_items.clear()
+    content_cache.invalidate()
 
     items = _make_items_for_category(category_id=1, count=5)
     db = FakeSession(items)
@@ -0,0 +1,111 @@
+# backend/tests/test_core_metrics.py
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.core.metrics import (
+    MetricsRegistry,
+    db_statement_duration,
+    db_statement_errors,
+    instrument_engine,
+    pool_metrics,
+    statement_operation,
+)
+
+
+def test_counter_renders_labels_in_prometheus_text_format():
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_total", "Demo.", ("route", "error"))
+    counter.inc(("/a", "category_not_found"))
+    counter.inc(("/a", "category_not_found"))
+    counter.inc(('/b"x', "internal_error"), 0.5)
+
+    lines = registry.render().splitlines()
+
+    assert lines[:2] == ["# HELP demo_total Demo.", "# TYPE demo_total counter"]
+    assert 'demo_total{route="/a",error="category_not_found"} 2' in lines
+    assert 'demo_total{route="/b\\"x",error="internal_error"} 0.5' in lines
+
+
+def test_histogram_buckets_are_cumulative_with_sum_and_count():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("lat_seconds", "Lat.", ("route",), (0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(("/a",), value)
+
+    lines = registry.render().splitlines()
+
+    assert 'lat_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'lat_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'lat_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'lat_seconds_sum{route="/a"} 3.65' in lines
+    assert 'lat_seconds_count{route="/a"} 4' in lines
+    assert histogram.count(("/a",)) == 4
+
+
+def test_collectors_are_rendered_after_metrics_once():
+    registry = MetricsRegistry()
+
+    def collector():
+        return ["# TYPE extra gauge", "extra 1"]
+
+    registry.add_collector(collector)
+    registry.add_collector(collector)
+
+    assert registry.render().count("extra 1") == 1
+
+
+@pytest.mark.parametrize(
+    ("statement", "operation"),
+    [
+        ("SELECT 1", "select"),
+        ("\n  insert into exercise VALUES (1)", "insert"),
+        ("UPDATE lexical_item SET text = 'x'", "update"),
+        ("DELETE FROM exercise", "delete"),
+        ("WITH x AS (SELECT 1) SELECT * FROM x", "other"),
+    ],
+)
+def test_statement_operation(statement, operation):
+    assert statement_operation(statement) == operation
+
+
+def test_engine_events_count_statements_and_errors():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, "test-sqlite")
+    # Idempotente: no se duplican los listeners
+    instrument_engine(engine, "test-sqlite")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2"))
+        with pytest.raises(exc.OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+
+    assert db_statement_duration.count(("test-sqlite", "select")) == 2
+    assert db_statement_errors.value(("test-sqlite", "select")) == 1
+
+
+def test_pool_metrics_from_pool_stats():
+    stats = {
+        "sync": {
+            "size": 5,
+            "checked_in": 3,
+            "checked_out": 2,
+            "overflow": -3,
+            "checkouts": 40,
+            "waits": 1,
+            "timeouts": 0,
+            "checkout_seconds_total": 0.25,
+        },
+        "async": {},
+    }
+
+    text_lines = pool_metrics(stats)
+
+    assert "# TYPE db_pool_checked_out gauge" in text_lines
+    assert "# TYPE db_pool_waits_total counter" in text_lines
+    assert any(
+        line.startswith('db_pool_checked_out{pool="sync",') and line.endswith(" 2")
+        for line in text_lines
+    )
+    assert not any('pool="async"' in line for line in text_lines)
@@ -0,0 +1,223 @@
+# backend/tests/test_core_shared_memory.py
+
+import multiprocessing
+
+import pytest
+
+from app.core.exercise_memory import (
+    EphemeralMemory,
+    ProcessEphemeralMemory,
+    RecentWindow,
+    SharedEphemeralMemory,
+    build_ephemeral_memory,
+)
+from app.core.config import Settings
+
+pytest.importorskip("fcntl")
+
+
+def _set_in_child(path: str, owner: int, category_id: int, item_id: int) -> None:
+    memory = SharedEphemeralMemory(path, slots=64, owner=owner)
+    memory.set_last(category_id, item_id)
+    memory.close()
+
+
+def _remember_in_child(path: str, category_id: int, item_ids: list[int]) -> None:
+    memory = SharedEphemeralMemory(path, slots=64, owner=1, window=3)
+    for item_id in item_ids:
+        memory.remember(category_id, item_id)
+    memory.close()
+
+
+def test_shared_memory_get_and_set(tmp_path):
+    memory = SharedEphemeralMemory(str(tmp_path / "modo_b.mem"), slots=8, owner=1)
+
+    assert memory.get_last(1) is None
+    memory.set_last(1, 10)
+    memory.set_last(9, 90)  # misma posición inicial que 1 con 8 slots
+    memory.set_last(1, 11)
+
+    assert memory.get_last(1) == 11
+    assert memory.get_last(9) == 90
+    assert memory.get_last(2) is None
+
+
+def test_shared_memory_is_visible_across_processes(tmp_path):
+    """
+    Un worker escribe, otro lee: la no repetición se mantiene con --workers N.
+    """
+    path = str(tmp_path / "modo_b.mem")
+    memory = SharedEphemeralMemory(path, slots=64, owner=1)
+
+    ctx = multiprocessing.get_context("spawn")
+    child = ctx.Process(target=_set_in_child, args=(path, 1, 3, 42))
+    child.start()
+    child.join(timeout=30)
+
+    assert child.exitcode == 0
+    assert memory.get_last(3) == 42
+
+
+def test_shared_memory_is_reset_for_a_new_owner(tmp_path):
+    path = str(tmp_path / "modo_b.mem")
+    first = SharedEphemeralMemory(path, slots=64, owner=1)
+    first.set_last(1, 10)
+
+    # Otro arranque del servidor (otro master): no hereda la memoria
+    second = SharedEphemeralMemory(path, slots=64, owner=2)
+    assert second.get_last(1) is None
+
+
+def test_full_table_never_blocks(tmp_path):
+    memory = SharedEphemeralMemory(str(tmp_path / "modo_b.mem"), slots=2, owner=1)
+
+    for category_id in range(5):
+        memory.set_last(category_id, category_id * 10)
+
+    assert memory.get_last(4) == 40
+
+
+def test_build_ephemeral_memory_selects_backend(tmp_path):
+    process = build_ephemeral_memory(Settings(database_url="postgresql://"))
+    assert isinstance(process, ProcessEphemeralMemory)
+
+    shared = build_ephemeral_memory(
+        Settings(
+            database_url="postgresql://",
+            modo_b_memory_backend="shared",
+            modo_b_memory_path=str(tmp_path / "modo_b.mem"),
+            modo_b_window=3,
+            modo_b_window_by_category="7:10, 8:2",
+        )
+    )
+    assert isinstance(shared, SharedEphemeralMemory)
+    assert (shared.window(1), shared.window(7), shared.window(8)) == (3, 10, 2)
+    assert shared.max_window == 10
+
+
+def test_recent_window_keeps_the_last_k_items():
+    window = RecentWindow(3)
+    for item_id in (1, 2, 1, 3, 4):
+        window.push(item_id)
+
+    # Anillo: 1, 3, 4 (el primer 1 y el 2 ya salieron)
+    assert 2 not in window
+    assert 1 in window and 3 in window and 4 in window
+    assert window.last() == 4
+    assert window.latest(2) == {3, 4}
+    window.push(5)
+    assert 1 not in window
+
+
+@pytest.mark.parametrize("backend", ["process", "shared"])
+def test_window_size_is_configurable_per_category(tmp_path, backend):
+    if backend == "shared":
+        memory = SharedEphemeralMemory(
+            str(tmp_path / "modo_b.mem"), slots=8, owner=1, window=2, windows={5: 4}
+        )
+    else:
+        memory = ProcessEphemeralMemory(window=2, windows={5: 4})
+
+    for item_id in range(10, 16):
+        memory.remember(1, item_id)
+        memory.remember(5, item_id)
+
+    assert set(filter(memory.recent(1).__contains__, range(20))) == {14, 15}
+    assert set(filter(memory.recent(5).__contains__, range(20))) == {12, 13, 14, 15}
+    assert set(filter(memory.recent(5, limit=2).__contains__, range(20))) == {14, 15}
+    assert memory.get_last(5) == 15
+    assert 15 not in memory.recent(2)
+
+
+def test_shared_window_is_visible_across_processes(tmp_path):
+    path = str(tmp_path / "modo_b.mem")
+    memory = SharedEphemeralMemory(path, slots=64, owner=1, window=3)
+    memory.remember(3, 1)
+
+    ctx = multiprocessing.get_context("spawn")
+    child = ctx.Process(target=_remember_in_child, args=(path, 3, [2, 3]))
+    child.start()
+    child.join(timeout=30)
+
+    assert child.exitcode == 0
+    assert memory.recent(3) == {1, 2, 3}
+    memory.remember(3, 4)
+    assert memory.recent(3) == {2, 3, 4}
+
+
+def test_process_memory_is_bounded_with_lru_and_ttl(monkeypatch):
+    from app.core import exercise_memory
+
+    clock = [1000.0]
+    monkeypatch.setattr(exercise_memory.time, "monotonic", lambda: clock[0])
+    memory = ProcessEphemeralMemory(max_entries=3, ttl_seconds=60)
+
+    for client in ("a", "b", "c"):
+        memory.remember(1, 10, client=client)
+    memory.remember(1, 11, client="a")  # "a" pasa a ser la más reciente
+    memory.remember(1, 12, client="d")  # expulsa "b" (LRU)
+
+    assert memory.get_last(1, client="b") is None
+    assert memory.get_last(1, client="a") == 11
+    assert memory.stats()["evictions"] == 1
+
+    clock[0] += 61
+    assert memory.recent(1, client="a") == frozenset()
+    memory.remember(1, 13, client="e")
+
+    stats = memory.stats()
+    assert stats["entries"] == 1
+    assert stats["expirations"] == 3
+    assert stats["evictions"] == 1
+
+
+def test_shared_memory_separates_clients_and_reuses_stale_slots(tmp_path, monkeypatch):
+    from app.core import exercise_memory
+
+    clock = [1000.0]
+    monkeypatch.setattr(exercise_memory.time, "time", lambda: clock[0])
+    memory = SharedEphemeralMemory(
+        str(tmp_path / "modo_b.mem"), slots=4, owner=1, ttl_seconds=60
+    )
+
+    memory.remember(1, 10)
+    memory.remember(1, 20, client="a")
+    memory.remember(1, 30, client="b")
+    assert (memory.get_last(1), memory.get_last(1, client="a")) == (10, 20)
+    assert memory.get_last(1, client="b") == 30
+
+    # Tabla llena: se reutiliza el slot de uso más antiguo (el anónimo)
+    clock[0] += 1
+    for client in ("a", "b", "c"):
+        memory.remember(1, 40, client=client)
+    memory.remember(1, 50, client="d")
+    assert memory.get_last(1) is None
+    assert memory.stats()["evictions"] == 1
+
+    clock[0] += 61
+    assert memory.get_last(1, client="a") is None
+    memory.remember(1, 60, client="e")
+    stats = memory.stats()
+    assert stats["entries"] == 1
+    assert stats["max_entries"] == 4
+    assert stats["expirations"] == 1
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoStats(EphemeralMemory):
+        def recent(self, category_id, limit=None, client=None):
+            return frozenset()
+
+        def remember(self, category_id, lexical_item_id, client=None):
+            pass
+
+        def get_last(self, category_id, client=None):
+            return None
+
+        def clear(self):
+            pass
+
+    with pytest.raises(TypeError, match="stats"):
+        NoStats()
+    with pytest.raises(TypeError):
+        EphemeralMemory()
@@ -13,6 +13,9 @@ def test_exercise_has_expected_columns():
       - category_id
       - lexical_item_id
       - option_order
+      - created_at (clave de partición, migración 0004)
+      - seed, content_version (ejercicios con semilla, migración 0006)
+      - option_item_ids, correct_option_id (opciones compactas, migración 0007)
     según ET v1.4 (cap. 3.1) y MP-DATA-02.
     """
     mapper = sa_inspect(Exercise)
@@ -23,6 +26,11 @@ def test_exercise_has_expected_columns():
         "category_id",
         "lexical_item_id",
         "option_order",
+        "created_at",
+        "seed",
+        "content_version",
+        "option_item_ids",
+        "correct_option_id",
     }
 
 
@@ -57,6 +65,7 @@ def test_exercise_option_has_expected_columns():
       - option_id
       - text
       - is_correct
+      - created_at (clave de partición, migración 0004)
     según ET v1.4 y MP-DATA-02.
     """
     mapper = sa_inspect(ExerciseOption)
@@ -67,6 +76,7 @@ def test_exercise_option_has_expected_columns():
         "option_id",
         "text",
         "is_correct",
+        "created_at",
     }
 
 